@@ -1,125 +1,282 @@
-# # # from fastapi import APIRouter, HTTPException
-# # # from pydantic import BaseModel
-# # # from app.services.grok_client import call_grok
-# # # from app.services.analysis_service import build_grok_prompt, parse_grok_output
-
-# # # router = APIRouter()
-
-# # # class InputMetrics(BaseModel):
-# # #     user_type: str
-# # #     AOI: str
-# # #     population_density: float
-# # #     ndvi_mean: float
-# # #     lst_mean_celsius: float
-# # #     air_quality_index: float
-# # #     land_use_dominant: str
-# # #     flood_risk_score: float
-# # #     slope_avg: float
-# # #     nightlight_index: float
-# # #     recommendations: dict
-
-# # # @router.post("/grok-analyze")
-# # # def grok_analyze(inp: InputMetrics):
-# # #     prompt = build_grok_prompt(inp.user_type, inp.dict())
-# # #     try:
-# # #         grok_resp = call_grok(prompt)
-# # #         output = parse_grok_output(grok_resp)
-# # #         return output
-# # #     except Exception as e:
-# # #         raise HTTPException(status_code=500, detail=str(e))
-
-
-# # from fastapi import APIRouter, HTTPException
-# # import os
-# # from app.services.analysis_service import build_grok_prompt, parse_grok_output
-# # import requests
-
-# # router = APIRouter()
-
-# # XAI_API_KEY = os.getenv("XAI_API_KEY")
-
-# # @router.post("/grok")
-# # def grok_analysis(data: dict):
-# #     prompt = build_grok_prompt(data)
-# #     response = requests.post(
-# #         "https://api.x.ai/v1/chat/completions",
-# #         headers={"Authorization": f"Bearer {XAI_API_KEY}", "Content-Type": "application/json"},
-# #         json={
-# #             "model": "grok-4",
-# #             "messages": [{"role": "user", "content": prompt}],
-# #             "temperature": 0.3
-# #         }
-# #     )
-# #     if response.status_code != 200:
-# #         raise HTTPException(status_code=500, detail=response.text)
-# #     return parse_grok_output(response.json())
-# from fastapi import APIRouter, HTTPException
-# import os
-# import requests
-
-# router = APIRouter()
-
-# # Load API key from environment
-# XAI_API_KEY = os.getenv("XAI_API_KEY")
-
-# @router.post("/grok")
-# def grok_analysis(data: dict):
-#     if not XAI_API_KEY:
-#         raise HTTPException(status_code=500, detail="API Key not set")
-
-#     # Call Grok API
-#     response = requests.post(
-#         "https://api.x.ai/v1/chat/completions",
-#         headers={
-#             "Authorization": f"Bearer {XAI_API_KEY}",
-#             "Content-Type": "application/json"
-#         },
-#         json={
-#             "model": "grok-4",
-#             "messages": [{"role": "user", "content": f"{data}"}],
-#             "temperature": 0.3
-#         }
-#     )
-
-#     if response.status_code != 200:
-#         raise HTTPException(status_code=response.status_code, detail=response.text)
-
-#     return response.json()
-from fastapi import APIRouter, HTTPException
-import os
-import requests
-import json
-
-router = APIRouter()
-
-XAI_API_KEY = os.getenv("XAI_API_KEY")
-
-@router.post("/grok")
-def grok_analysis(data: dict):
-    if not XAI_API_KEY:
-        raise HTTPException(status_code=500, detail="API Key not set")
-
-    payload = {
-        "model": "grok-4",
-        "messages": [{"role": "user", "content": json.dumps(data)}],
-        "temperature": 0.3
-    }
-
-    try:
-        response = requests.post(
-            "https://api.x.ai/v1/chat/completions",
-            headers={
-                "Authorization": f"Bearer {XAI_API_KEY}",
-                "Content-Type": "application/json"
-            },
-            json=payload,
-            timeout=15
-        )
-        response.raise_for_status()  # <-- this will raise for HTTP errors
-        return response.json()
-
-    except requests.exceptions.HTTPError as e:
-        # log error details
-        raise HTTPException(status_code=response.status_code, detail=response.text)
-    except requests.exceptions.RequestException as e:
-        raise HTTPException(status_code=500, detail=str(e))
+# # # from fastapi import APIRouter, HTTPException
+# # # from pydantic import BaseModel
+# # # from app.services.grok_client import call_grok
+# # # from app.services.analysis_service import build_grok_prompt, parse_grok_output
+
+# # # router = APIRouter()
+
+# # # class InputMetrics(BaseModel):
+# # #     user_type: str
+# # #     AOI: str
+# # #     population_density: float
+# # #     ndvi_mean: float
+# # #     lst_mean_celsius: float
+# # #     air_quality_index: float
+# # #     land_use_dominant: str
+# # #     flood_risk_score: float
+# # #     slope_avg: float
+# # #     nightlight_index: float
+# # #     recommendations: dict
+
+# # # @router.post("/grok-analyze")
+# # # def grok_analyze(inp: InputMetrics):
+# # #     prompt = build_grok_prompt(inp.user_type, inp.dict())
+# # #     try:
+# # #         grok_resp = call_grok(prompt)
+# # #         output = parse_grok_output(grok_resp)
+# # #         return output
+# # #     except Exception as e:
+# # #         raise HTTPException(status_code=500, detail=str(e))
+
+
+# # from fastapi import APIRouter, HTTPException
+# # import os
+# # from app.services.analysis_service import build_grok_prompt, parse_grok_output
+# # import requests
+
+# # router = APIRouter()
+
+# # XAI_API_KEY = os.getenv("XAI_API_KEY")
+
+# # @router.post("/grok")
+# # def grok_analysis(data: dict):
+# #     prompt = build_grok_prompt(data)
+# #     response = requests.post(
+# #         "https://api.x.ai/v1/chat/completions",
+# #         headers={"Authorization": f"Bearer {XAI_API_KEY}", "Content-Type": "application/json"},
+# #         json={
+# #             "model": "grok-4",
+# #             "messages": [{"role": "user", "content": prompt}],
+# #             "temperature": 0.3
+# #         }
+# #     )
+# #     if response.status_code != 200:
+# #         raise HTTPException(status_code=500, detail=response.text)
+# #     return parse_grok_output(response.json())
+# from fastapi import APIRouter, HTTPException
+# import os
+# import requests
+
+# router = APIRouter()
+
+# # Load API key from environment
+# XAI_API_KEY = os.getenv("XAI_API_KEY")
+
+# @router.post("/grok")
+# def grok_analysis(data: dict):
+#     if not XAI_API_KEY:
+#         raise HTTPException(status_code=500, detail="API Key not set")
+
+#     # Call Grok API
+#     response = requests.post(
+#         "https://api.x.ai/v1/chat/completions",
+#         headers={
+#             "Authorization": f"Bearer {XAI_API_KEY}",
+#             "Content-Type": "application/json"
+#         },
+#         json={
+#             "model": "grok-4",
+#             "messages": [{"role": "user", "content": f"{data}"}],
+#             "temperature": 0.3
+#         }
+#     )
+
+#     if response.status_code != 200:
+#         raise HTTPException(status_code=response.status_code, detail=response.text)
+
+#     return response.json()
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+import asyncio
+import os
+import time
+import httpx
+import json
+from app.services.http_client import get_client
+from app.services.llm_cache import cache_key, response_cache
+from app.services.grok_batcher import TileBatcher
+from app.services.json_stream import JSONFieldStream
+from app.services.instrumentation import UPSTREAM_SECONDS
+from app.services.analysis_service import parse_grok_output
+
+router = APIRouter()
+
+XAI_API_KEY = os.getenv("XAI_API_KEY")
+XAI_API_URL = os.getenv("XAI_API_URL", "https://api.x.ai/v1/chat/completions")
+
+GROK_MODEL = "grok-4"
+GROK_TEMPERATURE = 0.3
+
+
+async def _fetch_grok(payload: dict) -> dict:
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        response = await get_client().post(
+            XAI_API_URL,
+            headers={
+                "Authorization": f"Bearer {XAI_API_KEY}",
+                "Content-Type": "application/json"
+            },
+            json=payload
+        )
+        outcome = str(response.status_code)
+        response.raise_for_status()  # <-- this will raise for HTTP errors
+        return response.json()
+
+    except httpx.HTTPStatusError as e:
+        # log error details
+        raise HTTPException(status_code=e.response.status_code, detail=e.response.text)
+    except httpx.RequestError as e:
+        raise HTTPException(status_code=500, detail=str(e) or type(e).__name__)
+    finally:
+        UPSTREAM_SECONDS.observe(time.perf_counter() - start, mode="complete", outcome=outcome)
+
+
+@router.post("/grok")
+async def grok_analysis(data: dict):
+    if not XAI_API_KEY:
+        raise HTTPException(status_code=500, detail="API Key not set")
+
+    payload = {
+        "model": GROK_MODEL,
+        "messages": [{"role": "user", "content": json.dumps(data)}],
+        "temperature": GROK_TEMPERATURE
+    }
+
+    # identical tile payloads are answered from the cache / share one in-flight call
+    key = cache_key(data, GROK_MODEL, GROK_TEMPERATURE)
+    return await response_cache.get_or_fetch(key, lambda: _fetch_grok(payload))
+
+
+@router.get("/grok/cache")
+def grok_cache_stats():
+    return response_cache.stats()
+
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def _stream_grok(payload: dict):
+    """
+    Relay the upstream completion as Server-Sent Events.
+
+    Tokens are forwarded as they arrive ("token"), each top-level field of the
+    JSON answer is sent once it is complete ("field", so overall_assessment shows
+    up early), then the parsed answer ("result") and "done". The generator only
+    reads upstream when the client has taken the previous event, so a slow
+    client applies back-pressure instead of the body being buffered; if the
+    client goes away the upstream request is closed with it.
+    """
+    fields = JSONFieldStream()
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        async with get_client().stream(
+            "POST",
+            XAI_API_URL,
+            headers={
+                "Authorization": f"Bearer {XAI_API_KEY}",
+                "Content-Type": "application/json",
+                "Accept": "text/event-stream"
+            },
+            json={**payload, "stream": True}
+        ) as response:
+            outcome = str(response.status_code)
+            UPSTREAM_SECONDS.observe(time.perf_counter() - start, mode="first_byte", outcome=outcome)
+            if response.status_code >= 400:
+                body = (await response.aread()).decode(errors="replace")
+                yield _sse("error", {"status": response.status_code, "detail": body})
+                return
+
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    break
+                try:
+                    delta = json.loads(data)["choices"][0].get("delta", {}).get("content")
+                except (ValueError, KeyError, IndexError):
+                    continue
+                if not delta:
+                    continue
+                yield _sse("token", delta)
+                for key, value in fields.feed(delta):
+                    yield _sse("field", {key: value})
+
+    except httpx.RequestError as e:
+        yield _sse("error", {"status": 500, "detail": str(e) or type(e).__name__})
+        return
+    finally:
+        UPSTREAM_SECONDS.observe(time.perf_counter() - start, mode="stream", outcome=outcome)
+
+    try:
+        result = parse_grok_output(fields.buffer)
+    except ValueError:
+        result = {"text": fields.buffer}
+    yield _sse("result", result)
+    yield _sse("done", {})
+
+
+@router.post("/grok/stream")
+async def grok_stream(data: dict):
+    if not XAI_API_KEY:
+        raise HTTPException(status_code=500, detail="API Key not set")
+
+    payload = {
+        "model": GROK_MODEL,
+        "messages": [{"role": "user", "content": json.dumps(data)}],
+        "temperature": GROK_TEMPERATURE
+    }
+    return StreamingResponse(
+        _stream_grok(payload),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+async def _complete_prompt(prompt: str) -> str:
+    """Send one prompt upstream and return the model's text answer."""
+    payload = {
+        "model": GROK_MODEL,
+        "messages": [{"role": "user", "content": prompt}],
+        "temperature": GROK_TEMPERATURE
+    }
+    response = await _fetch_grok(payload)
+    return response["choices"][0]["message"]["content"]
+
+
+tile_batcher = TileBatcher(_complete_prompt)
+
+
+@router.post("/grok/batch")
+async def grok_batch(request: dict):
+    """
+    Advise on many tiles at once: {"tiles": [{"tile_id": ..., ...metrics}], "user_type": ...}.
+
+    Tiles (including those of other requests arriving within the batching window) are
+    packed into as few upstream prompts as the token budget allows.
+    """
+    if not XAI_API_KEY:
+        raise HTTPException(status_code=500, detail="API Key not set")
+
+    tiles = request.get("tiles")
+    if not isinstance(tiles, list) or not tiles:
+        raise HTTPException(status_code=422, detail="'tiles' must be a non-empty list")
+    if any(not isinstance(t, dict) or "tile_id" not in t or t["tile_id"] is None for t in tiles):
+        raise HTTPException(status_code=422, detail="every tile needs a tile_id")
+    user_type = request.get("user_type", "urban planner")
+
+    answers = await asyncio.gather(
+        *(tile_batcher.submit(t, user_type) for t in tiles), return_exceptions=True
+    )
+    results = {}
+    for tile, answer in zip(tiles, answers):
+        if isinstance(answer, HTTPException):
+            answer = {"error": answer.detail}
+        elif isinstance(answer, Exception):
+            answer = {"error": str(answer)}
+        results[str(tile["tile_id"])] = answer
+    return {"results": results}
@@ -0,0 +1,104 @@
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import JSONResponse
+import datetime
+
+from app.services.batch_runner import dissolve
+from app.services.reduction_planner import PRECISION_BUDGETS
+from app.services.profile_jobs import (
+    AdmissionError, JOB_STAGE_WORKERS, job_manager, profile_stages
+)
+
+router = APIRouter()
+
+
+def _parse_date(value, name):
+    try:
+        return datetime.date.fromisoformat(value).isoformat()
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=422, detail=f"'{name}' must be an ISO date (YYYY-MM-DD)")
+
+
+@router.post("/jobs", status_code=202)
+def submit_job(request: dict, http_request: Request):
+    """
+    Queue a profile job: {"geojson": <geometry|Feature|FeatureCollection>,
+    "start_date": "YYYY-MM-DD", "end_date": "YYYY-MM-DD", "metrics": [...], "batched": bool,
+    "precision": "low" | "medium" | "high" | "full", "incremental": bool}.
+
+    Plain `def` so FastAPI runs it on its threadpool: the first job imports
+    get_data (and initializes Earth Engine), which must not block the event loop.
+    """
+    geojson = request.get("geojson")
+    if not isinstance(geojson, dict):
+        raise HTTPException(status_code=422, detail="'geojson' must be a GeoJSON object")
+    try:
+        geometry = dissolve(geojson)
+    except Exception as e:
+        raise HTTPException(status_code=422, detail=f"Invalid GeoJSON: {e}")
+    if geometry is None:
+        raise HTTPException(status_code=422, detail="GeoJSON has no geometry")
+
+    options = {"workers": JOB_STAGE_WORKERS, "batched": bool(request.get("batched", False)),
+               "incremental": bool(request.get("incremental", False))}
+    if "start_date" in request:
+        options["start_date"] = _parse_date(request["start_date"], "start_date")
+    if "end_date" in request:
+        options["end_date"] = _parse_date(request["end_date"], "end_date")
+    if options.get("start_date") and options.get("end_date") and options["start_date"] >= options["end_date"]:
+        raise HTTPException(status_code=422, detail="'start_date' must be before 'end_date'")
+
+    if "precision" in request:
+        if request["precision"] not in PRECISION_BUDGETS:
+            raise HTTPException(status_code=422,
+                                detail=f"'precision' must be one of {', '.join(PRECISION_BUDGETS)}")
+        options["precision"] = request["precision"]
+
+    metrics = request.get("metrics")
+    try:
+        stages = profile_stages(metrics)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    if metrics:
+        options["metrics"] = list(metrics)
+
+    client = http_request.client.host if http_request.client else None
+    try:
+        job = job_manager.submit(geometry, options, client=client, stages=stages)
+    except AdmissionError as e:
+        return JSONResponse(status_code=429, content={"detail": str(e)},
+                            headers={"Retry-After": str(e.retry_after)})
+    return {"job_id": job.id, "status": job.status, "status_url": f"/api/jobs/{job.id}"}
+
+
+@router.get("/jobs")
+def job_stats():
+    return job_manager.stats()
+
+
+@router.get("/jobs/{job_id}")
+def job_status(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.summary()
+
+
+@router.get("/jobs/{job_id}/result")
+def job_result(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.status != "done":
+        raise HTTPException(status_code=409, detail=f"Job is {job.status}" +
+                            (f": {job.error}" if job.error else ""))
+    return job.result
+
+
+@router.delete("/jobs/{job_id}")
+def cancel_job(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if not job_manager.cancel(job_id):
+        raise HTTPException(status_code=409, detail=f"Job is {job.status} and can't be cancelled")
+    return job.summary()
@@ -0,0 +1,88 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import Response
+
+from app.services.tile_store import MAX_NEAREST, get_tile_store
+from app.services.vector_tiles import MVT_MAX_ZOOM, get_vector_tiles
+
+router = APIRouter()
+
+# Plain `def` handlers: the first request loads the tiles and builds the index,
+# which runs on FastAPI's threadpool instead of blocking the event loop.
+
+
+def _store():
+    try:
+        return get_tile_store()
+    except (OSError, ValueError) as e:
+        raise HTTPException(status_code=503, detail=f"Tile store unavailable: {e}")
+
+
+def _fields(fields):
+    return [f for f in fields.split(",") if f] if fields else None
+
+
+def _lonlat(lon, lat):
+    if not (-180 <= lon <= 180 and -90 <= lat <= 90):
+        raise HTTPException(status_code=422, detail="lon/lat out of range")
+
+
+@router.get("/tiles/info")
+def tiles_info():
+    store = _store()
+    return {**store.stats(), "vector_tiles": get_vector_tiles().stats()}
+
+
+@router.get("/tiles/bbox")
+def tiles_bbox(bbox: str, limit: int = None, fields: str = None, geometry: bool = True):
+    """
+    Tiles intersecting bbox=minLon,minLat,maxLon,maxLat. `fields` (comma-separated)
+    limits the returned properties; geometry=false drops the geometries.
+    """
+    try:
+        min_x, min_y, max_x, max_y = (float(v) for v in bbox.split(","))
+    except ValueError:
+        raise HTTPException(status_code=422, detail="'bbox' must be minLon,minLat,maxLon,maxLat")
+    if min_x > max_x or min_y > max_y:
+        raise HTTPException(status_code=422, detail="'bbox' min must not exceed max")
+    store = _store()
+    return store.collection(store.bbox(min_x, min_y, max_x, max_y, limit=limit), _fields(fields), geometry)
+
+
+@router.get("/tiles/point")
+def tiles_point(lon: float, lat: float, fields: str = None, geometry: bool = True):
+    """The tile under a clicked point (empty FeatureCollection outside the grid)."""
+    _lonlat(lon, lat)
+    store = _store()
+    return store.collection(store.point(lon, lat), _fields(fields), geometry)
+
+
+@router.get("/tiles/nearest")
+def tiles_nearest(lon: float, lat: float, k: int = 1, fields: str = None, geometry: bool = True):
+    """The k tiles nearest to a point, closest first; each feature carries its 'distance' (degrees)."""
+    _lonlat(lon, lat)
+    if not 1 <= k <= MAX_NEAREST:
+        raise HTTPException(status_code=422, detail=f"'k' must be between 1 and {MAX_NEAREST}")
+    store = _store()
+    features = []
+    for i, distance in store.nearest(lon, lat, k):
+        feature = store.feature(i, _fields(fields), geometry)
+        feature["distance"] = distance
+        features.append(feature)
+    return {"type": "FeatureCollection", "features": features}
+
+
+@router.get("/tiles/{z}/{x}/{y}.mvt")
+def tiles_mvt(z: int, x: int, y: int, fields: str = None):
+    """
+    Mapbox Vector Tile z/x/y (layer 'tiles'), with geometries simplified for the zoom
+    and the zoom's property list (or `fields`, comma-separated).
+    """
+    if not 0 <= z <= MVT_MAX_ZOOM or not (0 <= x < 2 ** z and 0 <= y < 2 ** z):
+        raise HTTPException(status_code=404, detail="Tile out of range")
+    _store()
+    try:
+        data = get_vector_tiles().tile(z, x, y, _fields(fields))
+    except RuntimeError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    return Response(content=data, media_type="application/vnd.mapbox-vector-tile",
+                    headers={"Cache-Control": "public, max-age=3600"})
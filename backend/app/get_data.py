@@ -1,845 +1,2071 @@
-import ee
-import json
-import sys
-import datetime
-import math
-from shapely.geometry import shape
-import geopandas as gpd
-
-# Initialize Earth Engine
-try:
-    ee.Initialize(project='projectproject-471216')
-except Exception as e:
-    raise RuntimeError("ee.Initialize() failed. Run `earthengine authenticate` then try again.") from e
-
-# ---------- CONFIG ----------
-DEFAULT_BBOX = [72.5, 22.9, 72.65, 23.05]  # Ahmedabad default bbox
-
-START_DATE = "2022-01-01"
-END_DATE = "2022-12-31"
-
-NDVI_GREEN_THRESH = 0.3
-
-# Dataset IDs
-GPW_POP_DENSITY = "CIESIN/GPWv411/GPW_Population_Density"
-SENTINEL2 = "COPERNICUS/S2_SR_HARMONIZED"
-MODIS_LST = "MODIS/061/MOD11A2"
-MAIAC_AOD = "MODIS/061/MCD19A2_GRANULES"
-SRTM = "USGS/SRTMGL1_003"
-GPM_IMERG = "NASA/GPM_L3/IMERG_V07"
-WORLD_COVER = "ESA/WorldCover/v100"
-JRC_GSW = "JRC/GSW1_4/GlobalSurfaceWater"
-
-MAX_PIXELS = 1e13
-
-
-# ---------- HELPERS ----------
-# def read_geojson_to_eegeom(geojson_path=None):
-#     """Return an ee.Geometry from GeoJSON file path, or default bbox if None."""
-#     if geojson_path:
-#         gdf = gpd.read_file(geojson_path)
-#         geom = gdf.unary_union
-#         geojson = json.loads(gpd.GeoSeries([geom]).to_json())['features'][0]['geometry']
-#         ee_geom = ee.Geometry(geojson)
-#         return ee_geom, geojson
-#     else:
-#         minLon, minLat, maxLon, maxLat = DEFAULT_BBOX
-#         ee_geom = ee.Geometry.Rectangle([minLon, minLat, maxLon, maxLat])
-#         geojson = ee_geom.getInfo()
-#         return ee_geom, geojson
-
-def read_geojson_to_eegeom(geojson_path=None):
-    """Return an ee.Geometry from GeoJSON file path, or default bbox if None."""
-    if geojson_path:
-        try:
-            print(f"Reading GeoJSON file: {geojson_path}")
-            gdf = gpd.read_file(geojson_path)
-
-            if gdf.empty:
-                print("⚠️ GeoJSON is empty! Using default bbox instead.")
-                raise ValueError("Empty GeoJSON")
-
-            geom = gdf.unary_union
-            geojson = json.loads(gpd.GeoSeries([geom]).to_json())['features'][0]['geometry']
-
-            ee_geom = ee.Geometry(geojson)
-
-            # ✅ Print coordinates for verification
-            bounds = ee_geom.bounds().getInfo()
-            print(f"✅ Using AOI bounds: {bounds}")
-
-            return ee_geom, geojson
-
-        except Exception as e:
-            print("⚠️ Failed to read GeoJSON file:", e)
-            print("➡️ Falling back to default bbox (Ahmedabad).")
-
-    # ---------- Fallback ----------
-    minLon, minLat, maxLon, maxLat = DEFAULT_BBOX
-    ee_geom = ee.Geometry.Rectangle([minLon, minLat, maxLon, maxLat])
-    geojson = ee_geom.getInfo()
-    print(f"✅ Using default bbox: {geojson['coordinates']}")
-    return ee_geom, geojson
-
-def safe_getinfo(obj):
-    try:
-        return obj.getInfo()
-    except Exception as e:
-        print("Warning: getInfo() failed:", e)
-        return None
-
-
-def reduce_mean(image, geometry, scale):
-    rr = image.reduceRegion(
-        reducer=ee.Reducer.mean(),
-        geometry=geometry,
-        scale=scale,
-        maxPixels=MAX_PIXELS
-    )
-    return safe_getinfo(rr)
-
-
-def reduce_sum(image, geometry, scale):
-    rr = image.reduceRegion(
-        reducer=ee.Reducer.sum(),
-        geometry=geometry,
-        scale=scale,
-        maxPixels=MAX_PIXELS
-    )
-    return safe_getinfo(rr)
-
-
-# # ---------- LAYER FUNCTIONS ----------
-# def get_population_density_sedac(aoi, year=2020):
-#     """Fetch mean population density for AOI using SEDAC GPWv4.11."""
-#     try:
-#         # ✅ Fixed: Each year is a separate image
-#         img = ee.Image(f"CIESIN/GPWv411/GPW_Population_Density/{year}")
-#         img_band = img.select('population_density')
-
-#         stats = img_band.reduceRegion(
-#             reducer=ee.Reducer.mean(),
-#             geometry=aoi,
-#             scale=1000,
-#             maxPixels=1e13
-#         )
-
-#         stats_i = stats.getInfo()
-#         pop_val = list(stats_i.values())[0] if stats_i else None
-
-#         return {
-#             'population_density_mean_per_km2': pop_val,
-#             'gpw_year': year
-#         }
-
-#     except Exception as e:
-#         print("Population density fetch error:", e)
-#         return {
-#             'population_density_mean_per_km2': None,
-#             'gpw_year': year
-#         }
-
-
-def get_population_density_worldpop(aoi, year=2020):
-    """Fetch mean population density using WorldPop."""
-    try:
-        img = ee.ImageCollection("WorldPop/GP/100m/pop") \
-            .filterDate(f"{year}-01-01", f"{year}-12-31") \
-            .mean()  # Take average of year
-        
-        stats = img.reduceRegion(
-            reducer=ee.Reducer.mean(),
-            geometry=aoi,
-            scale=100,
-            maxPixels=1e13
-        )
-        stats_i = stats.getInfo()
-        pop_val = list(stats_i.values())[0] if stats_i else None
-
-        return {
-            'population_density_mean_per_km2': pop_val,
-            'source': 'WorldPop/GP/100m/pop',
-            'year': year
-        }
-
-    except Exception as e:
-        print("Population density fetch error:", e)
-        return {
-            'population_density_mean_per_km2': None,
-            'source': 'WorldPop/GP/100m/pop',
-            'year': year
-        }
-
-
-def get_ndvi_stats(aoi, start_date, end_date):
-    s2 = ee.ImageCollection(SENTINEL2) \
-        .filterDate(start_date, end_date) \
-        .filterBounds(aoi) \
-        .filter(ee.Filter.lt('CLOUDY_PIXEL_PERCENTAGE', 40)) \
-        .select(['B8', 'B4'])
-
-    def ndvi_fn(img):
-        return img.normalizedDifference(['B8', 'B4']).rename('NDVI')
-
-    ndvi_col = s2.map(ndvi_fn)
-    ndvi_med = ndvi_col.median().select('NDVI')
-    ndvi_mean = reduce_mean(ndvi_med, aoi, scale=10)
-
-    mask = ndvi_med.gt(NDVI_GREEN_THRESH)
-    mask_sum = mask.reduceRegion(ee.Reducer.sum(), aoi, scale=10, maxPixels=MAX_PIXELS)
-    count = ndvi_med.reduceRegion(ee.Reducer.count(), aoi, scale=10, maxPixels=MAX_PIXELS)
-
-    mask_sum_i = safe_getinfo(mask_sum)
-    count_i = safe_getinfo(count)
-    pct_green = None
-    if mask_sum_i and count_i:
-        try:
-            s = list(mask_sum_i.values())[0]
-            t = list(count_i.values())[0]
-            pct_green = (s / t) if (t and t != 0) else None
-        except Exception:
-            pct_green = None
-    ndvi_val = list(ndvi_mean.values())[0] if ndvi_mean else None
-    return {'ndvi_mean': ndvi_val, 'pct_green': pct_green}
-
-
-def get_lst_stats(aoi, start_date, end_date):
-    col = ee.ImageCollection(MODIS_LST).filterDate(start_date, end_date).filterBounds(aoi)
-    img = col.select('LST_Day_1km').mean()
-    stats = reduce_mean(img, aoi, scale=1000)
-    raw_mean = list(stats.values())[0] if stats else None
-    lst_c = None
-    if raw_mean is not None:
-        lst_c = (raw_mean * 0.02) - 273.15
-    return {'lst_mean_celsius_est': lst_c, 'lst_raw_mean': raw_mean}
-
-
-def get_aod_stats(aoi, start_date, end_date):
-    col = ee.ImageCollection(MAIAC_AOD).filterDate(start_date, end_date).filterBounds(aoi)
-    first = col.first()
-    band_names = []
-    try:
-        band_names = first.bandNames().getInfo()
-    except Exception:
-        band_names = []
-    chosen = None
-    for b in ['Optical_Depth_047', 'Optical_Depth_055', 'AOD_047', 'AOD_550']:
-        if b in band_names:
-            chosen = b
-            break
-    if not chosen and band_names:
-        chosen = band_names[0]
-    if not chosen:
-        return {'aod_mean': None, 'aod_band_used': None}
-    mean_img = col.select(chosen).mean()
-    stats = reduce_mean(mean_img, aoi, scale=1000)
-    mean_val = list(stats.values())[0] if stats else None
-    return {'aod_mean': mean_val, 'aod_band_used': chosen}
-
-
-def get_elevation_stats(aoi):
-    dem = ee.Image(SRTM)
-    stats = reduce_mean(dem, aoi, scale=30)
-    elev = list(stats.values())[0] if stats else None
-    return {'elevation_mean_m': elev}
-
-
-def get_precipitation_total(aoi, start_date, end_date):
-    col = ee.ImageCollection(GPM_IMERG).filterDate(start_date, end_date).filterBounds(aoi)
-    first = col.first()
-    band_names = []
-    try:
-        band_names = first.bandNames().getInfo()
-    except Exception:
-        band_names = []
-    chosen = None
-    for b in ['precipitationCal', 'precipitation', 'precipitationCal_1km']:
-        if b in band_names:
-            chosen = b
-            break
-    if not chosen and band_names:
-        chosen = band_names[0]
-    if not chosen:
-        return {'precip_total': None, 'precip_band_used': None}
-    precip_sum = col.select(chosen).sum()
-    stats = reduce_mean(precip_sum, aoi, scale=1000)
-    val = list(stats.values())[0] if stats else None
-    return {'precip_total_mean_mm': val, 'precip_band_used': chosen}
-
-
-def get_landcover_stats(aoi):
-    wc_image = ee.ImageCollection(WORLD_COVER).first().select('Map')
-    hist = wc_image.reduceRegion(
-        ee.Reducer.frequencyHistogram(),
-        aoi,
-        scale=10,
-        maxPixels=MAX_PIXELS
-    )
-    hist_i = safe_getinfo(hist)
-    dominant = None
-    if hist_i:
-        try:
-            d = list(hist_i.values())[0]
-            items = [(int(k), int(v)) for k, v in d.items()]
-            items.sort(key=lambda x: x[1], reverse=True)
-            dominant = items[0][0] if items else None
-        except Exception:
-            dominant = None
-    return {'landcover_dominant_class': dominant}
-
-
-def get_water_proximity_and_floodscore(aoi, start_date, end_date):
-    occ = ee.Image(JRC_GSW).select('occurrence')
-    persistent = occ.gte(50)
-    distance = persistent.Not().fastDistanceTransform(30).sqrt()
-    occ_mean = reduce_mean(occ, aoi, scale=30)
-    occ_val = list(occ_mean.values())[0] if occ_mean else None
-
-    elev = get_elevation_stats(aoi)['elevation_mean_m']
-    precip = get_precipitation_total(aoi, start_date, end_date)['precip_total_mean_mm']
-
-    elev_norm = max(0.0, min(1.0, 1.0 - (elev / 200.0))) if elev is not None else None
-    precip_norm = max(0.0, min(1.0, precip / 2000.0)) if precip is not None else None
-    occ_norm = max(0.0, min(1.0, occ_val / 100.0)) if occ_val is not None else None
-
-    components, weights = [], []
-    if elev_norm is not None:
-        components.append(elev_norm); weights.append(0.4)
-    if precip_norm is not None:
-        components.append(precip_norm); weights.append(0.4)
-    if occ_norm is not None:
-        components.append(occ_norm); weights.append(0.2)
-
-    flood_score = sum([c*w for c, w in zip(components, weights)]) / sum(weights) if components else None
-    return {'water_occurrence_mean': occ_val, 'flood_risk_score': flood_score}
-
-
-# ---------- SUITABILITY HEURISTICS ----------
-def compute_suitabilities(profile):
-    def g(k):
-        return profile.get(k)
-
-    pop = g('population_density_mean_per_km2') or 0
-    ndvi = g('ndvi_mean') or 0.0
-    pct_green = g('pct_green') or 0.0
-    lst = g('lst_mean_celsius_est') or 0.0
-    aod = g('aod_mean') or 0.0
-    flood = g('flood_risk_score') or 0.0
-
-    pop_norm = max(0.0, min(1.0, pop / 10000.0))
-    ndvi_norm = max(0.0, min(1.0, (ndvi + 0.2) / 0.8))
-    lst_norm = max(0.0, min(1.0, (lst - 20.0) / 25.0))
-    aod_norm = max(0.0, min(1.0, aod / 1.0))
-    flood_norm = max(0.0, min(1.0, flood))
-
-    greenspace_priority = (0.5 * pop_norm) + (0.3 * (1 - ndvi_norm)) + (0.2 * lst_norm)
-    greenspace_priority = max(0.0, min(1.0, greenspace_priority))
-
-    industry_score = (0.5 * (1 - pop_norm)) + (0.4 * (1 - flood_norm)) + (0.1 * (1 - aod_norm))
-    industry_score = max(0.0, min(1.0, industry_score))
-
-    res_score = (0.4 * (1 - flood_norm)) + (0.3 * (1 - aod_norm)) + (0.3 * pct_green)
-    res_score = max(0.0, min(1.0, res_score))
-
-    return {
-        'greenspace_priority': greenspace_priority,
-        'industrial_suitability': industry_score,
-        'residential_suitability': res_score,
-        'best_use': (
-            'greenspace' if greenspace_priority >= max(industry_score, res_score)
-            else ('residential' if res_score >= industry_score else 'industrial')
-        )
-    }
-
-
-# ---------- MAIN ----------
-def build_profile(aoi_ee, geojson_geom, start_date=START_DATE, end_date=END_DATE):
-    profile = {}
-    profile['generated_at'] = datetime.datetime.now(datetime.UTC).isoformat()
-    profile['analysis_window'] = {'start': start_date, 'end': end_date}
-    profile['geometry'] = geojson_geom
-
-    print("Collecting population density...")
-    # profile.update(get_population_density_sedac(aoi_ee, year=2020))
-    profile.update(get_population_density_worldpop(aoi_ee, year=2020))
-
-
-    print("Collecting NDVI stats (Sentinel-2 median)...")
-    profile.update(get_ndvi_stats(aoi_ee, start_date, end_date))
-
-    print("Collecting LST stats (MODIS)...")
-    profile.update(get_lst_stats(aoi_ee, start_date, end_date))
-
-    print("Collecting AOD stats (MAIAC)...")
-    profile.update(get_aod_stats(aoi_ee, start_date, end_date))
-
-    print("Collecting elevation (SRTM)...")
-    profile.update(get_elevation_stats(aoi_ee))
-
-    print("Collecting precipitation (GPM IMERG)...")
-    profile.update(get_precipitation_total(aoi_ee, start_date, end_date))
-
-    print("Collecting landcover (ESA WorldCover)...")
-    profile.update(get_landcover_stats(aoi_ee))
-
-    print("Collecting water occurrence & flood proxy...")
-    profile.update(get_water_proximity_and_floodscore(aoi_ee, start_date, end_date))
-
-    print("Computing suitabilities...")
-    profile['suitability'] = compute_suitabilities(profile)
-
-    return profile
-
-
-if __name__ == "__main__":
-    # Use aoi.geojson by default, but allow command line override
-    geojson_path = sys.argv[1] if len(sys.argv) > 1 else "aoi.geojson"
-    print("Using GeoJSON:", geojson_path)
-
-    aoi_ee, geojson_geom = read_geojson_to_eegeom(geojson_path)
-    result = build_profile(aoi_ee, geojson_geom, start_date=START_DATE, end_date=END_DATE)
-
-    out_file = "aoi_profile.json"
-    with open(out_file, "w") as f:
-        json.dump(result, f, indent=2)
-    print(f"Saved AOI profile to {out_file}")
-
-    print("SUMMARY:")
-    print(" Population density (mean):", result.get('population_density_mean_per_km2'))
-    print(" NDVI mean:", result.get('ndvi_mean'), "Pct green:", result.get('pct_green'))
-    print(" LST (C):", result.get('lst_mean_celsius_est'))
-    print(" AOD (mean):", result.get('aod_mean'))
-    print(" Elevation (m mean):", result.get('elevation_mean_m'))
-    print(" Precip total (mm mean):", result.get('precip_total_mean_mm'))
-    print(" Flood risk score (0..1):", result.get('flood_risk_score'))
-    print(" Suitability:", result.get('suitability'))
-
-# #!/usr/bin/env python3
-# """
-# gather_aoi_data.py
-
-# Usage:
-#     python gather_aoi_data.py [path_to_geojson]
-
-# This script:
-#  - Loads an AOI from a GeoJSON file (or uses a default bbox).
-#  - Uses the Google Earth Engine Python API to collect:
-#     - Population density (CIESIN GPWv4.11)
-#     - NDVI (Sentinel-2 median)
-#     - Land Surface Temperature (MODIS MOD11A2 -> Celsius)
-#     - MAIAC AOD (MCD19A2_GRANULES)
-#     - Elevation (SRTM)
-#     - Precipitation total (GPM IMERG)
-#     - Land cover (ESA WorldCover v100)
-#     - Water occurrence (JRC GlobalSurfaceWater) -> used for flood proximity
-#  - Computes summary stats and simple suitability heuristics
-#  - Saves results to 'aoi_profile.json'
-# Notes:
-#  - Make sure you've run `earthengine authenticate` and have ee.Initialize() access.
-#  - For very large AOIs you may want to export images instead of using reduceRegion/getInfo.
-# """
-
-# import ee
-# import json
-# import sys
-# import datetime
-# import math
-# from shapely.geometry import shape
-# import geopandas as gpd
-
-# # Initialize Earth Engine
-# try:
-#     ee.Initialize(project='projectproject-471216')
-# except Exception as e:
-#     raise RuntimeError("ee.Initialize() failed. Run `earthengine authenticate` then try again.") from e
-
-# # ---------- CONFIG ----------
-# # Default bbox as fallback: Ahmedabad small bbox (minLon, minLat, maxLon, maxLat)
-# DEFAULT_BBOX = [72.5, 22.9, 72.65, 23.05]
-
-# # Time window for time-aware layers
-# START_DATE = "2022-01-01"
-# END_DATE   = "2022-12-31"
-
-# # NDVI threshold to consider "green"
-# NDVI_GREEN_THRESH = 0.3
-
-# # Dataset IDs (Earth Engine)
-# GPW_POP_DENSITY = "CIESIN/GPWv411/GPW_Population_Count"
-# SENTINEL2 = "COPERNICUS/S2_SR_HARMONIZED"
-# MODIS_LST = "MODIS/061/MOD11A2"
-# MAIAC_AOD = "MODIS/061/MCD19A2_GRANULES"
-# SRTM = "USGS/SRTMGL1_003"
-# GPM_IMERG = "NASA/GPM_L3/IMERG_V07"
-# WORLD_COVER = "ESA/WorldCover/v100"
-# JRC_GSW = "JRC/GSW1_4/GlobalSurfaceWater"
-
-# # Reduction parameters
-# MAX_PIXELS = 1e13
-
-# # ---------- HELPERS ----------
-# def read_geojson_to_eegeom(geojson_path=None):
-#     """Return an ee.Geometry from GeoJSON file path, or default bbox if None."""
-#     if geojson_path:
-#         gdf = gpd.read_file(geojson_path)
-#         # unify into single geometry (dissolve)
-#         geom = gdf.unary_union
-#         geojson = json.loads(gpd.GeoSeries([geom]).to_json())['features'][0]['geometry']
-#         ee_geom = ee.Geometry(geojson)
-#         return ee_geom, geojson
-#     else:
-#         minLon, minLat, maxLon, maxLat = DEFAULT_BBOX
-#         ee_geom = ee.Geometry.Rectangle([minLon, minLat, maxLon, maxLat])
-#         geojson = ee_geom.getInfo()
-#         return ee_geom, geojson
-
-# def safe_getinfo(obj):
-#     try:
-#         return obj.getInfo()
-#     except Exception as e:
-#         print("Warning: getInfo() failed:", e)
-#         return None
-
-# def reduce_mean(image, geometry, scale):
-#     """Return mean value dictionary for image over geometry"""
-#     rr = image.reduceRegion(
-#         reducer=ee.Reducer.mean(),
-#         geometry=geometry,
-#         scale=scale,
-#         maxPixels=MAX_PIXELS
-#     )
-#     return safe_getinfo(rr)
-
-# def reduce_sum(image, geometry, scale):
-#     rr = image.reduceRegion(
-#         reducer=ee.Reducer.sum(),
-#         geometry=geometry,
-#         scale=scale,
-#         maxPixels=MAX_PIXELS
-#     )
-#     return safe_getinfo(rr)
-
-# # ---------- LAYER FUNCTIONS ----------
-# def get_population_density_sedac(aoi, year=2020):
-#     """
-#     Fetch mean population density for the AOI using SEDAC GPWv4.11.
-#     Returns density in people per km².
-#     """
-#     try:
-#         img = ee.Image("CIESIN/GPWv411/GPW_Population_Density")
-#         # GPWv4.11 has bands for different years: 'pd_2020', 'pd_2015', etc.
-#         band_name = f'pd_{year}'
-#         img_band = img.select(band_name)
-
-#         stats = img_band.reduceRegion(
-#             reducer=ee.Reducer.mean(),
-#             geometry=aoi,
-#             scale=1000,  # GPW is ~1km resolution
-#             maxPixels=1e13
-#         )
-
-#         stats_i = stats.getInfo()
-#         pop_val = list(stats_i.values())[0] if stats_i else None
-
-#         return {
-#             'population_density_mean_per_km2': pop_val,
-#             'gpw_year': year
-#         }
-
-#     except Exception as e:
-#         print("Population density fetch error:", e)
-#         return {
-#             'population_density_mean_per_km2': None,
-#             'gpw_year': year
-#         }
-
-
-
-
-
-
-# def get_ndvi_stats(aoi, start_date, end_date):
-#     s2 = ee.ImageCollection(SENTINEL2) \
-#           .filterDate(start_date, end_date) \
-#           .filterBounds(aoi) \
-#           .filter(ee.Filter.lt('CLOUDY_PIXEL_PERCENTAGE', 40)) \
-#           .select(['B8', 'B4'])
-
-#     def ndvi_fn(img):
-#         return img.normalizedDifference(['B8', 'B4']).rename('NDVI')
-#     ndvi_col = s2.map(ndvi_fn)
-#     ndvi_med = ndvi_col.median().select('NDVI')
-#     ndvi_mean = reduce_mean(ndvi_med, aoi, scale=10)
-#     # Percent green: compute ratio of pixels with NDVI > threshold
-#     mask = ndvi_med.gt(NDVI_GREEN_THRESH)
-#     # sum of mask (true=1) and count of pixels
-#     mask_sum = mask.reduceRegion(ee.Reducer.sum(), aoi, scale=10, maxPixels=MAX_PIXELS)
-#     count = ndvi_med.reduceRegion(ee.Reducer.count(), aoi, scale=10, maxPixels=MAX_PIXELS)
-#     mask_sum_i = safe_getinfo(mask_sum)
-#     count_i = safe_getinfo(count)
-#     pct_green = None
-#     if mask_sum_i and count_i:
-#         try:
-#             s = list(mask_sum_i.values())[0]
-#             t = list(count_i.values())[0]
-#             pct_green = (s / t) if (t and t != 0) else None
-#         except Exception:
-#             pct_green = None
-#     ndvi_val = list(ndvi_mean.values())[0] if ndvi_mean else None
-#     return {'ndvi_mean': ndvi_val, 'pct_green': pct_green}
-
-# def get_lst_stats(aoi, start_date, end_date):
-#     col = ee.ImageCollection(MODIS_LST).filterDate(start_date, end_date).filterBounds(aoi)
-#     # Use LST_Day_1km
-#     img = col.select('LST_Day_1km').mean()
-#     stats = reduce_mean(img, aoi, scale=1000)
-#     raw_mean = list(stats.values())[0] if stats else None
-#     lst_c = None
-#     if raw_mean is not None:
-#         # Apply MODIS LST typical scale factor 0.02 and convert Kelvin to Celsius
-#         lst_c = (raw_mean * 0.02) - 273.15
-#     return {'lst_mean_celsius_est': lst_c, 'lst_raw_mean': raw_mean}
-
-# def get_aod_stats(aoi, start_date, end_date):
-#     col = ee.ImageCollection(MAIAC_AOD).filterDate(start_date, end_date).filterBounds(aoi)
-#     first = col.first()
-#     band_names = []
-#     try:
-#         band_names = first.bandNames().getInfo()
-#     except Exception:
-#         band_names = []
-#     chosen = None
-#     for b in ['Optical_Depth_047', 'Optical_Depth_055', 'AOD_047', 'AOD_550']:
-#         if b in band_names:
-#             chosen = b
-#             break
-#     if not chosen and band_names:
-#         chosen = band_names[0]
-#     if not chosen:
-#         return {'aod_mean': None, 'aod_band_used': None}
-#     mean_img = col.select(chosen).mean()
-#     stats = reduce_mean(mean_img, aoi, scale=1000)
-#     mean_val = list(stats.values())[0] if stats else None
-#     return {'aod_mean': mean_val, 'aod_band_used': chosen}
-
-# def get_elevation_stats(aoi):
-#     dem = ee.Image(SRTM)
-#     stats = reduce_mean(dem, aoi, scale=30)
-#     elev = list(stats.values())[0] if stats else None
-#     return {'elevation_mean_m': elev}
-
-# def get_precipitation_total(aoi, start_date, end_date):
-#     col = ee.ImageCollection(GPM_IMERG).filterDate(start_date, end_date).filterBounds(aoi)
-#     first = col.first()
-#     # detect band
-#     band_names = []
-#     try:
-#         band_names = first.bandNames().getInfo()
-#     except Exception:
-#         band_names = []
-#     chosen = None
-#     for b in ['precipitationCal', 'precipitation', 'precipitationCal_1km']:
-#         if b in band_names:
-#             chosen = b
-#             break
-#     if not chosen and band_names:
-#         chosen = band_names[0]
-#     if not chosen:
-#         return {'precip_total': None, 'precip_band_used': None}
-#     precip_sum = col.select(chosen).sum()
-#     stats = reduce_mean(precip_sum, aoi, scale=1000)
-#     val = list(stats.values())[0] if stats else None
-#     return {'precip_total_mean_mm': val, 'precip_band_used': chosen}
-
-# def get_landcover_stats(aoi):
-#     # Get first image from collection
-#     wc_image = ee.ImageCollection(WORLD_COVER).first().select('Map')
-    
-#     # frequency histogram
-#     hist = wc_image.reduceRegion(
-#         ee.Reducer.frequencyHistogram(),
-#         aoi,
-#         scale=10,
-#         maxPixels=MAX_PIXELS
-#     )
-#     hist_i = safe_getinfo(hist)
-#     dominant = None
-#     if hist_i:
-#         try:
-#             d = list(hist_i.values())[0]
-#             items = [(int(k), int(v)) for k, v in d.items()]
-#             items.sort(key=lambda x: x[1], reverse=True)
-#             dominant = items[0][0] if items else None
-#         except Exception:
-#             dominant = None
-#     return {'landcover_dominant_class': dominant}
-
-
-# def get_water_proximity_and_floodscore(aoi, start_date, end_date):
-#     # JRC GlobalSurfaceWater occurrence band indicates percent of time water seen; use >50% as persistent water
-#     occ = ee.Image(JRC_GSW).select('occurrence')
-#     # create mask of persistent water
-#     persistent = occ.gte(50)
-#     # compute distance to persistent water (meters)
-#     distance = persistent.Not().fastDistanceTransform(30).sqrt()  # alternative methods exist
-#     # Note: EE distance transforms may be awkward. Simpler: buffer water and check proximity by reduction of min distance.
-#     # We'll compute mean occurrence (low occurrence -> less water), use elevation & precipitation to compute a simple flood score.
-#     occ_mean = reduce_mean(occ, aoi, scale=30)
-#     occ_val = list(occ_mean.values())[0] if occ_mean else None
-
-#     # Use elevation and precipitation to combine flood-like risk (lower elevation + higher precip)
-#     elev = get_elevation_stats(aoi)['elevation_mean_m']
-#     precip = get_precipitation_total(aoi, start_date, end_date)['precip_total_mean_mm']
-#     # Normalize simple flood score between 0 and 1:
-#     # low elevation => more risk (we'll map elevation to 0..1 by using a heuristic: 0 m -> 1, 200 m -> 0)
-#     elev_norm = None
-#     if elev is not None:
-#         elev_norm = max(0.0, min(1.0, 1.0 - (elev / 200.0)))
-#     # precip norm: assume 0-2000 mm range
-#     precip_norm = None
-#     if precip is not None:
-#         precip_norm = max(0.0, min(1.0, precip / 2000.0))
-#     # occurrence of water increases flood propensity
-#     occ_norm = None
-#     if occ_val is not None:
-#         occ_norm = max(0.0, min(1.0, occ_val / 100.0))
-#     # combine: flood_score = weighted sum
-#     components = []
-#     weights = []
-#     if elev_norm is not None:
-#         components.append(elev_norm); weights.append(0.4)
-#     if precip_norm is not None:
-#         components.append(precip_norm); weights.append(0.4)
-#     if occ_norm is not None:
-#         components.append(occ_norm); weights.append(0.2)
-#     flood_score = None
-#     if components:
-#         # weighted average
-#         flood_score = sum([c*w for c,w in zip(components, weights)]) / sum(weights)
-#     return {'water_occurrence_mean': occ_val, 'flood_risk_score': flood_score}
-
-# # ---------- SUITABILITY HEURISTICS ----------
-# def compute_suitabilities(profile):
-#     """
-#     Very simple heuristic scores (0..1):
-#      - greenspace_priority: high when population density high, NDVI low, LST high
-#      - industrial_suitability: high when landcover non-residential, flood risk low, scent of nightlight/activity high (we don't compute nightlights here)
-#      - residential_suitability: medium when air quality ok, flood risk low, proximity to greenspace
-#     These are starting heuristics — you should refine with local policy weights.
-#     """
-#     # helper safe-get
-#     def g(k):
-#         return profile.get(k)
-
-#     pop = g('population_density_mean_per_km2') or 0
-#     ndvi = g('ndvi_mean') or 0.0
-#     pct_green = g('pct_green') or 0.0
-#     lst = g('lst_mean_celsius_est') or 0.0
-#     aod = g('aod_mean') or 0.0
-#     flood = g('flood_risk_score') or 0.0
-#     landclass = profile.get('landcover_dominant_class')
-
-#     # Normalize inputs to 0..1 with simple heuristics
-#     pop_norm = max(0.0, min(1.0, pop / 10000.0))   # 10k people/km2 -> 1
-#     ndvi_norm = max(0.0, min(1.0, (ndvi + 0.2) / 0.8))  # NDVI ~ -0.2..0.6 -> map
-#     lst_norm = max(0.0, min(1.0, (lst - 20.0) / 25.0))   # 20C -> 0, 45C -> 1
-#     aod_norm = max(0.0, min(1.0, aod / 1.0))   # AOD of 1.0 -> high
-#     flood_norm = max(0.0, min(1.0, flood))
-
-#     # Greenspace priority: want high pop, low ndvi, high lst
-#     greenspace_priority = (0.5 * pop_norm) + (0.3 * (1 - ndvi_norm)) + (0.2 * lst_norm)
-#     greenspace_priority = max(0.0, min(1.0, greenspace_priority))
-
-#     # Industrial suitability: prefer non-dense residential (low pop), low flood, low AOD constraint (we prefer areas where factory won't harm many)
-#     # For simplicity: industry good when pop low AND flood low AND landcover is 'non-built' OR 'sparsely built' (we'll penalize class 50: Built-up)
-#     industry_score = (0.5 * (1 - pop_norm)) + (0.4 * (1 - flood_norm)) + (0.1 * (1 - aod_norm))
-#     industry_score = max(0.0, min(1.0, industry_score))
-
-#     # Residential suitability: prefer low flood, low AOD, some green nearby (pct_green)
-#     res_score = (0.4 * (1 - flood_norm)) + (0.3 * (1 - aod_norm)) + (0.3 * pct_green)
-#     res_score = max(0.0, min(1.0, res_score))
-
-#     return {
-#         'greenspace_priority': greenspace_priority,
-#         'industrial_suitability': industry_score,
-#         'residential_suitability': res_score,
-#         'best_use': ('greenspace' if greenspace_priority >= max(industry_score, res_score)
-#                      else ('residential' if res_score >= industry_score else 'industrial'))
-#     }
-
-# # ---------- MAIN FLOW ----------
-# def build_profile(aoi_ee, geojson_geom, start_date=START_DATE, end_date=END_DATE):
-#     profile = {}
-#     profile['generated_at'] = datetime.datetime.now(datetime.UTC).isoformat()
-#     profile['analysis_window'] = {'start': start_date, 'end': end_date}
-#     profile['geometry'] = geojson_geom
-
-#     print("Collecting population density...")
-#     profile.update(get_population_density_sedac(aoi_ee, year=2020))
-
-
-
-#     print("Collecting NDVI stats (Sentinel-2 median)...")
-#     ndvi = get_ndvi_stats(aoi_ee, start_date, end_date)
-#     profile.update(ndvi)
-
-#     print("Collecting LST stats (MODIS)...")
-#     lst = get_lst_stats(aoi_ee, start_date, end_date)
-#     profile.update(lst)
-
-#     print("Collecting AOD stats (MAIAC)...")
-#     aod = get_aod_stats(aoi_ee, start_date, end_date)
-#     profile.update(aod)
-
-#     print("Collecting elevation (SRTM)...")
-#     elev = get_elevation_stats(aoi_ee)
-#     profile.update(elev)
-
-#     print("Collecting precipitation (GPM IMERG)...")
-#     precip = get_precipitation_total(aoi_ee, start_date, end_date)
-#     profile.update(precip)
-
-#     print("Collecting landcover (ESA WorldCover)...")
-#     lc = get_landcover_stats(aoi_ee)
-#     profile.update(lc)
-
-#     print("Collecting water occurrence & flood proxy...")
-#     flood = get_water_proximity_and_floodscore(aoi_ee, start_date, end_date)
-#     profile.update(flood)
-
-#     print("Computing suitabilities...")
-#     suits = compute_suitabilities(profile)
-#     profile['suitability'] = suits
-
-#     return profile
-
-# if __name__ == "__main__":
-#     geojson_path = sys.argv[1] if len(sys.argv) > 1 else None
-#     print("Using GeoJSON:", geojson_path if geojson_path else "default bbox")
-
-#     aoi_ee, geojson_geom = read_geojson_to_eegeom(geojson_path)
-
-#     # Build profile
-#     result = build_profile(aoi_ee, geojson_geom, start_date=START_DATE, end_date=END_DATE)
-
-#     # Save to file
-#     out_file = "aoi_profile.json"
-#     with open(out_file, "w") as f:
-#         json.dump(result, f, indent=2)
-#     print(f"Saved AOI profile to {out_file}")
-
-#     # Print concise summary
-#     print("SUMMARY:")
-#     print(" Population density (mean):", result.get('population_density_mean_per_km2'))
-#     print(" NDVI mean:", result.get('ndvi_mean'), "Pct green:", result.get('pct_green'))
-#     print(" LST (C):", result.get('lst_mean_celsius_est'))
-#     print(" AOD (mean):", result.get('aod_mean'))
-#     print(" Elevation (m mean):", result.get('elevation_mean_m'))
-#     print(" Precip total (mm mean):", result.get('precip_total_mean_mm'))
-#     print(" Flood risk score (0..1):", result.get('flood_risk_score'))
-#     print(" Suitability:", result.get('suitability'))
-
-    
-
-
-
+import json
+import os
+import sys
+import argparse
+import contextvars
+import datetime
+import math
+import time
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+if __package__ in (None, ""):
+    # Running as `python get_data.py` from backend/app: make the `app` package importable
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.ee_session import ee
+from app.services.profile_cache import ProfileCache, geometry_hash
+from app.services.band_registry import BandRegistry
+from app.services.instrumentation import dump_chrome_trace, enable_tracing, span, timed_getinfo
+from app.services.geometry import (
+    MAX_VERTICES, aoi_area_m2, geometry_bounds, simplified_geometry, vertex_count
+)
+from app.services.reduction_planner import DEFAULT_PRECISION, PRECISION_BUDGETS, ReductionPlan
+
+# Earth Engine is initialized on first use (see services/ee_session.py), and
+# geopandas / the shapely-based services are imported by the functions that need
+# them, so importing this module for its config or scoring functions stays cheap.
+
+# ---------- CONFIG ----------
+DEFAULT_BBOX = [72.5, 22.9, 72.65, 23.05]  # Ahmedabad default bbox
+
+START_DATE = "2022-01-01"
+END_DATE = "2022-12-31"
+
+NDVI_GREEN_THRESH = 0.3
+
+# Dataset IDs
+GPW_POP_DENSITY = "CIESIN/GPWv411/GPW_Population_Density"
+SENTINEL2 = "COPERNICUS/S2_SR_HARMONIZED"
+MODIS_LST = "MODIS/061/MOD11A2"
+MAIAC_AOD = "MODIS/061/MCD19A2_GRANULES"
+SRTM = "USGS/SRTMGL1_003"
+GPM_IMERG = "NASA/GPM_L3/IMERG_V07"
+WORLD_COVER = "ESA/WorldCover/v100"
+JRC_GSW = "JRC/GSW1_4/GlobalSurfaceWater"
+
+MAX_PIXELS = 1e13
+
+# Concurrent getInfo() requests made by build_profile (1 = sequential)
+PROFILE_WORKERS = 4
+
+
+# ---------- HELPERS ----------
+# def read_geojson_to_eegeom(geojson_path=None):
+#     """Return an ee.Geometry from GeoJSON file path, or default bbox if None."""
+#     if geojson_path:
+#         gdf = gpd.read_file(geojson_path)
+#         geom = gdf.unary_union
+#         geojson = json.loads(gpd.GeoSeries([geom]).to_json())['features'][0]['geometry']
+#         ee_geom = ee.Geometry(geojson)
+#         return ee_geom, geojson
+#     else:
+#         minLon, minLat, maxLon, maxLat = DEFAULT_BBOX
+#         ee_geom = ee.Geometry.Rectangle([minLon, minLat, maxLon, maxLat])
+#         geojson = ee_geom.getInfo()
+#         return ee_geom, geojson
+
+def read_geojson_geometry(geojson_path):
+    """Dissolve a GeoJSON file into one GeoJSON geometry (no Earth Engine needed)."""
+    import geopandas as gpd
+
+    print(f"Reading GeoJSON file: {geojson_path}")
+    gdf = gpd.read_file(geojson_path)
+
+    if gdf.empty:
+        print("⚠️ GeoJSON is empty! Using default bbox instead.")
+        raise ValueError("Empty GeoJSON")
+
+    geom = gdf.unary_union
+    return json.loads(gpd.GeoSeries([geom]).to_json())['features'][0]['geometry']
+
+
+def default_bbox_geometry():
+    minLon, minLat, maxLon, maxLat = DEFAULT_BBOX
+    ring = [[minLon, minLat], [maxLon, minLat], [maxLon, maxLat], [minLon, maxLat], [minLon, minLat]]
+    return {'type': 'Polygon', 'coordinates': [ring]}
+
+
+def prepare_geometry(geojson, max_vertices=MAX_VERTICES):
+    """Simplify (cached by hash) to the vertex budget and wrap as an ee.Geometry."""
+    simplified = simplified_geometry(geojson, max_vertices)
+    if simplified is not geojson:
+        print(f"Simplified AOI from {vertex_count(geojson)} to {vertex_count(simplified)} vertices")
+    return ee.Geometry(simplified), simplified
+
+
+def read_geojson_to_eegeom(geojson_path=None, max_vertices=MAX_VERTICES):
+    """Return (ee.Geometry, GeoJSON) from a GeoJSON file path, or the default bbox if None.
+
+    Bounds and area are computed locally; the geometry sent to Earth Engine (and kept
+    in the profile) is simplified to at most max_vertices vertices.
+    """
+    if geojson_path:
+        try:
+            geojson = read_geojson_geometry(geojson_path)
+
+            ee_geom, geojson = prepare_geometry(geojson, max_vertices)
+
+            # ✅ Print coordinates for verification
+            bounds = geometry_bounds(geojson)
+            print(f"✅ Using AOI bounds: {bounds} ({aoi_area_m2(geojson) / 1e6:.1f} km²)")
+
+            return ee_geom, geojson
+
+        except Exception as e:
+            print("⚠️ Failed to read GeoJSON file:", e)
+            print("➡️ Falling back to default bbox (Ahmedabad).")
+
+    # ---------- Fallback ----------
+    minLon, minLat, maxLon, maxLat = DEFAULT_BBOX
+    ee_geom = ee.Geometry.Rectangle([minLon, minLat, maxLon, maxLat])
+    geojson = default_bbox_geometry()
+    print(f"✅ Using default bbox: {geojson['coordinates']}")
+    return ee_geom, geojson
+
+def safe_getinfo(obj):
+    try:
+        return timed_getinfo(obj)
+    except Exception as e:
+        print("Warning: getInfo() failed:", e)
+        return None
+
+
+def reduce_mean(image, geometry, scale):
+    return get_backend().reduce(image, geometry, scale, 'mean')
+
+
+def reduce_sum(image, geometry, scale):
+    return get_backend().reduce(image, geometry, scale, 'sum')
+
+
+def reduce_count(image, geometry, scale):
+    return get_backend().reduce(image, geometry, scale, 'count')
+
+
+def reduce_histogram(image, geometry, scale):
+    return get_backend().reduce(image, geometry, scale, 'histogram')
+
+
+def first_value(stats):
+    """Return the single band value of a reduceRegion result (or None)."""
+    return list(stats.values())[0] if stats else None
+
+
+# ReductionPlan of the profile being built (set by build_profile, copied into its
+# worker threads); None reduces at the collectors' native scales.
+_plan = contextvars.ContextVar('reduction_plan', default=None)
+
+
+def plan_reduction(geojson_geom, precision=DEFAULT_PRECISION):
+    """ReductionPlan for the AOI, or None (native scales) when its geometry is missing or empty."""
+    if not geojson_geom or not geojson_geom.get('type'):
+        return None
+    area = aoi_area_m2(geojson_geom)
+    return ReductionPlan(area, precision) if area > 0 else None
+
+
+def reduction_params(scale):
+    """reduceRegion scale/tileScale/bestEffort for a layer whose native scale is `scale`."""
+    plan = _plan.get()
+    return {'scale': scale} if plan is None else plan.params(scale)
+
+
+def lazy_reduce(image, geometry, scale, reducer=None):
+    """Build a reduceRegion result without fetching it (stays an ee.Dictionary)."""
+    return image.reduceRegion(
+        reducer=reducer or ee.Reducer.mean(),
+        geometry=geometry,
+        maxPixels=MAX_PIXELS,
+        **reduction_params(scale)
+    )
+
+
+def lazy_choose_band(col, candidates):
+    """Server-side version of the candidate band lookup done in get_aod_stats/get_precipitation_total.
+
+    Picks the first candidate present on the first image, else its first band, else null
+    when the collection is empty. No getInfo() round-trip is needed.
+    """
+    names = ee.Image(col.first()).bandNames()
+    matches = ee.List(candidates).filter(ee.Filter.inList('item', names))
+    chosen = ee.Algorithms.If(matches.size().gt(0), matches.get(0), names.get(0))
+    return ee.Algorithms.If(col.size().gt(0), chosen, None)
+
+
+# # ---------- LAYER FUNCTIONS ----------
+# def get_population_density_sedac(aoi, year=2020):
+#     """Fetch mean population density for AOI using SEDAC GPWv4.11."""
+#     try:
+#         # ✅ Fixed: Each year is a separate image
+#         img = ee.Image(f"CIESIN/GPWv411/GPW_Population_Density/{year}")
+#         img_band = img.select('population_density')
+
+#         stats = img_band.reduceRegion(
+#             reducer=ee.Reducer.mean(),
+#             geometry=aoi,
+#             scale=1000,
+#             maxPixels=1e13
+#         )
+
+#         stats_i = stats.getInfo()
+#         pop_val = list(stats_i.values())[0] if stats_i else None
+
+#         return {
+#             'population_density_mean_per_km2': pop_val,
+#             'gpw_year': year
+#         }
+
+#     except Exception as e:
+#         print("Population density fetch error:", e)
+#         return {
+#             'population_density_mean_per_km2': None,
+#             'gpw_year': year
+#         }
+
+
+WORLDPOP = "WorldPop/GP/100m/pop"
+AOD_BANDS = ['Optical_Depth_047', 'Optical_Depth_055', 'AOD_047', 'AOD_550']
+PRECIP_BANDS = ['precipitationCal', 'precipitation', 'precipitationCal_1km']
+
+
+def _population_image(year):
+    return ee.ImageCollection(WORLDPOP) \
+        .filterDate(f"{year}-01-01", f"{year}-12-31") \
+        .mean()  # Take average of year
+
+
+def _population_fields(pop_val, year):
+    return {
+        'population_density_mean_per_km2': pop_val,
+        'source': WORLDPOP,
+        'year': year
+    }
+
+
+def get_population_density_worldpop(aoi, year=2020):
+    """Fetch mean population density using WorldPop."""
+    try:
+        img = get_backend().layer('population', aoi, f"{year}-01-01", f"{year}-12-31")
+        stats_i = reduce_mean(img, aoi, scale=100)
+        return _population_fields(first_value(stats_i), year)
+
+    except Exception as e:
+        print("Population density fetch error:", e)
+        return _population_fields(None, year)
+
+
+def _ndvi_collection(aoi, start_date, end_date):
+    s2 = ee.ImageCollection(SENTINEL2) \
+        .filterDate(start_date, end_date) \
+        .filterBounds(aoi) \
+        .filter(ee.Filter.lt('CLOUDY_PIXEL_PERCENTAGE', 40)) \
+        .select(['B8', 'B4'])
+
+    def ndvi_fn(img):
+        return img.normalizedDifference(['B8', 'B4']).rename('NDVI')
+
+    return s2.map(ndvi_fn)
+
+
+def _ndvi_median(aoi, start_date, end_date):
+    return _ndvi_collection(aoi, start_date, end_date).median().select('NDVI')
+
+
+def _ndvi_fields(ndvi_mean, mask_sum_i, count_i):
+    pct_green = None
+    if mask_sum_i and count_i:
+        try:
+            s = first_value(mask_sum_i)
+            t = first_value(count_i)
+            pct_green = (s / t) if (t and t != 0) else None
+        except Exception:
+            pct_green = None
+    return {'ndvi_mean': first_value(ndvi_mean), 'pct_green': pct_green}
+
+
+def get_ndvi_stats(aoi, start_date, end_date):
+    ndvi_med = get_backend().layer('ndvi', aoi, start_date, end_date)
+    ndvi_mean = reduce_mean(ndvi_med, aoi, scale=10)
+
+    mask = ndvi_med.gt(NDVI_GREEN_THRESH)
+    mask_sum_i = reduce_sum(mask, aoi, scale=10)
+    count_i = reduce_count(ndvi_med, aoi, scale=10)
+    return _ndvi_fields(ndvi_mean, mask_sum_i, count_i)
+
+
+def _lst_image(aoi, start_date, end_date):
+    col = ee.ImageCollection(MODIS_LST).filterDate(start_date, end_date).filterBounds(aoi)
+    return col.select('LST_Day_1km').mean()
+
+
+def _lst_fields(raw_mean):
+    lst_c = None
+    if raw_mean is not None:
+        lst_c = (raw_mean * 0.02) - 273.15
+    return {'lst_mean_celsius_est': lst_c, 'lst_raw_mean': raw_mean}
+
+
+def get_lst_stats(aoi, start_date, end_date):
+    img = get_backend().layer('lst', aoi, start_date, end_date)
+    stats = reduce_mean(img, aoi, scale=1000)
+    return _lst_fields(first_value(stats))
+
+
+def choose_band(band_names, candidates):
+    """Pick the first candidate present in band_names, else the first band (or None)."""
+    for b in candidates:
+        if b in band_names:
+            return b
+    return band_names[0] if band_names else None
+
+
+def get_aod_stats(aoi, start_date, end_date):
+    backend = get_backend()
+    band_names = backend.band_names('aod', aoi, start_date, end_date)
+    if band_names is None:
+        # schema not known locally: pick the band server-side in the reduction request
+        return resolve_band_server_side('aod', aoi, start_date, end_date)
+    chosen = choose_band(band_names, AOD_BANDS)
+    if not chosen:
+        return {'aod_mean': None, 'aod_band_used': None}
+    mean_img = backend.layer('aod', aoi, start_date, end_date, band=chosen)
+    stats = reduce_mean(mean_img, aoi, scale=1000)
+    return {'aod_mean': first_value(stats), 'aod_band_used': chosen}
+
+
+def get_elevation_stats(aoi):
+    dem = get_backend().layer('elevation', aoi, None, None)
+    stats = reduce_mean(dem, aoi, scale=30)
+    return {'elevation_mean_m': first_value(stats)}
+
+
+def get_precipitation_total(aoi, start_date, end_date):
+    backend = get_backend()
+    band_names = backend.band_names('precipitation', aoi, start_date, end_date)
+    if band_names is None:
+        return resolve_band_server_side('precipitation', aoi, start_date, end_date)
+    chosen = choose_band(band_names, PRECIP_BANDS)
+    if not chosen:
+        return {'precip_total': None, 'precip_band_used': None}
+    precip_sum = backend.layer('precipitation', aoi, start_date, end_date, band=chosen)
+    stats = reduce_mean(precip_sum, aoi, scale=1000)
+    return {'precip_total_mean_mm': first_value(stats), 'precip_band_used': chosen}
+
+
+def _landcover_image():
+    return ee.ImageCollection(WORLD_COVER).first().select('Map')
+
+
+def _landcover_fields(hist_i):
+    dominant = None
+    if hist_i:
+        try:
+            d = first_value(hist_i)
+            items = [(int(k), int(v)) for k, v in d.items()]
+            items.sort(key=lambda x: x[1], reverse=True)
+            dominant = items[0][0] if items else None
+        except Exception:
+            dominant = None
+    return {'landcover_dominant_class': dominant}
+
+
+def get_landcover_stats(aoi):
+    wc_image = get_backend().layer('landcover', aoi, None, None)
+    return _landcover_fields(reduce_histogram(wc_image, aoi, scale=10))
+
+
+def flood_score(elev, precip, occ_val):
+    """Weighted 0..1 flood proxy from low elevation, high precipitation and water occurrence."""
+    elev_norm = max(0.0, min(1.0, 1.0 - (elev / 200.0))) if elev is not None else None
+    precip_norm = max(0.0, min(1.0, precip / 2000.0)) if precip is not None else None
+    occ_norm = max(0.0, min(1.0, occ_val / 100.0)) if occ_val is not None else None
+
+    components, weights = [], []
+    if elev_norm is not None:
+        components.append(elev_norm); weights.append(0.4)
+    if precip_norm is not None:
+        components.append(precip_norm); weights.append(0.4)
+    if occ_norm is not None:
+        components.append(occ_norm); weights.append(0.2)
+
+    return sum([c*w for c, w in zip(components, weights)]) / sum(weights) if components else None
+
+
+def get_water_occurrence(aoi):
+    occ = get_backend().layer('water', aoi, None, None)
+    occ_mean = reduce_mean(occ, aoi, scale=30)
+    return {'water_occurrence_mean': first_value(occ_mean)}
+
+
+def get_water_proximity_and_floodscore(aoi, start_date, end_date):
+    """Standalone flood proxy; build_profile reuses its elevation/precipitation stages instead."""
+    occ_val = get_water_occurrence(aoi)['water_occurrence_mean']
+    elev = get_elevation_stats(aoi)['elevation_mean_m']
+    precip = get_precipitation_total(aoi, start_date, end_date).get('precip_total_mean_mm')
+
+    return {'water_occurrence_mean': occ_val, 'flood_risk_score': flood_score(elev, precip, occ_val)}
+
+
+# ---------- BACKENDS ----------
+# Collectors get their images from the active backend and reduce them with
+# reduce_mean/reduce_sum/reduce_count/reduce_histogram. See
+# services/raster_backend.py for the interface and the offline implementation.
+def _collection(collection_id, aoi, start_date, end_date):
+    return ee.ImageCollection(collection_id).filterDate(start_date, end_date).filterBounds(aoi)
+
+
+# layer name -> builder(aoi, start_date, end_date, band) returning an ee.Image
+EE_LAYERS = {
+    'population': lambda aoi, s, e, band: ee.ImageCollection(WORLDPOP).filterDate(s, e).mean(),
+    'ndvi': lambda aoi, s, e, band: _ndvi_median(aoi, s, e),
+    'lst': lambda aoi, s, e, band: _lst_image(aoi, s, e),
+    'aod': lambda aoi, s, e, band: _collection(MAIAC_AOD, aoi, s, e).select(band).mean(),
+    'elevation': lambda aoi, s, e, band: ee.Image(SRTM),
+    'precipitation': lambda aoi, s, e, band: _collection(GPM_IMERG, aoi, s, e).select(band).sum(),
+    'landcover': lambda aoi, s, e, band: _landcover_image(),
+    'water': lambda aoi, s, e, band: ee.Image(JRC_GSW).select('occurrence'),
+}
+# layers whose band is picked from candidates on the collection's first image
+EE_BAND_COLLECTIONS = {'aod': MAIAC_AOD, 'precipitation': GPM_IMERG}
+EE_REDUCERS = {
+    'mean': lambda: ee.Reducer.mean(),
+    'sum': lambda: ee.Reducer.sum(),
+    'count': lambda: ee.Reducer.count(),
+    'histogram': lambda: ee.Reducer.frequencyHistogram(),
+}
+
+
+class EarthEngineBackend:
+    """Default backend: ee.Image layers reduced with reduceRegion().getInfo()."""
+
+    name = 'earthengine'
+    server_side = True  # supports the batched and gridded (reduceRegions) paths
+
+    def __init__(self, registry=None):
+        self.registry = registry if registry is not None else BandRegistry()
+
+    def layer(self, name, aoi, start_date, end_date, band=None):
+        return EE_LAYERS[name](aoi, start_date, end_date, band)
+
+    def band_names(self, name, aoi, start_date, end_date):
+        """Band names from the registry (no round-trip); None if unknown or stale."""
+        return self.registry.get(EE_BAND_COLLECTIONS[name])
+
+    def learn_bands(self, name, bands):
+        """Record band names seen in a server-side response."""
+        self.registry.put(EE_BAND_COLLECTIONS[name], bands)
+
+    def reduce(self, image, geometry, scale, reducer):
+        rr = image.reduceRegion(
+            reducer=EE_REDUCERS[reducer](),
+            geometry=geometry,
+            maxPixels=MAX_PIXELS,
+            **reduction_params(scale)
+        )
+        return safe_getinfo(rr)
+
+
+_backend = EarthEngineBackend()
+
+
+def get_backend():
+    return _backend
+
+
+def set_backend(backend):
+    """Swap the backend used by every collector (e.g. a LocalRasterBackend)."""
+    global _backend
+    _backend = backend
+
+
+# ---------- BATCHED COLLECTION ----------
+# Each lazy builder returns an ee.Dictionary of un-fetched reductions; each
+# finisher turns the resolved dictionary into the same fields the get_* collector
+# returns. build_profile(batched=True) resolves all of them with one getInfo().
+def _lazy_population(aoi, start_date, end_date):
+    return ee.Dictionary({'mean': lazy_reduce(_population_image(2020), aoi, 100)})
+
+
+def _finish_population(raw):
+    return _population_fields(first_value(raw['mean']), 2020)
+
+
+def _lazy_ndvi(aoi, start_date, end_date):
+    ndvi_med = _ndvi_median(aoi, start_date, end_date)
+    return ee.Dictionary({
+        'mean': lazy_reduce(ndvi_med, aoi, 10),
+        'green': lazy_reduce(ndvi_med.gt(NDVI_GREEN_THRESH), aoi, 10, ee.Reducer.sum()),
+        'count': lazy_reduce(ndvi_med, aoi, 10, ee.Reducer.count()),
+    })
+
+
+def _finish_ndvi(raw):
+    return _ndvi_fields(raw['mean'], raw['green'], raw['count'])
+
+
+def _lazy_lst(aoi, start_date, end_date):
+    return ee.Dictionary({'mean': lazy_reduce(_lst_image(aoi, start_date, end_date), aoi, 1000)})
+
+
+def _finish_lst(raw):
+    return _lst_fields(first_value(raw['mean']))
+
+
+def _lazy_band_image(collection_id, candidates, composite, aoi, start_date, end_date):
+    """(collection, server-side chosen band, composite of that band) for MAIAC/IMERG."""
+    col = ee.ImageCollection(collection_id).filterDate(start_date, end_date).filterBounds(aoi)
+    band = lazy_choose_band(col, candidates)
+    img = getattr(col.map(lambda i: i.select([band])), composite)()
+    return col, band, img
+
+
+def _lazy_band_mean(collection_id, candidates, composite, aoi, start_date, end_date):
+    col, band, img = _lazy_band_image(collection_id, candidates, composite, aoi, start_date, end_date)
+    stats = ee.Algorithms.If(col.size().gt(0), lazy_reduce(img, aoi, 1000), None)
+    # the band list rides along so the registry is filled without a request of its own
+    bands = ee.Algorithms.If(col.size().gt(0), ee.Image(col.first()).bandNames(), None)
+    return ee.Dictionary({'band': band, 'mean': stats, 'bands': bands})
+
+
+def learn_bands(name, raw):
+    """Store the band list of a _lazy_band_mean response in the backend's registry."""
+    backend = get_backend()
+    if raw and raw.get('bands') and hasattr(backend, 'learn_bands'):
+        backend.learn_bands(name, raw['bands'])
+
+
+def _lazy_aod(aoi, start_date, end_date):
+    return _lazy_band_mean(MAIAC_AOD, AOD_BANDS, 'mean', aoi, start_date, end_date)
+
+
+def _finish_aod(raw):
+    if not raw.get('band'):
+        return {'aod_mean': None, 'aod_band_used': None}
+    return {'aod_mean': first_value(raw.get('mean')), 'aod_band_used': raw['band']}
+
+
+def _lazy_elevation(aoi, start_date, end_date):
+    return ee.Dictionary({'mean': lazy_reduce(ee.Image(SRTM), aoi, 30)})
+
+
+def _finish_elevation(raw):
+    return {'elevation_mean_m': first_value(raw['mean'])}
+
+
+def _lazy_precipitation(aoi, start_date, end_date):
+    return _lazy_band_mean(GPM_IMERG, PRECIP_BANDS, 'sum', aoi, start_date, end_date)
+
+
+def _finish_precipitation(raw):
+    if not raw.get('band'):
+        return {'precip_total': None, 'precip_band_used': None}
+    return {'precip_total_mean_mm': first_value(raw.get('mean')), 'precip_band_used': raw['band']}
+
+
+def _lazy_landcover(aoi, start_date, end_date):
+    return ee.Dictionary({'hist': lazy_reduce(_landcover_image(), aoi, 10, ee.Reducer.frequencyHistogram())})
+
+
+def _finish_landcover(raw):
+    return _landcover_fields(raw['hist'])
+
+
+def _lazy_water(aoi, start_date, end_date):
+    occ = ee.Image(JRC_GSW).select('occurrence')
+    return ee.Dictionary({'occurrence': lazy_reduce(occ, aoi, 30)})
+
+
+def _finish_water(raw):
+    return {'water_occurrence_mean': first_value(raw['occurrence'])}
+
+
+# (name, lazy builder, finisher) in profile order
+BATCHED_COLLECTORS = [
+    ('population', _lazy_population, _finish_population),
+    ('ndvi', _lazy_ndvi, _finish_ndvi),
+    ('lst', _lazy_lst, _finish_lst),
+    ('aod', _lazy_aod, _finish_aod),
+    ('elevation', _lazy_elevation, _finish_elevation),
+    ('precipitation', _lazy_precipitation, _finish_precipitation),
+    ('landcover', _lazy_landcover, _finish_landcover),
+    ('water', _lazy_water, _finish_water),
+]
+
+
+def collect_batched(aoi, start_date, end_date, names=None):
+    """Resolve every collector (or only `names`) with a single getInfo().
+
+    Returns {stage name: fields}, or None if the combined request fails.
+    """
+    collectors = [c for c in BATCHED_COLLECTORS if names is None or c[0] in names]
+    combined = ee.Dictionary({
+        name: build(aoi, start_date, end_date) for name, build, _ in collectors
+    })
+    with span('collect_batched', cat='batch', stages=[name for name, _, _ in collectors]):
+        raw = safe_getinfo(combined)
+    if raw is None:
+        return None
+    for name in EE_BAND_COLLECTIONS:
+        learn_bands(name, raw.get(name))
+    return {name: finish(raw[name]) for name, _, finish in collectors}
+
+
+def resolve_band_server_side(name, aoi, start_date, end_date):
+    """Collect a band-choosing stage ('aod', 'precipitation') in one request, choosing
+    the band with ee.Algorithms.If; the band list it returns fills the registry."""
+    _, build, finish = next(c for c in BATCHED_COLLECTORS if c[0] == name)
+    raw = safe_getinfo(build(aoi, start_date, end_date)) or {}
+    learn_bands(name, raw)
+    return finish(raw)
+
+
+# ---------- GRIDDED PROFILE ----------
+# Tiles are reduced with reduceRegions over a FeatureCollection: one reduction per
+# dataset, chained so a chunk of TILE_CHUNK tiles is resolved with one getInfo().
+TILE_CHUNK = 1000
+
+
+def _tile_layers(aoi, start_date, end_date):
+    """(image, reducer, scale) per dataset; band names become the raw tile properties."""
+    ndvi_med = _ndvi_median(aoi, start_date, end_date)
+    _, _, aod_img = _lazy_band_image(MAIAC_AOD, AOD_BANDS, 'mean', aoi, start_date, end_date)
+    _, _, precip_img = _lazy_band_image(GPM_IMERG, PRECIP_BANDS, 'sum', aoi, start_date, end_date)
+    return [
+        (_population_image(2020).rename('population'), ee.Reducer.mean(), 100),
+        # mean of the NDVI > threshold mask is the green fraction (sum / count)
+        (ndvi_med.rename('ndvi').addBands(ndvi_med.gt(NDVI_GREEN_THRESH).rename('green')),
+         ee.Reducer.mean(), 10),
+        (_lst_image(aoi, start_date, end_date).rename('lst_raw'), ee.Reducer.mean(), 1000),
+        (aod_img.rename('aod'), ee.Reducer.mean(), 1000),
+        (ee.Image(SRTM).rename('elevation'), ee.Reducer.mean(), 30),
+        (precip_img.rename('precip'), ee.Reducer.mean(), 1000),
+        (_landcover_image().rename('landcover'), ee.Reducer.frequencyHistogram(), 10),
+        (ee.Image(JRC_GSW).select('occurrence'), ee.Reducer.mean(), 30),
+    ]
+
+
+TILE_RAW_PROPERTIES = ['tile_id', 'population', 'ndvi', 'green', 'lst_raw', 'aod',
+                       'elevation', 'precip', 'landcover', 'occurrence']
+# Bands produced by each _tile_layers() entry, in order
+TILE_LAYER_BANDS = [['population'], ['ndvi', 'green'], ['lst_raw'], ['aod'], ['elevation'],
+                    ['precip'], ['landcover'], ['occurrence']]
+
+
+def reduce_tiles(tiles, layers, properties=TILE_RAW_PROPERTIES):
+    """Reduce every layer over one chunk of tiles; returns {tile_id: raw properties} or None."""
+    fc = ee.FeatureCollection([
+        ee.Feature(ee.Geometry(t['geometry']), {'tile_id': t['tile_id']}) for t in tiles
+    ])
+    for image, reducer, scale in layers:
+        fc = image.reduceRegions(collection=fc, reducer=reducer.forEachBand(image), scale=scale)
+    with span('reduce_tiles', cat='tiles', tiles=len(tiles)):
+        info = safe_getinfo(fc.select(properties, None, False))
+    if info is None:
+        return None
+    return {f['properties']['tile_id']: f['properties'] for f in info['features']}
+
+
+def tile_fields(raw):
+    """Turn raw reduceRegions properties into demo_tiles.json metrics (suitability added separately)."""
+    fields = {
+        'population_density_mean_per_km2': raw.get('population'),
+        'ndvi_mean': raw.get('ndvi'),
+        'pct_green': raw.get('green'),
+        'lst_mean_celsius_est': _lst_fields(raw.get('lst_raw'))['lst_mean_celsius_est'],
+        'aod_mean': raw.get('aod'),
+        'elevation_mean_m': raw.get('elevation'),
+        'precip_total_mean_mm': raw.get('precip'),
+        'landcover_dominant_class': _landcover_fields(
+            {'landcover': raw['landcover']} if raw.get('landcover') else None
+        )['landcover_dominant_class'],
+        'water_occurrence_mean': raw.get('occurrence'),
+    }
+    fields['flood_risk_score'] = flood_score(
+        fields['elevation_mean_m'], fields['precip_total_mean_mm'], fields['water_occurrence_mean'])
+    return fields
+
+
+def build_tile_profiles(aoi_ee, geojson_geom, start_date=START_DATE, end_date=END_DATE,
+                        grid=None, tile_size_m=None, workers=PROFILE_WORKERS, chunk=TILE_CHUNK):
+    """Profile every tile of an n x n (or tile_size_m) grid; returns a FeatureCollection dict."""
+    from app.services.tiling import make_grid, to_feature_collection
+
+    if not get_backend().server_side:
+        raise RuntimeError("Gridded profiles need the Earth Engine backend (reduceRegions)")
+    tiles = make_grid(geojson_geom, n=grid, tile_size_m=tile_size_m)
+    chunks = [tiles[i:i + chunk] for i in range(0, len(tiles), chunk)]
+    print(f"Profiling {len(tiles)} tiles in {len(chunks)} request(s)...")
+    layers = _tile_layers(aoi_ee, start_date, end_date)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="tiles") as pool:
+        raw = {}
+        for part in pool.map(lambda c: reduce_tiles(c, layers), chunks):
+            raw.update(part or {})
+
+    properties = {tile_id: tile_fields(props) for tile_id, props in raw.items()}
+    ids = list(properties)
+    scores = compute_suitabilities_batch(
+        {k: [properties[t][k] for t in ids] for k in SUITABILITY_INPUTS})
+    for i, tile_id in enumerate(ids):
+        properties[tile_id].update({k: v[i].item() for k, v in scores.items()})
+    return to_feature_collection(tiles, properties)
+
+
+# ---------- CELL CACHE ----------
+# AOIs assembled from a global grid of cells (services/cell_grid.py), so overlapping
+# AOIs (wards, districts, ad-hoc polygons over one city) share work. Per cell, the
+# sum and pixel count of each tile band and the landcover histogram are cached;
+# a band mean over the AOI is sum(w * sum) / sum(w * count) across its cells.
+# Interior cells (w = 1) come from the cache or are reduced once and stored. Edge
+# cells are reduced over their AOI part ('exact', cached per part) or taken from
+# the full cell scaled by the AOI share of its area ('weighted', which assumes
+# the layer is uniform inside the cell).
+CELL_EDGE_MODES = ('exact', 'weighted')
+CELL_HISTOGRAM_BANDS = {'landcover'}
+CELL_MEAN_BANDS = [b for bands in TILE_LAYER_BANDS for b in bands if b not in CELL_HISTOGRAM_BANDS]
+CELL_PROPERTIES = (['tile_id'] + [f'{b}_sum' for b in CELL_MEAN_BANDS] + [f'{b}_n' for b in CELL_MEAN_BANDS]
+                   + sorted(CELL_HISTOGRAM_BANDS))
+
+
+def _cell_layers(region, start_date, end_date):
+    """_tile_layers() with each mean band split into its sum and (mask-weighted) pixel count."""
+    layers = []
+    for (image, reducer, scale), bands in zip(_tile_layers(region, start_date, end_date), TILE_LAYER_BANDS):
+        if set(bands) <= CELL_HISTOGRAM_BANDS:
+            layers.append((image, reducer, scale))
+            continue
+        image = image.select(bands)
+        sums = image.rename([f'{b}_sum' for b in bands])
+        counts = image.mask().rename([f'{b}_n' for b in bands])
+        layers.append((sums.addBands(counts), ee.Reducer.sum(), scale))
+    return layers
+
+
+def cell_cache_key(cell_id, start_date, end_date, part=None):
+    return ProfileCache.key(
+        kind='cell',
+        cell=cell_id,
+        part=geometry_hash(part) if part else None,
+        window=[start_date, end_date],
+        datasets=sorted({d for ds in STAGE_DATASETS.values() for d in ds}),
+        backend=get_backend().name,
+        params={'ndvi_green_thresh': NDVI_GREEN_THRESH},
+    )
+
+
+def assemble_cells(entries):
+    """Area-weighted tile properties from [(weight, cell aggregates), ...]."""
+    raw = {}
+    for band in CELL_MEAN_BANDS:
+        total = sum(w * (a.get(f'{band}_sum') or 0.0) for w, a in entries)
+        count = sum(w * (a.get(f'{band}_n') or 0.0) for w, a in entries)
+        raw[band] = total / count if count else None
+    for band in CELL_HISTOGRAM_BANDS:
+        hist = {}
+        for w, a in entries:
+            for k, v in (a.get(band) or {}).items():
+                hist[k] = hist.get(k, 0.0) + w * v
+        raw[band] = hist or None
+    return raw
+
+
+def cell_error(fields, direct):
+    """Per-metric difference between a cell-assembled and a direct profile."""
+    error = {}
+    for key, value in fields.items():
+        ref = direct.get(key)
+        if isinstance(value, (int, float)) and isinstance(ref, (int, float)):
+            diff = abs(value - ref)
+            error[key] = {'cells': value, 'direct': ref, 'abs_error': diff,
+                          'rel_error': diff / abs(ref) if ref else None}
+        elif value is not None or ref is not None:
+            error[key] = {'cells': value, 'direct': ref, 'match': value == ref}
+    return error
+
+
+def build_cell_profile(aoi_ee, geojson_geom, start_date=START_DATE, end_date=END_DATE, zoom=None,
+                       edges='exact', cache=None, refresh=False, verify=False,
+                       workers=PROFILE_WORKERS, chunk=TILE_CHUNK):
+    """Profile the AOI from cached grid cells, reducing only the cells (or edge parts)
+    not cached yet. The profile's 'cells' entry reports the cell counts and the share
+    of the AOI area served from the cache; with `verify`, also the error against a
+    direct reduceRegion profile at native scales."""
+    from app.services.cell_grid import CELL_CACHE_DIR, CELL_ZOOM, cover
+
+    if not get_backend().server_side:
+        raise RuntimeError("Cell profiles need the Earth Engine backend (reduceRegions)")
+    if edges not in CELL_EDGE_MODES:
+        raise ValueError(f"Unknown edge mode: {edges} (use {', '.join(CELL_EDGE_MODES)})")
+    zoom = CELL_ZOOM if zoom is None else zoom
+    cache = cache if cache is not None else ProfileCache(root=CELL_CACHE_DIR, max_entries=100_000)
+    cells = cover(geojson_geom, zoom)
+
+    # (unit id, geometry, weight, cache key) per reduction unit
+    units = []
+    for c in cells:
+        if 'part' in c and edges == 'exact':
+            units.append((f"{c['cell_id']}:part", c['part'], 1.0,
+                          cell_cache_key(c['cell_id'], start_date, end_date, part=c['part'])))
+        else:
+            units.append((c['cell_id'], c['geometry'], c['weight'],
+                          cell_cache_key(c['cell_id'], start_date, end_date)))
+
+    aggregates = {}
+    if not refresh:
+        for uid, _, _, key in units:
+            hit = cache.get(key)
+            if hit is not None:
+                aggregates[uid] = hit
+    cached = set(aggregates)
+    missing = [{'tile_id': uid, 'geometry': geom} for uid, geom, _, _ in units if uid not in aggregates]
+    print(f"Assembling {len(cells)} zoom-{zoom} cells: {len(cached)} cached, {len(missing)} to reduce...")
+
+    if missing:
+        # collections are filtered to the cells' extent, not the AOI, so cached cells
+        # stay valid for other AOIs
+        bounds = [geometry_bounds(c['geometry']) for c in cells]
+        region = ee.Geometry.Rectangle([min(b[0] for b in bounds), min(b[1] for b in bounds),
+                                        max(b[2] for b in bounds), max(b[3] for b in bounds)])
+        layers = _cell_layers(region, start_date, end_date)
+        chunks = [missing[i:i + chunk] for i in range(0, len(missing), chunk)]
+        with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="cells") as pool:
+            for part in pool.map(lambda c: reduce_tiles(c, layers, CELL_PROPERTIES), chunks):
+                aggregates.update(part or {})
+        keys = {uid: key for uid, _, _, key in units}
+        for t in missing:
+            if t['tile_id'] in aggregates:
+                cache.put(keys[t['tile_id']], aggregates[t['tile_id']], time_varying=True, evict=False)
+        cache.evict()  # one directory scan for the whole batch
+
+    entries = [(w, aggregates[uid]) for uid, _, w, _ in units if uid in aggregates]
+    raw = assemble_cells(entries)
+    profile = {
+        'generated_at': datetime.datetime.now(datetime.UTC).isoformat(),
+        'analysis_window': {'start': start_date, 'end': end_date},
+        'geometry': geojson_geom,
+    }
+    profile.update(tile_fields(raw))
+    profile['suitability'] = compute_suitabilities(profile)
+
+    area = {uid: aoi_area_m2(geom) * w for uid, geom, w, _ in units}
+    total_area = sum(area.values())
+    profile['cells'] = {
+        'zoom': zoom,
+        'edges': edges,
+        'cells': len(cells),
+        'interior': sum('part' not in c for c in cells),
+        'edge': sum('part' in c for c in cells),
+        'cached': len(cached),
+        'fetched': len(missing) - sum(t['tile_id'] not in aggregates for t in missing),
+        'failed': sum(t['tile_id'] not in aggregates for t in missing),
+        'cache_coverage': min(1.0, sum(area[uid] for uid in cached) / total_area) if total_area else 0.0,
+    }
+
+    if verify:
+        print("Verifying against a direct reduceRegion profile...")
+        direct = build_profile(aoi_ee, geojson_geom, start_date, end_date, batched=True,
+                               workers=workers, on_stage=lambda *a: None, precision='full')
+        profile['cells']['error'] = cell_error(tile_fields(raw), direct)
+    return profile
+
+
+# ---------- TIME SERIES ----------
+# Per-interval values of the time-varying metrics. Each metric is one request: the
+# interval list is mapped server-side and every entry reduced, so N months cost the
+# same number of round-trips as one window.
+SERIES_STEPS = {'month': 1, 'quarter': 3, 'year': 12}
+
+
+def make_intervals(start_date, end_date, step='month'):
+    """[(start, end), ...] ISO-date intervals covering [start_date, end_date).
+
+    step is 'month', 'quarter', 'year', '<N>m' (N months) or '<N>d' (N days); the
+    last interval is clipped to end_date.
+    """
+    start = datetime.date.fromisoformat(start_date)
+    end = datetime.date.fromisoformat(end_date)
+    if step in SERIES_STEPS:
+        months, days = SERIES_STEPS[step], None
+    elif step[:-1].isdigit() and step[-1] in 'md' and int(step[:-1]) > 0:
+        months, days = (int(step[:-1]), None) if step[-1] == 'm' else (None, int(step[:-1]))
+    else:
+        raise ValueError(f"Unknown series step: {step} (use month, quarter, year, <N>m or <N>d)")
+
+    intervals, cur = [], start
+    while cur < end:
+        if days:
+            nxt = cur + datetime.timedelta(days=days)
+        else:
+            m = cur.month - 1 + months
+            nxt = datetime.date(cur.year + m // 12, m % 12 + 1, 1)
+        nxt = min(nxt, end)
+        intervals.append((cur.isoformat(), nxt.isoformat()))
+        cur = nxt
+    return intervals
+
+
+def _series_ndvi(aoi, s, e):
+    col = _ndvi_collection(aoi, s, e)
+    return ee.Algorithms.If(col.size().gt(0), lazy_reduce(col.median().select('NDVI'), aoi, 10), None)
+
+
+def _series_lst(aoi, s, e):
+    col = _collection(MODIS_LST, aoi, s, e)
+    return ee.Algorithms.If(col.size().gt(0), lazy_reduce(_lst_image(aoi, s, e), aoi, 1000), None)
+
+
+def _series_band(collection_id, candidates, composite):
+    def build(aoi, s, e):
+        col, _, img = _lazy_band_image(collection_id, candidates, composite, aoi, s, e)
+        return ee.Algorithms.If(col.size().gt(0), lazy_reduce(img, aoi, 1000), None)
+    return build
+
+
+# (stage name, output column, builder(aoi, start, end) -> reduceRegion dict or null,
+#  finisher(band value) -> column value)
+SERIES_METRICS = [
+    ('ndvi', 'ndvi_mean', _series_ndvi, lambda v: v),
+    ('lst', 'lst_mean_celsius_est', _series_lst, lambda v: _lst_fields(v)['lst_mean_celsius_est']),
+    ('aod', 'aod_mean', _series_band(MAIAC_AOD, AOD_BANDS, 'mean'), lambda v: v),
+    ('precipitation', 'precip_total_mean_mm', _series_band(GPM_IMERG, PRECIP_BANDS, 'sum'), lambda v: v),
+]
+
+
+def map_intervals(aoi, intervals, build):
+    """build(aoi, start, end) for every interval, mapped server-side and fetched with one
+    getInfo(); returns the list of results, or None if the request failed."""
+    seq = ee.List([list(iv) for iv in intervals]).map(
+        lambda iv: build(aoi, ee.List(iv).get(0), ee.List(iv).get(1)))
+    return safe_getinfo(seq)
+
+
+def series_request(aoi, intervals, build, finish):
+    """One getInfo() for a whole column: the builder mapped over the intervals server-side."""
+    raw = map_intervals(aoi, intervals, build)
+    if raw is None:
+        return [None] * len(intervals)
+    return [finish(first_value(r)) if r else None for r in raw]
+
+
+def build_timeseries(aoi_ee, geojson_geom, start_date=START_DATE, end_date=END_DATE, step='month',
+                     metrics=None, workers=PROFILE_WORKERS, precision=DEFAULT_PRECISION):
+    """Columnar per-interval series of NDVI, LST, AOD and precipitation (or `metrics`).
+
+    Returns {'interval', 'analysis_window', 'reduction', 'series': {'start': [...],
+    'end': [...], <column>: [...]}} with one value per interval (None where the
+    collection has no images).
+    """
+    if not get_backend().server_side:
+        raise RuntimeError("Time series need the Earth Engine backend (server-side mapping)")
+    intervals = make_intervals(start_date, end_date, step)
+    selected = [m for m in SERIES_METRICS if metrics is None or m[0] in metrics or m[1] in metrics]
+    print(f"Collecting {len(intervals)} intervals x {len(selected)} metrics "
+          f"in {len(selected)} request(s)...")
+
+    plan = plan_reduction(geojson_geom, precision)
+    token = _plan.set(plan)
+    try:
+        def run(metric):
+            name, column, build, finish = metric
+            with span(f'series_{name}', cat='series', intervals=len(intervals)):
+                return column, series_request(aoi_ee, intervals, build, finish)
+
+        with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="series") as pool:
+            columns = dict(pool.map(lambda m: contextvars.copy_context().run(run, m), selected))
+    finally:
+        _plan.reset(token)
+
+    series = {'start': [s for s, _ in intervals], 'end': [e for _, e in intervals]}
+    series.update((column, columns[column]) for _, column, _, _ in selected)
+    return {
+        'generated_at': datetime.datetime.now(datetime.UTC).isoformat(),
+        'analysis_window': {'start': start_date, 'end': end_date},
+        'interval': step,
+        'geometry': geojson_geom,
+        'reduction': plan.summary({m[0]: STAGE_SCALES[m[0]] for m in selected}) if plan else None,
+        'series': series,
+    }
+
+
+# ---------- INCREMENTAL WINDOWS ----------
+# LST, AOD and precipitation are stored as per-month partial aggregates, so extending
+# the window only computes the new months. Sums and counts are all reduced with
+# Reducer.sum, so edge pixels carry the same fractional weight in both.
+#   LST, AOD: the sum and count of pixel observations, merged as the pooled
+#     sum/count (observation-weighted). The full-window path (and the tile, cell
+#     and series paths) take the AOI mean of the composite mean instead; the two
+#     agree when every pixel has the same number of observations, and drift
+#     apart where cloud or swath gaps differ between pixels.
+#   precipitation: each month's total and weighted pixel footprint, merged as
+#     sum(totals) / footprint: the AOI mean of the full-window sum composite
+#     whenever the footprint is the same every month (IMERG is gap-free).
+# NDVI is a median composite, which can't be merged from parts, so it is always
+# recomputed over the full window.
+NON_INCREMENTAL_STAGES = {'ndvi': 'median composite'}
+
+
+def _partial_builder(collection_id, candidates, scale):
+    def build(aoi, s, e):
+        col = _collection(collection_id, aoi, s, e)
+        band = lazy_choose_band(col, candidates)
+        values = col.map(lambda i: i.select([band]))
+        total = values.sum()
+        partial = ee.Dictionary({
+            'sum': lazy_reduce(total, aoi, scale, ee.Reducer.sum()),
+            'count': lazy_reduce(values.count(), aoi, scale, ee.Reducer.sum()),
+            'pixels': lazy_reduce(total.mask(), aoi, scale, ee.Reducer.sum()),
+        })
+        # the band list rides along like _lazy_band_mean's, for the registry
+        bands = ee.Algorithms.If(col.size().gt(0), ee.Image(col.first()).bandNames(), None)
+        return ee.Dictionary({'band': band, 'bands': bands,
+                              'partial': ee.Algorithms.If(col.size().gt(0), partial, None)})
+    return build
+
+
+def _partial_fields(raw):
+    """One month's stored partial: {'band', 'sum', 'count', 'pixels'} (zeros when empty)."""
+    partial = (raw or {}).get('partial') or {}
+    return {
+        'band': (raw or {}).get('band'),
+        'sum': first_value(partial.get('sum')) or 0.0,
+        'count': first_value(partial.get('count')) or 0,
+        'pixels': first_value(partial.get('pixels')) or 0,
+    }
+
+
+def merge_mean(parts):
+    total, count = sum(p['sum'] for p in parts), sum(p['count'] for p in parts)
+    return total / count if count else None
+
+
+def merge_total(parts):
+    footprint = max((p['pixels'] for p in parts), default=0)
+    return sum(p['sum'] for p in parts) / footprint if footprint else None
+
+
+def _merged_band(parts):
+    return next((p['band'] for p in reversed(parts) if p['band']), None)
+
+
+# stage -> (partial builder, finish(parts) -> stage fields)
+INCREMENTAL_STAGES = {
+    'lst': (_partial_builder(MODIS_LST, ['LST_Day_1km'], 1000),
+            lambda parts: _lst_fields(merge_mean(parts))),
+    'aod': (_partial_builder(MAIAC_AOD, AOD_BANDS, 1000),
+            lambda parts: {'aod_mean': merge_mean(parts), 'aod_band_used': _merged_band(parts)}),
+    'precipitation': (_partial_builder(GPM_IMERG, PRECIP_BANDS, 1000),
+                      lambda parts: {'precip_total_mean_mm': merge_total(parts),
+                                     'precip_band_used': _merged_band(parts)}),
+}
+
+
+def collect_incremental(aoi, geojson_geom, start_date, end_date, names, cache, workers=PROFILE_WORKERS):
+    """Merge stored monthly partials for `names`, computing only the missing months
+    (one request per stage). Returns ({stage: fields or None}, {stage: reuse info})."""
+    intervals = make_intervals(start_date, end_date, 'month')
+    # months before the current one are closed: their partials are kept without the
+    # time-varying TTL, so rolling the window forward month by month reuses them
+    this_month = datetime.datetime.now(datetime.UTC).date().replace(day=1).isoformat()
+
+    def run(name):
+        build, finish = INCREMENTAL_STAGES[name]
+        keys = [stage_cache_key(name, geojson_geom, s, e, variant='partial') for s, e in intervals]
+        parts = [cache.get(k) for k in keys]
+        todo = [i for i, p in enumerate(parts) if p is None]
+        if todo:
+            with span(f'incremental_{name}', cat='incremental', months=len(todo)):
+                raw = map_intervals(aoi, [intervals[i] for i in todo], build)
+            if raw is None:
+                return name, None, None
+            for i, r in zip(todo, raw):
+                parts[i] = _partial_fields(r)
+                cache.put(keys[i], parts[i], time_varying=intervals[i][1] > this_month, evict=False)
+            cache.evict()
+        return name, finish(parts), {'months': len(intervals), 'computed': len(todo)}
+
+    results, info = {}, {}
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="incremental") as pool:
+        for name, fields, reuse in pool.map(lambda n: contextvars.copy_context().run(run, n), names):
+            results[name] = fields
+            if reuse is not None:
+                info[name] = reuse
+    return results, info
+
+
+# ---------- SUITABILITY HEURISTICS ----------
+def compute_suitabilities(profile):
+    def g(k):
+        return profile.get(k)
+
+    pop = g('population_density_mean_per_km2') or 0
+    ndvi = g('ndvi_mean') or 0.0
+    pct_green = g('pct_green') or 0.0
+    lst = g('lst_mean_celsius_est') or 0.0
+    aod = g('aod_mean') or 0.0
+    flood = g('flood_risk_score') or 0.0
+
+    pop_norm = max(0.0, min(1.0, pop / 10000.0))
+    ndvi_norm = max(0.0, min(1.0, (ndvi + 0.2) / 0.8))
+    lst_norm = max(0.0, min(1.0, (lst - 20.0) / 25.0))
+    aod_norm = max(0.0, min(1.0, aod / 1.0))
+    flood_norm = max(0.0, min(1.0, flood))
+
+    greenspace_priority = (0.5 * pop_norm) + (0.3 * (1 - ndvi_norm)) + (0.2 * lst_norm)
+    greenspace_priority = max(0.0, min(1.0, greenspace_priority))
+
+    industry_score = (0.5 * (1 - pop_norm)) + (0.4 * (1 - flood_norm)) + (0.1 * (1 - aod_norm))
+    industry_score = max(0.0, min(1.0, industry_score))
+
+    res_score = (0.4 * (1 - flood_norm)) + (0.3 * (1 - aod_norm)) + (0.3 * pct_green)
+    res_score = max(0.0, min(1.0, res_score))
+
+    return {
+        'greenspace_priority': greenspace_priority,
+        'industrial_suitability': industry_score,
+        'residential_suitability': res_score,
+        'best_use': (
+            'greenspace' if greenspace_priority >= max(industry_score, res_score)
+            else ('residential' if res_score >= industry_score else 'industrial')
+        )
+    }
+
+
+SUITABILITY_INPUTS = ['population_density_mean_per_km2', 'ndvi_mean', 'pct_green',
+                      'lst_mean_celsius_est', 'aod_mean', 'flood_risk_score']
+
+
+def _metric_column(metrics, key, n):
+    """Column `key` as float64 with missing values (None/NaN/absent) as 0, like `or 0.0`."""
+    try:
+        col = metrics[key]
+    except (KeyError, ValueError, IndexError):
+        return np.zeros(n)
+    col = np.asarray(col, dtype=float)
+    return np.where(np.isnan(col), 0.0, col)
+
+
+def compute_suitabilities_batch(metrics):
+    """Vectorized compute_suitabilities over many tiles in one pass.
+
+    `metrics` is anything indexable by column name: a dict of lists/arrays, a NumPy
+    structured array or a pandas DataFrame. Returns a dict of arrays with the same
+    keys as compute_suitabilities; values match the scalar function element-wise.
+    """
+    n = None
+    for key in SUITABILITY_INPUTS:
+        try:
+            n = len(metrics[key])
+            break
+        except (KeyError, ValueError, IndexError):
+            continue
+    if n is None:
+        raise ValueError("metrics has none of the suitability input columns")
+
+    pop, ndvi, pct_green, lst, aod, flood = (_metric_column(metrics, k, n) for k in SUITABILITY_INPUTS)
+
+    pop_norm = np.clip(pop / 10000.0, 0.0, 1.0)
+    ndvi_norm = np.clip((ndvi + 0.2) / 0.8, 0.0, 1.0)
+    lst_norm = np.clip((lst - 20.0) / 25.0, 0.0, 1.0)
+    aod_norm = np.clip(aod / 1.0, 0.0, 1.0)
+    flood_norm = np.clip(flood, 0.0, 1.0)
+
+    greenspace_priority = (0.5 * pop_norm) + (0.3 * (1 - ndvi_norm)) + (0.2 * lst_norm)
+    greenspace_priority = np.clip(greenspace_priority, 0.0, 1.0)
+
+    industry_score = (0.5 * (1 - pop_norm)) + (0.4 * (1 - flood_norm)) + (0.1 * (1 - aod_norm))
+    industry_score = np.clip(industry_score, 0.0, 1.0)
+
+    res_score = (0.4 * (1 - flood_norm)) + (0.3 * (1 - aod_norm)) + (0.3 * pct_green)
+    res_score = np.clip(res_score, 0.0, 1.0)
+
+    best_use = np.where(
+        greenspace_priority >= np.maximum(industry_score, res_score), 'greenspace',
+        np.where(res_score >= industry_score, 'residential', 'industrial')
+    )
+    return {
+        'greenspace_priority': greenspace_priority,
+        'industrial_suitability': industry_score,
+        'residential_suitability': res_score,
+        'best_use': best_use,
+    }
+
+
+# ---------- METRIC GRAPH ----------
+# Stages are the Earth Engine nodes of the graph: (name, progress message, collector)
+# in profile order; every collector takes (aoi, start_date, end_date) and returns
+# the fields it adds to the profile.
+STAGES = [
+    ('population', "Collecting population density...",
+     lambda aoi, s, e: get_population_density_worldpop(aoi, year=2020)),
+    ('ndvi', "Collecting NDVI stats (Sentinel-2 median)...", get_ndvi_stats),
+    ('lst', "Collecting LST stats (MODIS)...", get_lst_stats),
+    ('aod', "Collecting AOD stats (MAIAC)...", get_aod_stats),
+    ('elevation', "Collecting elevation (SRTM)...", lambda aoi, s, e: get_elevation_stats(aoi)),
+    ('precipitation', "Collecting precipitation (GPM IMERG)...", get_precipitation_total),
+    ('landcover', "Collecting landcover (ESA WorldCover)...", lambda aoi, s, e: get_landcover_stats(aoi)),
+    ('water', "Collecting water occurrence (JRC)...", lambda aoi, s, e: get_water_occurrence(aoi)),
+]
+
+# Derived nodes are computed locally from upstream fields:
+# (name, progress message, dependencies, derive(fields) -> fields), in dependency order.
+DERIVED = [
+    ('flood', "Computing flood proxy...", ('elevation', 'precipitation', 'water'),
+     lambda f: {'flood_risk_score': flood_score(
+         f.get('elevation_mean_m'), f.get('precip_total_mean_mm'), f.get('water_occurrence_mean'))}),
+    ('suitability', "Computing suitabilities...", ('population', 'ndvi', 'lst', 'aod', 'flood'),
+     lambda f: {'suitability': compute_suitabilities(f)}),
+]
+
+# Profile field -> node producing it, for requesting a subset of metrics
+METRIC_OUTPUTS = {
+    'population_density_mean_per_km2': 'population',
+    'ndvi_mean': 'ndvi', 'pct_green': 'ndvi',
+    'lst_mean_celsius_est': 'lst', 'lst_raw_mean': 'lst',
+    'aod_mean': 'aod', 'aod_band_used': 'aod',
+    'elevation_mean_m': 'elevation',
+    'precip_total_mean_mm': 'precipitation', 'precip_band_used': 'precipitation',
+    'landcover_dominant_class': 'landcover',
+    'water_occurrence_mean': 'water',
+    'flood_risk_score': 'flood',
+    'suitability': 'suitability',
+}
+
+
+def required_nodes(metrics=None):
+    """Names of the nodes needed for `metrics` (fields or node names; None = all)."""
+    deps = {name: d for name, _, d, _ in DERIVED}
+    if metrics is None:
+        return {name for name, _, _ in STAGES} | set(deps)
+    needed, todo = set(), []
+    for m in metrics:
+        node = METRIC_OUTPUTS.get(m, m)
+        if node not in deps and node not in {name for name, _, _ in STAGES}:
+            raise ValueError(f"Unknown metric: {m}")
+        todo.append(node)
+    while todo:
+        node = todo.pop()
+        if node not in needed:
+            needed.add(node)
+            todo.extend(deps.get(node, ()))
+    return needed
+
+
+# Datasets behind each stage (part of its cache key) and the stages whose values
+# depend on the analysis window (cached with a TTL, since those datasets still change)
+STAGE_DATASETS = {
+    'population': [WORLDPOP],
+    'ndvi': [SENTINEL2],
+    'lst': [MODIS_LST],
+    'aod': [MAIAC_AOD],
+    'elevation': [SRTM],
+    'precipitation': [GPM_IMERG],
+    'landcover': [WORLD_COVER],
+    'water': [JRC_GSW],
+}
+# Native reduceRegion scale (m) of each stage, before ReductionPlan coarsening
+STAGE_SCALES = {
+    'population': 100, 'ndvi': 10, 'lst': 1000, 'aod': 1000,
+    'elevation': 30, 'precipitation': 1000, 'landcover': 10, 'water': 30,
+}
+TIME_VARYING_STAGES = {'ndvi', 'lst', 'aod', 'precipitation'}
+# The measured value of each stage: None there means the stage failed (collectors
+# swallow getInfo() errors), whatever metadata ('source', band names) came with it
+STAGE_VALUE_FIELDS = {
+    'population': 'population_density_mean_per_km2',
+    'ndvi': 'ndvi_mean',
+    'lst': 'lst_raw_mean',
+    'aod': 'aod_mean',
+    'elevation': 'elevation_mean_m',
+    'precipitation': 'precip_total_mean_mm',
+    'landcover': 'landcover_dominant_class',
+    'water': 'water_occurrence_mean',
+}
+
+
+def stage_cache_key(name, geojson_geom, start_date, end_date, variant=None):
+    """Cache key of one stage: geometry hash + window + datasets + thresholds.
+
+    variant separates entries computed differently for the same window: 'incremental'
+    (merged from monthly partials) and 'partial' (one month's partial aggregate).
+    """
+    window = [start_date, end_date] if name in TIME_VARYING_STAGES else None
+    extra = {'variant': variant} if variant else {}
+    if variant and name in INCREMENTAL_STAGES:
+        extra['estimator'] = 'pooled'  # partials before the weighted precipitation footprint differ
+    return ProfileCache.key(
+        **extra,
+        stage=name,
+        geometry=geometry_hash(geojson_geom),
+        window=window,
+        datasets=STAGE_DATASETS[name],
+        backend=get_backend().name,
+        params={'ndvi_green_thresh': NDVI_GREEN_THRESH, 'max_pixels': MAX_PIXELS,
+                'reduction': reduction_params(STAGE_SCALES[name])},
+    )
+
+
+def print_stage(name, seconds, error):
+    """Default stage reporter."""
+    if error is not None:
+        print(f"⚠️ Stage {name} failed after {seconds:.2f}s: {error}")
+    else:
+        print(f"  {name} done in {seconds:.2f}s")
+
+
+def run_stage(stage, aoi, start_date, end_date):
+    """Run one collector; returns (fields, seconds, error) instead of raising."""
+    name, message, collector = stage
+    print(message)
+    t0 = time.perf_counter()
+    try:
+        with span(name):
+            fields = collector(aoi, start_date, end_date)
+        return fields, time.perf_counter() - t0, None
+    except Exception as e:
+        return {}, time.perf_counter() - t0, e
+
+
+def collect_stages(aoi, start_date, end_date, workers=PROFILE_WORKERS, on_stage=print_stage, names=None):
+    """Run every stage (or only `names`) on up to `workers` threads.
+
+    on_stage(name, seconds, error) is called as each stage finishes. Returns
+    {stage name: fields}, with None for a stage that raised; callers merge in
+    STAGES order, so the output does not depend on which stage finishes first.
+    """
+    stages = [st for st in STAGES if names is None or st[0] in names]
+    results = {}
+    if workers <= 1:
+        for stage in stages:
+            results[stage[0]] = run_stage(stage, aoi, start_date, end_date)
+            on_stage(stage[0], *results[stage[0]][1:])
+    else:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="profile") as pool:
+            # each stage runs in a copy of this context so it sees the reduction plan
+            futures = {pool.submit(contextvars.copy_context().run, run_stage, stage, aoi,
+                                   start_date, end_date): stage[0]
+                       for stage in stages}
+            for fut in as_completed(futures):
+                name = futures[fut]
+                results[name] = fut.result()
+                on_stage(name, *results[name][1:])
+
+    return {name: (results[name][0] if results[name][2] is None else None)
+            for name, _, _ in stages}
+
+
+# ---------- MAIN ----------
+def build_profile(aoi_ee, geojson_geom, start_date=START_DATE, end_date=END_DATE, batched=False,
+                  workers=PROFILE_WORKERS, on_stage=print_stage, cache=None, refresh=False,
+                  metrics=None, precision=DEFAULT_PRECISION, incremental=False):
+    """Collect the stages for the AOI and score it.
+
+    Only the graph nodes needed for `metrics` (profile fields or node names, default
+    all) are computed, each once. With a ProfileCache, each stage is looked up by
+    stage_cache_key() first and only the missing stages are requested; `refresh`
+    skips the lookup but still stores. On Earth Engine, reduction scales are planned
+    from the AOI area and the `precision` pixel budget and recorded under 'reduction'.
+    With `incremental` (needs a cache), LST/AOD/precipitation are merged from monthly
+    partials so an extended window only computes the new months.
+    """
+    profile = {}
+    profile['generated_at'] = datetime.datetime.now(datetime.UTC).isoformat()
+    profile['analysis_window'] = {'start': start_date, 'end': end_date}
+    profile['geometry'] = geojson_geom
+
+    needed = required_nodes(metrics)
+    stages = [name for name, _, _ in STAGES if name in needed]
+
+    plan = None
+    if get_backend().server_side:  # local rasters are always read at native resolution
+        plan = plan_reduction(geojson_geom, precision)
+    if plan is not None:
+        profile['reduction'] = plan.summary({name: STAGE_SCALES[name] for name in stages})
+    if incremental and (cache is None or not get_backend().server_side):
+        print("⚠️ Incremental mode needs the profile cache and Earth Engine; computing the full window.")
+        incremental = False
+    token = _plan.set(plan)
+    try:
+        results, keys = {}, {}
+        if cache is not None:
+            for name in stages:
+                variant = 'incremental' if incremental and name in INCREMENTAL_STAGES else None
+                keys[name] = stage_cache_key(name, geojson_geom, start_date, end_date, variant=variant)
+                hit = None if refresh else cache.get(keys[name])
+                if hit is not None:
+                    print(f"  {name} loaded from cache")
+                    results[name] = hit
+        missing = [name for name in stages if name not in results]
+
+        merged = {}
+        if incremental:
+            profile['incremental'] = {name: f"non-incremental ({why}), recomputed over the full window"
+                                      for name, why in NON_INCREMENTAL_STAGES.items() if name in stages}
+            todo = [name for name in missing if name in INCREMENTAL_STAGES]
+            if todo:
+                print("Merging monthly partials for " + ", ".join(todo) + "...")
+                merged, info = collect_incremental(aoi_ee, geojson_geom, start_date, end_date, todo,
+                                                   cache, workers=workers)
+                profile['incremental'].update(info)
+                missing = [name for name in missing if name not in merged]
+
+        fetched = None
+        if batched and missing and get_backend().server_side:
+            print("Collecting all layers in one batched request...")
+            fetched = collect_batched(aoi_ee, start_date, end_date, names=missing)
+            if fetched is None:
+                print("⚠️ Batched request failed, falling back to per-layer requests.")
+
+        if fetched is None and missing:
+            fetched = collect_stages(aoi_ee, start_date, end_date, workers=workers,
+                                     on_stage=on_stage, names=missing)
+
+        for name, fields in {**merged, **(fetched or {})}.items():
+            if fields is None:
+                continue
+            results[name] = fields
+            # a None value usually means a swallowed getInfo() failure; don't pin it in the cache
+            if cache is not None and fields.get(STAGE_VALUE_FIELDS[name]) is not None:
+                cache.put(keys[name], fields, time_varying=name in TIME_VARYING_STAGES)
+
+        for name in stages:
+            profile.update(results.get(name) or {})
+
+        for name, message, _, derive in DERIVED:
+            if name in needed:
+                print(message)
+                with span(name, cat='derived'):
+                    profile.update(derive(profile))
+
+        return profile
+    finally:
+        _plan.reset(token)
+
+
+def profile_aoi(aoi_id, geojson_geom, options, on_stage=print_stage):
+    """Profile one AOI from an options dict (batch pool processes, API jobs)."""
+    if options.get('rasters'):
+        from app.services.raster_backend import LocalRasterBackend
+
+        set_backend(LocalRasterBackend(options['rasters']))
+        aoi = geojson_geom
+    else:
+        aoi, geojson_geom = prepare_geometry(geojson_geom, options.get('max_vertices', MAX_VERTICES))
+    cache = None if options.get('no_cache') else ProfileCache()
+    with span('build_profile', cat='profile', aoi=aoi_id):
+        return build_profile(aoi, geojson_geom, start_date=options.get('start_date', START_DATE),
+                             end_date=options.get('end_date', END_DATE),
+                             batched=options.get('batched', False), workers=options.get('workers', 1),
+                             on_stage=on_stage, cache=cache, refresh=options.get('refresh', False),
+                             metrics=options.get('metrics'),
+                             precision=options.get('precision', DEFAULT_PRECISION),
+                             incremental=options.get('incremental', False))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Collect an Earth Engine profile for an AOI.")
+    # Use aoi.geojson by default, but allow command line override
+    parser.add_argument("geojson", nargs="?", default="aoi.geojson", help="AOI GeoJSON file")
+    parser.add_argument("--batched", action="store_true",
+                        help="resolve all layers with a single Earth Engine request")
+    parser.add_argument("--workers", type=int, default=PROFILE_WORKERS,
+                        help="concurrent per-layer requests (1 = sequential)")
+    parser.add_argument("--no-cache", action="store_true", help="don't read or write the profile cache")
+    parser.add_argument("--refresh", action="store_true",
+                        help="recompute every layer and overwrite its cache entry")
+    parser.add_argument("--grid", type=int, metavar="N",
+                        help="profile an N x N grid of tiles instead of the whole AOI")
+    parser.add_argument("--tile-size", type=float, metavar="METERS",
+                        help="profile square tiles of this size instead of the whole AOI")
+    parser.add_argument("--tiles-out", default="aoi_tiles.json",
+                        help="output FeatureCollection for --grid/--tile-size")
+    parser.add_argument("--cells", action="store_true",
+                        help="assemble the profile from the global grid-cell cache, reducing only "
+                             "cells not cached yet")
+    parser.add_argument("--cell-zoom", type=int, metavar="Z",
+                        help="zoom of the cell grid (default: CELL_GRID_ZOOM or 14)")
+    parser.add_argument("--cell-edges", choices=CELL_EDGE_MODES, default='exact',
+                        help="edge cells: reduce the AOI part ('exact') or area-weight the cached "
+                             "full cell ('weighted')")
+    parser.add_argument("--cell-verify", action="store_true",
+                        help="with --cells, also compute the profile directly and report the error")
+    parser.add_argument("--start", default=START_DATE, help="analysis window start (YYYY-MM-DD)")
+    parser.add_argument("--end", default=END_DATE, help="analysis window end (YYYY-MM-DD)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="merge LST/AOD/precipitation from cached monthly partials, computing only "
+                             "months not seen before (e.g. after extending --end)")
+    parser.add_argument("--series", metavar="STEP",
+                        help="per-interval time series instead of one aggregate: month, quarter, year, "
+                             "<N>m or <N>d")
+    parser.add_argument("--series-out", default="aoi_timeseries.json", help="output file for --series")
+    parser.add_argument("--batch", action="store_true",
+                        help="profile every AOI in a directory of GeoJSON files or a multi-feature GeoJSON")
+    parser.add_argument("--processes", type=int, default=4, help="worker processes for --batch")
+    parser.add_argument("--out", default="aoi_profiles.ndjson", help="NDJSON output for --batch")
+    parser.add_argument("--checkpoint", help="completed-AOI file for --batch (default: <out>.done)")
+    parser.add_argument("--precision", choices=list(PRECISION_BUDGETS), default=DEFAULT_PRECISION,
+                        help="pixel budget per reduction: coarser scales for large AOIs trade accuracy "
+                             "for latency ('full' = native scales)")
+    parser.add_argument("--max-vertices", type=int, default=MAX_VERTICES,
+                        help="simplify the AOI to at most this many vertices before sending it to Earth Engine")
+    parser.add_argument("--format", choices=["json", "columnar"], default="json",
+                        help="output format: JSON, or a memory-mappable columnar .cols table "
+                             "(see services/columnar.py; --batch also keeps its NDJSON)")
+    parser.add_argument("--trace", metavar="FILE",
+                        help="write a Chrome trace (chrome://tracing / Perfetto) of stages and getInfo calls")
+    parser.add_argument("--rasters", metavar="DIR",
+                        help="compute from local rasters in DIR instead of Earth Engine (offline)")
+    parser.add_argument("--metrics", nargs="+", metavar="METRIC",
+                        help="only compute these profile fields (e.g. flood_risk_score) and their inputs")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.trace:
+        enable_tracing()
+    try:
+        run(args)
+    finally:
+        if args.trace:
+            print(f"Wrote {dump_chrome_trace(args.trace)} trace events to {args.trace}")
+
+
+def run(args):
+    from app.services.batch_runner import iter_aois, run_batch
+    from app.services.raster_backend import LocalRasterBackend
+
+    geojson_path = args.geojson
+    print("Using GeoJSON:", geojson_path)
+
+    if args.batch:
+        options = {
+            'rasters': args.rasters, 'no_cache': args.no_cache, 'refresh': args.refresh,
+            'batched': args.batched, 'workers': args.workers, 'metrics': args.metrics,
+            'precision': args.precision, 'max_vertices': args.max_vertices,
+            'start_date': args.start, 'end_date': args.end, 'incremental': args.incremental,
+        }
+        completed, failed, skipped = run_batch(
+            iter_aois(geojson_path), profile_aoi, args.out, checkpoint_path=args.checkpoint,
+            processes=args.processes, options=options)
+        print(f"Batch finished: {completed} profiled, {failed} failed, "
+              f"{skipped} already done; results in {args.out}")
+        if args.format == "columnar":
+            from app.services.columnar import table_path, write_profiles
+
+            latest = {}  # a resumed batch can hold an error line and a later success per AOI
+            with open(args.out) as f:
+                for line in f:
+                    record = json.loads(line)
+                    if "error" not in record:
+                        latest[record["aoi_id"]] = record
+            print(f"Saved {len(latest)} profiles to {write_profiles(table_path(args.out), latest.values())}")
+        return
+
+    if args.rasters:
+        set_backend(LocalRasterBackend(args.rasters))
+        try:
+            geojson_geom = read_geojson_geometry(geojson_path)
+        except Exception as e:
+            print("⚠️ Failed to read GeoJSON file:", e)
+            print("➡️ Falling back to default bbox (Ahmedabad).")
+            geojson_geom = default_bbox_geometry()
+        aoi_ee = geojson_geom  # the local backend reduces over the GeoJSON directly
+    else:
+        aoi_ee, geojson_geom = read_geojson_to_eegeom(geojson_path, args.max_vertices)
+
+    if args.grid or args.tile_size:
+        tiles = build_tile_profiles(aoi_ee, geojson_geom, start_date=args.start, end_date=args.end,
+                                    grid=args.grid, tile_size_m=args.tile_size, workers=args.workers)
+        if args.format == "columnar":
+            from app.services.columnar import table_path, write_features
+
+            out_file = write_features(table_path(args.tiles_out), tiles)
+        else:
+            out_file = args.tiles_out
+            with open(out_file, "w") as f:
+                json.dump(tiles, f)
+        print(f"Saved {len(tiles['features'])} tile profiles to {out_file}")
+        return
+
+    if args.series:
+        series = build_timeseries(aoi_ee, geojson_geom, start_date=args.start, end_date=args.end,
+                                  step=args.series, metrics=args.metrics, workers=args.workers,
+                                  precision=args.precision)
+        with open(args.series_out, "w") as f:
+            json.dump(series, f, indent=2)
+        print(f"Saved {len(series['series']['start'])}-interval time series to {args.series_out}")
+        return
+
+    if args.cells:
+        with span('build_cell_profile', cat='profile'):
+            result = build_cell_profile(aoi_ee, geojson_geom, start_date=args.start, end_date=args.end,
+                                        zoom=args.cell_zoom, edges=args.cell_edges, refresh=args.refresh,
+                                        verify=args.cell_verify, workers=args.workers)
+        cells = result['cells']
+        print(f"Cells: {cells['cached']} cached, {cells['fetched']} reduced, "
+              f"{cells['cache_coverage']:.1%} of the AOI area served from the cache")
+        for key, err in cells.get('error', {}).items():
+            if err.get('rel_error') is not None:
+                print(f"  {key}: {err['rel_error']:.2%} off the direct reduceRegion")
+    else:
+        cache = None if args.no_cache else ProfileCache()
+        with span('build_profile', cat='profile'):
+            result = build_profile(aoi_ee, geojson_geom, start_date=args.start, end_date=args.end,
+                                   batched=args.batched, workers=args.workers,
+                                   cache=cache, refresh=args.refresh, metrics=args.metrics,
+                                   precision=args.precision, incremental=args.incremental)
+
+    out_file = "aoi_profile.json"
+    if args.format == "columnar":
+        from app.services.columnar import table_path, write_profiles
+
+        out_file = write_profiles(table_path(out_file), [result])
+    else:
+        with open(out_file, "w") as f:
+            json.dump(result, f, indent=2)
+    print(f"Saved AOI profile to {out_file}")
+
+    print("SUMMARY:")
+    print(" Population density (mean):", result.get('population_density_mean_per_km2'))
+    print(" NDVI mean:", result.get('ndvi_mean'), "Pct green:", result.get('pct_green'))
+    print(" LST (C):", result.get('lst_mean_celsius_est'))
+    print(" AOD (mean):", result.get('aod_mean'))
+    print(" Elevation (m mean):", result.get('elevation_mean_m'))
+    print(" Precip total (mm mean):", result.get('precip_total_mean_mm'))
+    print(" Flood risk score (0..1):", result.get('flood_risk_score'))
+    print(" Suitability:", result.get('suitability'))
+
+
+if __name__ == "__main__":
+    main()
+
+# #!/usr/bin/env python3
+# """
+# gather_aoi_data.py
+
+# Usage:
+#     python gather_aoi_data.py [path_to_geojson]
+
+# This script:
+#  - Loads an AOI from a GeoJSON file (or uses a default bbox).
+#  - Uses the Google Earth Engine Python API to collect:
+#     - Population density (CIESIN GPWv4.11)
+#     - NDVI (Sentinel-2 median)
+#     - Land Surface Temperature (MODIS MOD11A2 -> Celsius)
+#     - MAIAC AOD (MCD19A2_GRANULES)
+#     - Elevation (SRTM)
+#     - Precipitation total (GPM IMERG)
+#     - Land cover (ESA WorldCover v100)
+#     - Water occurrence (JRC GlobalSurfaceWater) -> used for flood proximity
+#  - Computes summary stats and simple suitability heuristics
+#  - Saves results to 'aoi_profile.json'
+# Notes:
+#  - Make sure you've run `earthengine authenticate` and have ee.Initialize() access.
+#  - For very large AOIs you may want to export images instead of using reduceRegion/getInfo.
+# """
+
+# import ee
+# import json
+# import sys
+# import datetime
+# import math
+# from shapely.geometry import shape
+# import geopandas as gpd
+
+# # Initialize Earth Engine
+# try:
+#     ee.Initialize(project='projectproject-471216')
+# except Exception as e:
+#     raise RuntimeError("ee.Initialize() failed. Run `earthengine authenticate` then try again.") from e
+
+# # ---------- CONFIG ----------
+# # Default bbox as fallback: Ahmedabad small bbox (minLon, minLat, maxLon, maxLat)
+# DEFAULT_BBOX = [72.5, 22.9, 72.65, 23.05]
+
+# # Time window for time-aware layers
+# START_DATE = "2022-01-01"
+# END_DATE   = "2022-12-31"
+
+# # NDVI threshold to consider "green"
+# NDVI_GREEN_THRESH = 0.3
+
+# # Dataset IDs (Earth Engine)
+# GPW_POP_DENSITY = "CIESIN/GPWv411/GPW_Population_Count"
+# SENTINEL2 = "COPERNICUS/S2_SR_HARMONIZED"
+# MODIS_LST = "MODIS/061/MOD11A2"
+# MAIAC_AOD = "MODIS/061/MCD19A2_GRANULES"
+# SRTM = "USGS/SRTMGL1_003"
+# GPM_IMERG = "NASA/GPM_L3/IMERG_V07"
+# WORLD_COVER = "ESA/WorldCover/v100"
+# JRC_GSW = "JRC/GSW1_4/GlobalSurfaceWater"
+
+# # Reduction parameters
+# MAX_PIXELS = 1e13
+
+# # ---------- HELPERS ----------
+# def read_geojson_to_eegeom(geojson_path=None):
+#     """Return an ee.Geometry from GeoJSON file path, or default bbox if None."""
+#     if geojson_path:
+#         gdf = gpd.read_file(geojson_path)
+#         # unify into single geometry (dissolve)
+#         geom = gdf.unary_union
+#         geojson = json.loads(gpd.GeoSeries([geom]).to_json())['features'][0]['geometry']
+#         ee_geom = ee.Geometry(geojson)
+#         return ee_geom, geojson
+#     else:
+#         minLon, minLat, maxLon, maxLat = DEFAULT_BBOX
+#         ee_geom = ee.Geometry.Rectangle([minLon, minLat, maxLon, maxLat])
+#         geojson = ee_geom.getInfo()
+#         return ee_geom, geojson
+
+# def safe_getinfo(obj):
+#     try:
+#         return obj.getInfo()
+#     except Exception as e:
+#         print("Warning: getInfo() failed:", e)
+#         return None
+
+# def reduce_mean(image, geometry, scale):
+#     """Return mean value dictionary for image over geometry"""
+#     rr = image.reduceRegion(
+#         reducer=ee.Reducer.mean(),
+#         geometry=geometry,
+#         scale=scale,
+#         maxPixels=MAX_PIXELS
+#     )
+#     return safe_getinfo(rr)
+
+# def reduce_sum(image, geometry, scale):
+#     rr = image.reduceRegion(
+#         reducer=ee.Reducer.sum(),
+#         geometry=geometry,
+#         scale=scale,
+#         maxPixels=MAX_PIXELS
+#     )
+#     return safe_getinfo(rr)
+
+# # ---------- LAYER FUNCTIONS ----------
+# def get_population_density_sedac(aoi, year=2020):
+#     """
+#     Fetch mean population density for the AOI using SEDAC GPWv4.11.
+#     Returns density in people per km².
+#     """
+#     try:
+#         img = ee.Image("CIESIN/GPWv411/GPW_Population_Density")
+#         # GPWv4.11 has bands for different years: 'pd_2020', 'pd_2015', etc.
+#         band_name = f'pd_{year}'
+#         img_band = img.select(band_name)
+
+#         stats = img_band.reduceRegion(
+#             reducer=ee.Reducer.mean(),
+#             geometry=aoi,
+#             scale=1000,  # GPW is ~1km resolution
+#             maxPixels=1e13
+#         )
+
+#         stats_i = stats.getInfo()
+#         pop_val = list(stats_i.values())[0] if stats_i else None
+
+#         return {
+#             'population_density_mean_per_km2': pop_val,
+#             'gpw_year': year
+#         }
+
+#     except Exception as e:
+#         print("Population density fetch error:", e)
+#         return {
+#             'population_density_mean_per_km2': None,
+#             'gpw_year': year
+#         }
+
+
+
+
+
+
+# def get_ndvi_stats(aoi, start_date, end_date):
+#     s2 = ee.ImageCollection(SENTINEL2) \
+#           .filterDate(start_date, end_date) \
+#           .filterBounds(aoi) \
+#           .filter(ee.Filter.lt('CLOUDY_PIXEL_PERCENTAGE', 40)) \
+#           .select(['B8', 'B4'])
+
+#     def ndvi_fn(img):
+#         return img.normalizedDifference(['B8', 'B4']).rename('NDVI')
+#     ndvi_col = s2.map(ndvi_fn)
+#     ndvi_med = ndvi_col.median().select('NDVI')
+#     ndvi_mean = reduce_mean(ndvi_med, aoi, scale=10)
+#     # Percent green: compute ratio of pixels with NDVI > threshold
+#     mask = ndvi_med.gt(NDVI_GREEN_THRESH)
+#     # sum of mask (true=1) and count of pixels
+#     mask_sum = mask.reduceRegion(ee.Reducer.sum(), aoi, scale=10, maxPixels=MAX_PIXELS)
+#     count = ndvi_med.reduceRegion(ee.Reducer.count(), aoi, scale=10, maxPixels=MAX_PIXELS)
+#     mask_sum_i = safe_getinfo(mask_sum)
+#     count_i = safe_getinfo(count)
+#     pct_green = None
+#     if mask_sum_i and count_i:
+#         try:
+#             s = list(mask_sum_i.values())[0]
+#             t = list(count_i.values())[0]
+#             pct_green = (s / t) if (t and t != 0) else None
+#         except Exception:
+#             pct_green = None
+#     ndvi_val = list(ndvi_mean.values())[0] if ndvi_mean else None
+#     return {'ndvi_mean': ndvi_val, 'pct_green': pct_green}
+
+# def get_lst_stats(aoi, start_date, end_date):
+#     col = ee.ImageCollection(MODIS_LST).filterDate(start_date, end_date).filterBounds(aoi)
+#     # Use LST_Day_1km
+#     img = col.select('LST_Day_1km').mean()
+#     stats = reduce_mean(img, aoi, scale=1000)
+#     raw_mean = list(stats.values())[0] if stats else None
+#     lst_c = None
+#     if raw_mean is not None:
+#         # Apply MODIS LST typical scale factor 0.02 and convert Kelvin to Celsius
+#         lst_c = (raw_mean * 0.02) - 273.15
+#     return {'lst_mean_celsius_est': lst_c, 'lst_raw_mean': raw_mean}
+
+# def get_aod_stats(aoi, start_date, end_date):
+#     col = ee.ImageCollection(MAIAC_AOD).filterDate(start_date, end_date).filterBounds(aoi)
+#     first = col.first()
+#     band_names = []
+#     try:
+#         band_names = first.bandNames().getInfo()
+#     except Exception:
+#         band_names = []
+#     chosen = None
+#     for b in ['Optical_Depth_047', 'Optical_Depth_055', 'AOD_047', 'AOD_550']:
+#         if b in band_names:
+#             chosen = b
+#             break
+#     if not chosen and band_names:
+#         chosen = band_names[0]
+#     if not chosen:
+#         return {'aod_mean': None, 'aod_band_used': None}
+#     mean_img = col.select(chosen).mean()
+#     stats = reduce_mean(mean_img, aoi, scale=1000)
+#     mean_val = list(stats.values())[0] if stats else None
+#     return {'aod_mean': mean_val, 'aod_band_used': chosen}
+
+# def get_elevation_stats(aoi):
+#     dem = ee.Image(SRTM)
+#     stats = reduce_mean(dem, aoi, scale=30)
+#     elev = list(stats.values())[0] if stats else None
+#     return {'elevation_mean_m': elev}
+
+# def get_precipitation_total(aoi, start_date, end_date):
+#     col = ee.ImageCollection(GPM_IMERG).filterDate(start_date, end_date).filterBounds(aoi)
+#     first = col.first()
+#     # detect band
+#     band_names = []
+#     try:
+#         band_names = first.bandNames().getInfo()
+#     except Exception:
+#         band_names = []
+#     chosen = None
+#     for b in ['precipitationCal', 'precipitation', 'precipitationCal_1km']:
+#         if b in band_names:
+#             chosen = b
+#             break
+#     if not chosen and band_names:
+#         chosen = band_names[0]
+#     if not chosen:
+#         return {'precip_total': None, 'precip_band_used': None}
+#     precip_sum = col.select(chosen).sum()
+#     stats = reduce_mean(precip_sum, aoi, scale=1000)
+#     val = list(stats.values())[0] if stats else None
+#     return {'precip_total_mean_mm': val, 'precip_band_used': chosen}
+
+# def get_landcover_stats(aoi):
+#     # Get first image from collection
+#     wc_image = ee.ImageCollection(WORLD_COVER).first().select('Map')
+    
+#     # frequency histogram
+#     hist = wc_image.reduceRegion(
+#         ee.Reducer.frequencyHistogram(),
+#         aoi,
+#         scale=10,
+#         maxPixels=MAX_PIXELS
+#     )
+#     hist_i = safe_getinfo(hist)
+#     dominant = None
+#     if hist_i:
+#         try:
+#             d = list(hist_i.values())[0]
+#             items = [(int(k), int(v)) for k, v in d.items()]
+#             items.sort(key=lambda x: x[1], reverse=True)
+#             dominant = items[0][0] if items else None
+#         except Exception:
+#             dominant = None
+#     return {'landcover_dominant_class': dominant}
+
+
+# def get_water_proximity_and_floodscore(aoi, start_date, end_date):
+#     # JRC GlobalSurfaceWater occurrence band indicates percent of time water seen; use >50% as persistent water
+#     occ = ee.Image(JRC_GSW).select('occurrence')
+#     # create mask of persistent water
+#     persistent = occ.gte(50)
+#     # compute distance to persistent water (meters)
+#     distance = persistent.Not().fastDistanceTransform(30).sqrt()  # alternative methods exist
+#     # Note: EE distance transforms may be awkward. Simpler: buffer water and check proximity by reduction of min distance.
+#     # We'll compute mean occurrence (low occurrence -> less water), use elevation & precipitation to compute a simple flood score.
+#     occ_mean = reduce_mean(occ, aoi, scale=30)
+#     occ_val = list(occ_mean.values())[0] if occ_mean else None
+
+#     # Use elevation and precipitation to combine flood-like risk (lower elevation + higher precip)
+#     elev = get_elevation_stats(aoi)['elevation_mean_m']
+#     precip = get_precipitation_total(aoi, start_date, end_date)['precip_total_mean_mm']
+#     # Normalize simple flood score between 0 and 1:
+#     # low elevation => more risk (we'll map elevation to 0..1 by using a heuristic: 0 m -> 1, 200 m -> 0)
+#     elev_norm = None
+#     if elev is not None:
+#         elev_norm = max(0.0, min(1.0, 1.0 - (elev / 200.0)))
+#     # precip norm: assume 0-2000 mm range
+#     precip_norm = None
+#     if precip is not None:
+#         precip_norm = max(0.0, min(1.0, precip / 2000.0))
+#     # occurrence of water increases flood propensity
+#     occ_norm = None
+#     if occ_val is not None:
+#         occ_norm = max(0.0, min(1.0, occ_val / 100.0))
+#     # combine: flood_score = weighted sum
+#     components = []
+#     weights = []
+#     if elev_norm is not None:
+#         components.append(elev_norm); weights.append(0.4)
+#     if precip_norm is not None:
+#         components.append(precip_norm); weights.append(0.4)
+#     if occ_norm is not None:
+#         components.append(occ_norm); weights.append(0.2)
+#     flood_score = None
+#     if components:
+#         # weighted average
+#         flood_score = sum([c*w for c,w in zip(components, weights)]) / sum(weights)
+#     return {'water_occurrence_mean': occ_val, 'flood_risk_score': flood_score}
+
+# # ---------- SUITABILITY HEURISTICS ----------
+# def compute_suitabilities(profile):
+#     """
+#     Very simple heuristic scores (0..1):
+#      - greenspace_priority: high when population density high, NDVI low, LST high
+#      - industrial_suitability: high when landcover non-residential, flood risk low, scent of nightlight/activity high (we don't compute nightlights here)
+#      - residential_suitability: medium when air quality ok, flood risk low, proximity to greenspace
+#     These are starting heuristics — you should refine with local policy weights.
+#     """
+#     # helper safe-get
+#     def g(k):
+#         return profile.get(k)
+
+#     pop = g('population_density_mean_per_km2') or 0
+#     ndvi = g('ndvi_mean') or 0.0
+#     pct_green = g('pct_green') or 0.0
+#     lst = g('lst_mean_celsius_est') or 0.0
+#     aod = g('aod_mean') or 0.0
+#     flood = g('flood_risk_score') or 0.0
+#     landclass = profile.get('landcover_dominant_class')
+
+#     # Normalize inputs to 0..1 with simple heuristics
+#     pop_norm = max(0.0, min(1.0, pop / 10000.0))   # 10k people/km2 -> 1
+#     ndvi_norm = max(0.0, min(1.0, (ndvi + 0.2) / 0.8))  # NDVI ~ -0.2..0.6 -> map
+#     lst_norm = max(0.0, min(1.0, (lst - 20.0) / 25.0))   # 20C -> 0, 45C -> 1
+#     aod_norm = max(0.0, min(1.0, aod / 1.0))   # AOD of 1.0 -> high
+#     flood_norm = max(0.0, min(1.0, flood))
+
+#     # Greenspace priority: want high pop, low ndvi, high lst
+#     greenspace_priority = (0.5 * pop_norm) + (0.3 * (1 - ndvi_norm)) + (0.2 * lst_norm)
+#     greenspace_priority = max(0.0, min(1.0, greenspace_priority))
+
+#     # Industrial suitability: prefer non-dense residential (low pop), low flood, low AOD constraint (we prefer areas where factory won't harm many)
+#     # For simplicity: industry good when pop low AND flood low AND landcover is 'non-built' OR 'sparsely built' (we'll penalize class 50: Built-up)
+#     industry_score = (0.5 * (1 - pop_norm)) + (0.4 * (1 - flood_norm)) + (0.1 * (1 - aod_norm))
+#     industry_score = max(0.0, min(1.0, industry_score))
+
+#     # Residential suitability: prefer low flood, low AOD, some green nearby (pct_green)
+#     res_score = (0.4 * (1 - flood_norm)) + (0.3 * (1 - aod_norm)) + (0.3 * pct_green)
+#     res_score = max(0.0, min(1.0, res_score))
+
+#     return {
+#         'greenspace_priority': greenspace_priority,
+#         'industrial_suitability': industry_score,
+#         'residential_suitability': res_score,
+#         'best_use': ('greenspace' if greenspace_priority >= max(industry_score, res_score)
+#                      else ('residential' if res_score >= industry_score else 'industrial'))
+#     }
+
+# # ---------- MAIN FLOW ----------
+# def build_profile(aoi_ee, geojson_geom, start_date=START_DATE, end_date=END_DATE):
+#     profile = {}
+#     profile['generated_at'] = datetime.datetime.now(datetime.UTC).isoformat()
+#     profile['analysis_window'] = {'start': start_date, 'end': end_date}
+#     profile['geometry'] = geojson_geom
+
+#     print("Collecting population density...")
+#     profile.update(get_population_density_sedac(aoi_ee, year=2020))
+
+
+
+#     print("Collecting NDVI stats (Sentinel-2 median)...")
+#     ndvi = get_ndvi_stats(aoi_ee, start_date, end_date)
+#     profile.update(ndvi)
+
+#     print("Collecting LST stats (MODIS)...")
+#     lst = get_lst_stats(aoi_ee, start_date, end_date)
+#     profile.update(lst)
+
+#     print("Collecting AOD stats (MAIAC)...")
+#     aod = get_aod_stats(aoi_ee, start_date, end_date)
+#     profile.update(aod)
+
+#     print("Collecting elevation (SRTM)...")
+#     elev = get_elevation_stats(aoi_ee)
+#     profile.update(elev)
+
+#     print("Collecting precipitation (GPM IMERG)...")
+#     precip = get_precipitation_total(aoi_ee, start_date, end_date)
+#     profile.update(precip)
+
+#     print("Collecting landcover (ESA WorldCover)...")
+#     lc = get_landcover_stats(aoi_ee)
+#     profile.update(lc)
+
+#     print("Collecting water occurrence & flood proxy...")
+#     flood = get_water_proximity_and_floodscore(aoi_ee, start_date, end_date)
+#     profile.update(flood)
+
+#     print("Computing suitabilities...")
+#     suits = compute_suitabilities(profile)
+#     profile['suitability'] = suits
+
+#     return profile
+
+# if __name__ == "__main__":
+#     geojson_path = sys.argv[1] if len(sys.argv) > 1 else None
+#     print("Using GeoJSON:", geojson_path if geojson_path else "default bbox")
+
+#     aoi_ee, geojson_geom = read_geojson_to_eegeom(geojson_path)
+
+#     # Build profile
+#     result = build_profile(aoi_ee, geojson_geom, start_date=START_DATE, end_date=END_DATE)
+
+#     # Save to file
+#     out_file = "aoi_profile.json"
+#     with open(out_file, "w") as f:
+#         json.dump(result, f, indent=2)
+#     print(f"Saved AOI profile to {out_file}")
+
+#     # Print concise summary
+#     print("SUMMARY:")
+#     print(" Population density (mean):", result.get('population_density_mean_per_km2'))
+#     print(" NDVI mean:", result.get('ndvi_mean'), "Pct green:", result.get('pct_green'))
+#     print(" LST (C):", result.get('lst_mean_celsius_est'))
+#     print(" AOD (mean):", result.get('aod_mean'))
+#     print(" Elevation (m mean):", result.get('elevation_mean_m'))
+#     print(" Precip total (mm mean):", result.get('precip_total_mean_mm'))
+#     print(" Flood risk score (0..1):", result.get('flood_risk_score'))
+#     print(" Suitability:", result.get('suitability'))
+
+    
+
+
+
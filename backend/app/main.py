@@ -1,15 +1,67 @@
-from fastapi import FastAPI
-from app.api.routes_grok import router as grok_router
-import os
-from dotenv import load_dotenv
-
-# Load the .env file
-load_dotenv()
-app = FastAPI()
-
-XAI_API_KEY = os.getenv("XAI_API_KEY")
-app.include_router(grok_router, prefix="/api")
-
-@app.get("/")
-def root():
-    return {"message": "Grok advisory backend up"}
+from contextlib import asynccontextmanager
+import time
+from fastapi import FastAPI, Request
+from fastapi.responses import PlainTextResponse
+from app.api.routes_grok import router as grok_router, tile_batcher
+from app.api.routes_jobs import router as jobs_router
+from app.api.routes_tiles import router as tiles_router
+from app.services import http_client
+from app.services.profile_jobs import job_manager
+from app.services.instrumentation import HTTP_SECONDS, render_metrics
+import os
+from dotenv import load_dotenv
+
+# Load the .env file
+load_dotenv()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One pooled, keep-alive HTTP client shared by every upstream call
+    await http_client.start()
+    yield
+    # batched tile prompts still in flight need the client
+    await tile_batcher.close()
+    await http_client.close()
+    # queued profile jobs are dropped; running ones finish in the background
+    job_manager.shutdown()
+
+
+app = FastAPI(lifespan=lifespan)
+
+
+@app.middleware("http")
+async def record_latency(request: Request, call_next):
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # label by route template (/api/jobs/{job_id}), not the raw path
+        route = request.scope.get("route")
+        if route is None:
+            path = "unmatched"
+        elif route in app.router.routes:
+            path = route.path
+        else:
+            # routes of an included router report their path without its prefix
+            path = API_PREFIX + route.path
+        HTTP_SECONDS.observe(time.perf_counter() - start, method=request.method, path=path, status=status)
+
+
+XAI_API_KEY = os.getenv("XAI_API_KEY")
+API_PREFIX = "/api"
+app.include_router(grok_router, prefix=API_PREFIX)
+app.include_router(jobs_router, prefix=API_PREFIX)
+app.include_router(tiles_router, prefix=API_PREFIX)
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    return render_metrics()
+
+
+@app.get("/")
+def root():
+    return {"message": "Grok advisory backend up"}
@@ -1,37 +1,79 @@
-# app/services/analysis_service.py
-
-import json
-
-def build_grok_prompt(data: dict, user_type: str) -> str:
-    """
-    Build a prompt for Grok based on city metrics and user type.
-    """
-    base_prompt = f"""
-You are an expert urban planner and environmental analyst.
-Given structured tile-level metrics and model outputs, produce concise, evidence-based, professional planning recommendations.
-Consider the user's designation ({user_type}) while tailoring suggestions.
-Output must follow the provided JSON schema exactly, be factual, cite 2–3 supporting metrics in the rationale,
-and provide actionable next steps with department assignments.
-Avoid speculative language and absolute commands; use measured professional phrasing (e.g., "recommend", "consider", "prioritize").
-Return only valid JSON (no extra text).
-
-Data Input:
-{json.dumps(data, indent=2)}
-"""
-    return base_prompt
-
-
-def parse_grok_output(response_text: str) -> dict:
-    """
-    Safely parse Grok's JSON response.
-    """
-    try:
-        return json.loads(response_text)
-    except json.JSONDecodeError:
-        # Try to clean up any stray text around JSON
-        start = response_text.find("{")
-        end = response_text.rfind("}") + 1
-        if start != -1 and end != -1:
-            cleaned = response_text[start:end]
-            return json.loads(cleaned)
-        raise ValueError("Invalid Grok response format")
+# app/services/analysis_service.py
+
+import json
+
+# Instructions shared by the single-tile and batch prompts
+PLANNER_INSTRUCTIONS = """\
+You are an expert urban planner and environmental analyst.
+Given structured tile-level metrics and model outputs, produce concise, evidence-based, professional planning recommendations.
+Consider the user's designation ({user_type}) while tailoring suggestions.
+Output must follow the provided JSON schema exactly, be factual, cite 2–3 supporting metrics in the rationale,
+and provide actionable next steps with department assignments.
+Avoid speculative language and absolute commands; use measured professional phrasing (e.g., "recommend", "consider", "prioritize").
+"""
+
+
+def build_grok_prompt(data: dict, user_type: str) -> str:
+    """
+    Build a prompt for Grok based on city metrics and user type.
+    """
+    base_prompt = f"""
+{PLANNER_INSTRUCTIONS.format(user_type=user_type)}Return only valid JSON (no extra text).
+
+Data Input:
+{json.dumps(data, indent=2)}
+"""
+    return base_prompt
+
+
+def build_batch_prompt(tiles: list, user_type: str) -> str:
+    """
+    Build one prompt covering several tiles; the answer is keyed by tile_id.
+    Ids are written as strings, since JSON object keys are strings.
+    """
+    data = {str(t["tile_id"]): {k: v for k, v in t.items() if k != "tile_id"} for t in tiles}
+    base_prompt = f"""
+{PLANNER_INSTRUCTIONS.format(user_type=user_type)}The input holds several tiles keyed by tile_id. Return one JSON object with exactly the same keys,
+each mapped to that tile's recommendation object.
+Return only valid JSON (no extra text).
+
+Data Input:
+{json.dumps(data, separators=(",", ":"))}
+"""
+    return base_prompt
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough token count (~4 characters per token) used for prompt packing.
+    """
+    return len(text) // 4 + 1
+
+
+def split_batch_output(response_text: str, tile_ids: list) -> dict:
+    """
+    Parse a batch answer and return {tile_id: recommendation} for the requested tiles
+    (ids are matched as strings, so 7 finds the answer keyed "7").
+    """
+    parsed = parse_grok_output(response_text)
+    if isinstance(parsed, dict) and isinstance(parsed.get("tiles"), (dict, list)):
+        parsed = parsed["tiles"]
+    if isinstance(parsed, list):
+        parsed = {str(item.get("tile_id")): item for item in parsed if isinstance(item, dict)}
+    return {tile_id: parsed.get(str(tile_id)) for tile_id in tile_ids}
+
+
+def parse_grok_output(response_text: str) -> dict:
+    """
+    Safely parse Grok's JSON response.
+    """
+    try:
+        return json.loads(response_text)
+    except json.JSONDecodeError:
+        # Try to clean up any stray text around JSON
+        start = response_text.find("{")
+        end = response_text.rfind("}") + 1
+        if start != -1 and end != -1:
+            cleaned = response_text[start:end]
+            return json.loads(cleaned)
+        raise ValueError("Invalid Grok response format")
@@ -0,0 +1,72 @@
+# app/services/band_registry.py
+
+import json
+import os
+import threading
+import time
+
+DEFAULT_REGISTRY_PATH = os.getenv(
+    "BAND_REGISTRY_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".band_registry.json"),
+)
+DEFAULT_TTL = float(os.getenv("BAND_REGISTRY_TTL", str(30 * 24 * 3600)))  # seconds
+
+
+class BandRegistry:
+    """
+    On-disk record of each Earth Engine collection's band names.
+
+    Entries are filled as a side effect of requests that already run (see
+    get_data._lazy_band_mean) and looked up locally afterwards. An entry older
+    than `ttl` reads as missing, so it is refreshed lazily by the next request
+    instead of on a schedule.
+    """
+
+    def __init__(self, path=DEFAULT_REGISTRY_PATH, ttl=DEFAULT_TTL):
+        self.path = path
+        self.ttl = ttl
+        self._entries = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._entries is None:
+            try:
+                with open(self.path) as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError):
+                self._entries = {}
+        return self._entries
+
+    def get(self, collection_id):
+        """Band names for the collection, or None when unknown or stale."""
+        with self._lock:
+            entry = self._load().get(collection_id)
+        if not entry or (self.ttl and time.time() - entry.get("fetched_at", 0) > self.ttl):
+            return None
+        return list(entry["bands"])
+
+    def put(self, collection_id, bands):
+        bands = [str(b) for b in bands or []]
+        if not bands:
+            return
+        with self._lock:
+            entries = self._load()
+            current = entries.get(collection_id)
+            entries[collection_id] = {"bands": bands, "fetched_at": time.time()}
+            if current and current["bands"] == bands and \
+                    time.time() - current.get("fetched_at", 0) < (self.ttl or float("inf")) / 2:
+                return  # unchanged and still fresh; skip the write
+            try:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                tmp = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(tmp, "w") as f:
+                    json.dump(entries, f, indent=2, sort_keys=True)
+                os.replace(tmp, self.path)
+            except OSError as e:
+                print(f"⚠️ Could not save band registry {self.path}: {e}")
+
+    def clear(self):
+        with self._lock:
+            self._entries = {}
+            if os.path.exists(self.path):
+                os.remove(self.path)
@@ -0,0 +1,149 @@
+# app/services/batch_runner.py
+
+import json
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+ID_PROPERTIES = ("aoi_id", "id", "name")
+
+
+def _feature_id(feature, fallback):
+    props = feature.get("properties") or {}
+    for key in ID_PROPERTIES:
+        if props.get(key) not in (None, ""):
+            return str(props[key])
+    if feature.get("id") not in (None, ""):
+        return str(feature["id"])
+    return fallback
+
+
+def _features(geojson):
+    if geojson.get("type") == "FeatureCollection":
+        return geojson.get("features") or []
+    if geojson.get("type") == "Feature":
+        return [geojson]
+    return [{"type": "Feature", "properties": {}, "geometry": geojson}]
+
+
+def dissolve(geojson):
+    """
+    Union every feature of a GeoJSON object (geometry, Feature or FeatureCollection)
+    into one GeoJSON geometry; None if it has no geometry.
+    """
+    import shapely  # deferred: keeps API startup (routes_jobs imports this module) light
+    from shapely.geometry import shape
+
+    geoms = [shape(ft["geometry"]) for ft in _features(geojson) if ft.get("geometry")]
+    if not geoms:
+        return None
+    if len(geoms) == 1:
+        return json.loads(shapely.to_geojson(geoms[0]))
+    return json.loads(shapely.to_geojson(shapely.union_all(geoms)))
+
+
+def iter_aois(path):
+    """
+    Yield (aoi_id, geojson geometry) for every AOI under path.
+
+    A directory holds one AOI per *.geojson/*.json file (its features dissolved,
+    id = file name); a single file is a multi-feature GeoJSON with one AOI per
+    feature (id from aoi_id/id/name, else "<file>:<index>").
+    """
+    if os.path.isdir(path):
+        for name in sorted(os.listdir(path)):
+            stem, ext = os.path.splitext(name)
+            if ext.lower() not in (".geojson", ".json"):
+                continue
+            with open(os.path.join(path, name)) as f:
+                geom = dissolve(json.load(f))
+            if geom is not None:
+                yield stem, geom
+        return
+
+    stem = os.path.splitext(os.path.basename(path))[0]
+    with open(path) as f:
+        feats = _features(json.load(f))
+    for i, ft in enumerate(feats):
+        if ft.get("geometry"):
+            yield _feature_id(ft, f"{stem}:{i}"), ft["geometry"]
+
+
+class Checkpoint:
+    """
+    Append-only file of completed AOI ids; reopening it resumes where a run stopped.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.done = set()
+        if os.path.exists(path):
+            with open(path) as f:
+                self.done = {line.strip() for line in f if line.strip()}
+        self._f = open(path, "a")
+
+    def __contains__(self, aoi_id):
+        return aoi_id in self.done
+
+    def mark(self, aoi_id):
+        self.done.add(aoi_id)
+        self._f.write(aoi_id + "\n")
+        self._f.flush()
+        os.fsync(self._f.fileno())
+
+    def close(self):
+        self._f.close()
+
+
+def run_batch(aois, worker, out_path, checkpoint_path=None, processes=4, options=None):
+    """
+    Profile AOIs on a process pool, streaming each result to out_path as NDJSON.
+
+    worker(aoi_id, geometry, options) must be a picklable top-level function returning
+    a dict. Results are written as they complete and only then checkpointed, so a
+    crash can repeat (never lose) the last few AOIs on resume. Failed AOIs are written
+    as {"aoi_id", "error"} lines and not checkpointed, so the next run retries them.
+    Returns (completed, failed, skipped) counts.
+    """
+    checkpoint = Checkpoint(checkpoint_path or f"{out_path}.done")
+    completed = failed = skipped = 0
+    max_in_flight = max(1, processes) * 2
+    aois = iter(aois)
+
+    with open(out_path, "a") as out, ProcessPoolExecutor(max_workers=max(1, processes)) as pool:
+        pending = {}
+
+        def fill():
+            nonlocal skipped
+            while len(pending) < max_in_flight:
+                try:
+                    aoi_id, geometry = next(aois)
+                except StopIteration:
+                    return
+                if aoi_id in checkpoint:
+                    skipped += 1
+                    continue
+                pending[pool.submit(worker, aoi_id, geometry, options or {})] = aoi_id
+
+        fill()
+        while pending:
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in finished:
+                aoi_id = pending.pop(fut)
+                try:
+                    record = fut.result()
+                    record["aoi_id"] = aoi_id
+                except Exception as e:
+                    record = {"aoi_id": aoi_id, "error": str(e)}
+                out.write(json.dumps(record) + "\n")
+                out.flush()
+                if "error" in record:
+                    failed += 1
+                    print(f"⚠️ {aoi_id} failed: {record['error']}")
+                else:
+                    checkpoint.mark(aoi_id)
+                    completed += 1
+                    print(f"✅ {aoi_id} done ({completed} completed)")
+            fill()
+
+    checkpoint.close()
+    return completed, failed, skipped
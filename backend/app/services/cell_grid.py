@@ -0,0 +1,90 @@
+# app/services/cell_grid.py
+
+import json
+import math
+import os
+
+from app.services.profile_cache import DEFAULT_CACHE_DIR
+
+# Global grid: Web Mercator (quadkey) tiles at a fixed zoom. Zoom 14 cells are
+# ~2.4 km across at the equator (~2.2 km over Ahmedabad).
+CELL_ZOOM = int(os.getenv("CELL_GRID_ZOOM", "14"))
+CELL_CACHE_DIR = os.path.join(DEFAULT_CACHE_DIR, "cells")
+MAX_LAT = 85.05112878
+
+
+def lonlat_to_tile(lon, lat, zoom):
+    lat = max(-MAX_LAT, min(MAX_LAT, lat))
+    n = 2 ** zoom
+    x = int((lon + 180.0) / 360.0 * n)
+    y = int((1.0 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2.0 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+
+def tile_bounds(x, y, zoom):
+    """[minLon, minLat, maxLon, maxLat] of tile x/y."""
+    n = 2 ** zoom
+
+    def lat(row):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * row / n))))
+
+    return [x / n * 360.0 - 180.0, lat(y + 1), (x + 1) / n * 360.0 - 180.0, lat(y)]
+
+
+def quadkey(x, y, zoom):
+    digits = []
+    for z in range(zoom, 0, -1):
+        mask = 1 << (z - 1)
+        digits.append(str((1 if x & mask else 0) + (2 if y & mask else 0)))
+    return "".join(digits)
+
+
+def quadkey_to_tile(key):
+    """(x, y, zoom) of a quadkey."""
+    x = y = 0
+    zoom = len(key)
+    for i, d in enumerate(key):
+        mask = 1 << (zoom - i - 1)
+        if d in "13":
+            x |= mask
+        if d in "23":
+            y |= mask
+    return x, y, zoom
+
+
+def cover(geojson_geom: dict, zoom: int = CELL_ZOOM) -> list:
+    """
+    Grid cells touching a lon/lat AOI.
+
+    Returns [{'cell_id': <quadkey>, 'geometry': <cell GeoJSON>, 'weight': <AOI share
+    of the cell area>, 'part': <AOI ∩ cell GeoJSON, edge cells only>}, ...]; interior
+    cells have weight 1.0 and no 'part'.
+    """
+    import shapely
+    from shapely.geometry import box, shape
+    from shapely.prepared import prep
+
+    aoi = shape(geojson_geom)
+    if aoi.is_empty:
+        return []
+    min_x, min_y, max_x, max_y = aoi.bounds
+    x0, y0 = lonlat_to_tile(min_x, max_y, zoom)
+    x1, y1 = lonlat_to_tile(max_x, min_y, zoom)
+
+    prepared = prep(aoi)
+    cells = []
+    for y in range(y0, y1 + 1):
+        for x in range(x0, x1 + 1):
+            cell = box(*tile_bounds(x, y, zoom))
+            if not prepared.intersects(cell):
+                continue
+            entry = {'cell_id': quadkey(x, y, zoom), 'geometry': json.loads(shapely.to_geojson(cell)),
+                     'weight': 1.0}
+            if not prepared.contains(cell):
+                part = cell.intersection(aoi)
+                if part.is_empty or part.area == 0:
+                    continue
+                entry['weight'] = part.area / cell.area
+                entry['part'] = json.loads(shapely.to_geojson(part))
+            cells.append(entry)
+    return cells
@@ -0,0 +1,274 @@
+# app/services/columnar.py
+"""
+Columnar storage for profiles and tile results.
+
+A table is a directory (conventionally `<name>.cols`) with one NumPy file per
+column, so readers memory-map just the columns they need instead of parsing a
+whole JSON document:
+
+    meta.json            {"version", "rows", "layout", "geometry", "columns": [{"name", "kind", "file"}, ...]}
+    c0000.npy ...        one column each; kinds:
+                           float  float64, NaN = missing (ints with gaps land here too)
+                           int    int64 (no missing values; 0 where the key is absent)
+                           str    fixed-width unicode, "" = missing
+                           json   fixed-width unicode of JSON text (lists, bools, mixed)
+    c0000.present.npy    bool [rows], only for columns some rows don't have
+    geometry.wkb         every row's geometry as WKB, back to back
+    geometry.offsets.npy int64 [rows + 1] byte offsets into geometry.wkb
+
+Nested dicts are flattened to dotted column names ('suitability.best_use') and
+rebuilt by records(), so a table converts back to the same JSON (ints stored
+as float come back as floats). Keys a row didn't have stay absent from its
+record; values() reports them as None. Empty dicts are stored as JSON leaves.
+
+    python -m app.services.columnar aoi_tiles.json aoi_tiles.cols   # JSON/NDJSON -> columnar
+    python -m app.services.columnar aoi_tiles.cols aoi_tiles.json   # columnar -> JSON
+"""
+
+import argparse
+import json
+import math
+import os
+import shutil
+
+import numpy as np
+
+FORMAT_VERSION = 1
+GEOMETRY_FILE = "geometry.wkb"
+OFFSETS_FILE = "geometry.offsets.npy"
+
+
+def table_path(path):
+    """The .cols table next to a JSON/NDJSON output path."""
+    return os.path.splitext(path)[0] + ".cols"
+
+
+def flatten(record, prefix=""):
+    flat = {}
+    for key, value in record.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict) and value:
+            flat.update(flatten(value, f"{name}."))
+        else:
+            flat[name] = value
+    return flat
+
+
+def unflatten(flat):
+    record = {}
+    for name, value in flat.items():
+        *path, leaf = name.split(".")
+        target = record
+        for part in path:
+            if not isinstance(target.get(part), dict):
+                target[part] = {}  # replaces an empty-dict leaf of the same name
+            target = target[part]
+        target[leaf] = value
+    return record
+
+
+def _kind(values):
+    present = [v for v in values if v is not None]
+    if all(isinstance(v, int) and not isinstance(v, bool) for v in present) and len(present) == len(values):
+        return "int"
+    if all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in present):
+        return "float"
+    if all(isinstance(v, str) for v in present) and not ("" in present and len(present) < len(values)):
+        return "str"
+    return "json"
+
+
+def _column(values, kind):
+    if kind == "int":
+        return np.array([0 if v is None else v for v in values], dtype=np.int64)  # None: absent key
+    if kind == "float":
+        return np.array([math.nan if v is None else v for v in values], dtype=np.float64)
+    if kind == "str":
+        return np.array(["" if v is None else v for v in values], dtype=str)
+    return np.array([json.dumps(v) for v in values], dtype=str)
+
+
+def write_table(path, records, geometries=None, layout="records"):
+    """
+    Write records (dicts, nested allowed) and optional per-row GeoJSON geometries
+    as a columnar table at `path`, replacing any existing table. `layout` records
+    what the rows were ('features' or 'profiles') for converting back to JSON.
+    """
+    import shapely
+    from shapely.geometry import shape
+
+    flat = [flatten(r) for r in records]
+    names = list(dict.fromkeys(name for row in flat for name in row))
+    tmp = f"{path}.tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+
+    columns = []
+    for i, name in enumerate(names):
+        values = [row.get(name) for row in flat]
+        kind = _kind([v for row, v in zip(flat, values) if name in row])
+        file = f"c{i:04d}.npy"
+        np.save(os.path.join(tmp, file), _column(values, kind))
+        spec = {"name": name, "kind": kind, "file": file}
+        present = np.array([name in row for row in flat], dtype=bool)
+        if not present.all():
+            spec["present"] = f"c{i:04d}.present.npy"
+            np.save(os.path.join(tmp, spec["present"]), present)
+        columns.append(spec)
+
+    meta = {"version": FORMAT_VERSION, "rows": len(flat), "layout": layout,
+            "geometry": geometries is not None, "columns": columns}
+    if geometries is not None:
+        blobs = [shapely.to_wkb(shape(g)) if g else b"" for g in geometries]
+        offsets = np.zeros(len(blobs) + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in blobs], out=offsets[1:])
+        with open(os.path.join(tmp, GEOMETRY_FILE), "wb") as f:
+            for b in blobs:
+                f.write(b)
+        np.save(os.path.join(tmp, OFFSETS_FILE), offsets)
+    with open(os.path.join(tmp, "meta.json"), "w") as f:
+        json.dump(meta, f)
+
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(tmp, path)
+    return path
+
+
+def write_features(path, feature_collection):
+    """Columnar table of a FeatureCollection: properties as columns, geometry as WKB."""
+    features = feature_collection.get("features") or []
+    return write_table(path, [f.get("properties") or {} for f in features],
+                       [f.get("geometry") for f in features], layout="features")
+
+
+def write_profiles(path, profiles):
+    """Columnar table of profile dicts (aoi_profile.json / batch NDJSON records)."""
+    profiles = list(profiles)
+    return write_table(path, [{k: v for k, v in p.items() if k != "geometry"} for p in profiles],
+                       [p.get("geometry") for p in profiles], layout="profiles")
+
+
+class ColumnarTable:
+    """Read side of write_table(): columns are memory-mapped and loaded on demand."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, "meta.json")) as f:
+            self.meta = json.load(f)
+        if self.meta.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported columnar format version: {self.meta.get('version')}")
+        self._columns = {c["name"]: c for c in self.meta["columns"]}
+
+    def __len__(self):
+        return self.meta["rows"]
+
+    @property
+    def columns(self):
+        return list(self._columns)
+
+    def column(self, name):
+        """The raw column as a read-only memory map (json columns stay encoded)."""
+        try:
+            spec = self._columns[name]
+        except KeyError:
+            raise KeyError(f"No column '{name}' in {self.path}") from None
+        return np.load(os.path.join(self.path, spec["file"]), mmap_mode="r")
+
+    def present(self, name):
+        """Bool array: which rows have the column's key (all of them unless recorded)."""
+        spec = self._columns[name]
+        if "present" not in spec:
+            return np.ones(len(self), dtype=bool)
+        return np.load(os.path.join(self.path, spec["present"]), mmap_mode="r")
+
+    def values(self, name):
+        """Column as Python values, with missing values (and absent keys) as None."""
+        kind, col = self._columns[name]["kind"], self.column(name)
+        if kind == "float":
+            values = [None if math.isnan(v) else v for v in col.tolist()]
+        elif kind == "str":
+            values = [v or None for v in col.tolist()]
+        elif kind == "json":
+            values = [json.loads(v) for v in col.tolist()]
+        else:
+            values = col.tolist()
+        if "present" in self._columns[name]:
+            values = [v if p else None for v, p in zip(values, self.present(name).tolist())]
+        return values
+
+    def read(self, names=None):
+        """{name: memory-mapped column} for `names` (default all)."""
+        return {name: self.column(name) for name in (names or self.columns)}
+
+    def geometries(self, rows=None):
+        """Shapely geometries (None where missing) for `rows` (indices or slice; default all)."""
+        import shapely
+
+        if not self.meta.get("geometry"):
+            return np.full(len(self), None, dtype=object)
+        offsets = np.load(os.path.join(self.path, OFFSETS_FILE), mmap_mode="r")
+        blob_path = os.path.join(self.path, GEOMETRY_FILE)
+        blob = np.memmap(blob_path, dtype=np.uint8, mode="r") if os.path.getsize(blob_path) else b""
+        rows = np.arange(len(self))[rows] if rows is not None else np.arange(len(self))
+        wkb = [bytes(blob[offsets[i]:offsets[i + 1]]) or None for i in rows]
+        return shapely.from_wkb(wkb)
+
+    def records(self, names=None, geometry=True):
+        """Rows rebuilt as nested dicts (the JSON shape), with 'geometry' as GeoJSON."""
+        import shapely
+
+        names = names or self.columns
+        columns = {name: self.values(name) for name in names}
+        present = {name: self.present(name) for name in names}
+        rows = [unflatten({name: columns[name][i] for name in names if present[name][i]})
+                for i in range(len(self))]
+        if geometry and self.meta.get("geometry"):
+            for row, geom in zip(rows, self.geometries()):
+                row["geometry"] = json.loads(shapely.to_geojson(geom)) if geom is not None else None
+        return rows
+
+    def to_feature_collection(self, names=None):
+        features = []
+        for row in self.records(names):
+            geometry = row.pop("geometry", None)
+            features.append({"type": "Feature", "properties": row, "geometry": geometry})
+        return {"type": "FeatureCollection", "features": features}
+
+
+def convert(src, dst):
+    """JSON (FeatureCollection or profile) / NDJSON -> columnar, or columnar -> JSON."""
+    if os.path.isdir(src):
+        table = ColumnarTable(src)
+        if dst.endswith(".ndjson"):
+            with open(dst, "w") as f:
+                for row in table.records():
+                    f.write(json.dumps(row) + "\n")
+            return dst
+        if table.meta.get("layout") == "features":
+            out = table.to_feature_collection()
+        else:
+            rows = table.records()
+            out = rows[0] if len(rows) == 1 else rows
+        with open(dst, "w") as f:
+            json.dump(out, f, indent=2)
+        return dst
+
+    with open(src) as f:
+        if src.endswith(".ndjson"):
+            return write_profiles(dst, (json.loads(line) for line in f if line.strip()))
+        data = json.load(f)
+    if isinstance(data, dict) and data.get("type") == "FeatureCollection":
+        return write_features(dst, data)
+    return write_profiles(dst, data if isinstance(data, list) else [data])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("src", help="JSON / NDJSON file or .cols directory")
+    parser.add_argument("dst", help="output .cols directory or JSON file")
+    args = parser.parse_args(argv)
+    print(f"Wrote {convert(args.src, args.dst)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+# app/services/ee_session.py
+
+import importlib
+import os
+import threading
+
+EE_PROJECT = os.getenv("EE_PROJECT", "projectproject-471216")
+
+# module attributes that don't need an initialized client
+NO_INIT = {"Initialize", "Authenticate", "EEException", "__version__", "data"}
+
+_state = {"initialized": False}
+_lock = threading.Lock()
+
+
+def initialize(project=EE_PROJECT):
+    """Run ee.Initialize() once per process (thread-safe); later calls are no-ops."""
+    if _state["initialized"]:
+        return
+    with _lock:
+        if _state["initialized"]:
+            return
+        module = importlib.import_module("ee")
+        try:
+            module.Initialize(project=project)
+        except Exception as e:
+            raise RuntimeError("ee.Initialize() failed. Run `earthengine authenticate` then try again.") from e
+        _state["initialized"] = True
+
+
+def is_initialized():
+    return _state["initialized"]
+
+
+class LazyEarthEngine:
+    """
+    Stand-in for the `ee` module that imports and initializes Earth Engine on
+    first real use (the first ee.Image, ee.Geometry, ...), so importing code
+    that merely references `ee` stays fast and works without credentials.
+    """
+
+    def __getattr__(self, name):
+        if name not in NO_INIT:
+            initialize()
+        return getattr(importlib.import_module("ee"), name)
+
+
+ee = LazyEarthEngine()
@@ -0,0 +1,108 @@
+# app/services/geometry.py
+
+import json
+import math
+import os
+import threading
+from collections import OrderedDict
+
+from app.services.profile_cache import DEFAULT_CACHE_DIR, ProfileCache, geometry_hash
+
+METERS_PER_DEGREE = 111_320.0
+MAX_VERTICES = int(os.getenv("GEOMETRY_MAX_VERTICES", "5000"))
+GEOMETRY_CACHE_DIR = os.path.join(DEFAULT_CACHE_DIR, "geometry")
+GEOMETRY_MEMO_ENTRIES = int(os.getenv("GEOMETRY_MEMO_ENTRIES", "256"))
+
+_memo = OrderedDict()  # in-process LRU in front of the disk cache
+_memo_lock = threading.Lock()
+_cache = None
+_cache_lock = threading.Lock()
+
+
+# shapely is imported inside the functions: importing this module (as get_data
+# does at startup) shouldn't pay for it.
+def aoi_area_m2(geojson_geom: dict) -> float:
+    """Approximate area of a lon/lat GeoJSON geometry in square meters (no round-trip)."""
+    from shapely.geometry import shape
+
+    geom = shape(geojson_geom)
+    if geom.is_empty:
+        return 0.0
+    lat = math.radians(geom.centroid.y)
+    return geom.area * METERS_PER_DEGREE ** 2 * max(math.cos(lat), 1e-6)
+
+
+def geometry_bounds(geojson_geom: dict) -> list:
+    """[minLon, minLat, maxLon, maxLat] of a GeoJSON geometry."""
+    from shapely.geometry import shape
+
+    return list(shape(geojson_geom).bounds)
+
+
+def vertex_count(geojson_geom: dict) -> int:
+    import shapely
+    from shapely.geometry import shape
+
+    return int(shapely.get_num_coordinates(shape(geojson_geom)))
+
+
+def simplify_to_budget(geojson_geom: dict, max_vertices=MAX_VERTICES) -> dict:
+    """
+    Topology-preserving simplification down to at most `max_vertices` vertices.
+
+    Binary-searches the smallest Douglas-Peucker tolerance that fits the budget,
+    so small AOIs come back unchanged and large boundaries lose only what they must.
+    """
+    import shapely
+    from shapely.geometry import shape
+
+    geom = shape(geojson_geom)
+    if max_vertices is None or shapely.get_num_coordinates(geom) <= max_vertices:
+        return geojson_geom
+
+    minx, miny, maxx, maxy = geom.bounds
+    lo, hi = 0.0, max(maxx - minx, maxy - miny)
+    best = geom.simplify(hi, preserve_topology=True)
+    for _ in range(30):
+        mid = (lo + hi) / 2
+        candidate = geom.simplify(mid, preserve_topology=True)
+        if shapely.get_num_coordinates(candidate) <= max_vertices:
+            best, hi = candidate, mid
+        else:
+            lo = mid
+        if hi - lo < hi * 0.01:
+            break
+    return json.loads(shapely.to_geojson(best))
+
+
+def _geometry_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ProfileCache(root=GEOMETRY_CACHE_DIR, max_entries=500)
+        return _cache
+
+
+def simplified_geometry(geojson_geom: dict, max_vertices=MAX_VERTICES, use_cache=True) -> dict:
+    """
+    simplify_to_budget() memoized in-process and on disk by geometry hash, so a
+    large boundary is simplified once and every later run sends the same geometry
+    (which also keeps the profile cache keys stable).
+    """
+    key = ProfileCache.key(kind="simplified_geometry", geometry=geometry_hash(geojson_geom),
+                           max_vertices=max_vertices)
+    with _memo_lock:
+        if key in _memo:
+            _memo.move_to_end(key)
+            return _memo[key]
+    cache = _geometry_cache() if use_cache else None
+    simplified = cache.get(key) if cache is not None else None
+    if simplified is None:
+        simplified = simplify_to_budget(geojson_geom, max_vertices)
+        if cache is not None:
+            cache.put(key, simplified)
+    with _memo_lock:
+        _memo[key] = simplified
+        while len(_memo) > GEOMETRY_MEMO_ENTRIES:
+            _memo.popitem(last=False)
+    return simplified
@@ -0,0 +1,129 @@
+# app/services/grok_batcher.py
+
+import asyncio
+import json
+import os
+
+from app.services.analysis_service import build_batch_prompt, estimate_tokens, split_batch_output
+
+BATCH_WINDOW = float(os.getenv("GROK_BATCH_WINDOW_MS", "50")) / 1000.0
+BATCH_TOKEN_BUDGET = int(os.getenv("GROK_BATCH_TOKEN_BUDGET", "6000"))
+BATCH_MAX_TILES = int(os.getenv("GROK_BATCH_MAX_TILES", "25"))
+
+# tokens taken by the instructions around the tile data
+PROMPT_OVERHEAD = estimate_tokens(build_batch_prompt([], ""))
+
+
+def tile_tokens(tile: dict) -> int:
+    return estimate_tokens(json.dumps(tile, separators=(",", ":")))
+
+
+def pack_tiles(tiles: list, token_budget=BATCH_TOKEN_BUDGET, max_tiles=BATCH_MAX_TILES) -> list:
+    """
+    Greedily split tiles into chunks whose prompts fit the token budget.
+
+    A tile_id appears at most once per chunk (the answer is keyed by it); a tile
+    larger than the whole budget still gets a chunk of its own.
+    """
+    chunks, current, ids, used = [], [], set(), PROMPT_OVERHEAD
+    for tile in tiles:
+        cost = tile_tokens(tile)
+        if current and (used + cost > token_budget or len(current) >= max_tiles
+                        or str(tile["tile_id"]) in ids):
+            chunks.append(current)
+            current, ids, used = [], set(), PROMPT_OVERHEAD
+        current.append(tile)
+        ids.add(str(tile["tile_id"]))  # 7 and "7" share a key in the prompt
+        used += cost
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+class TileBatcher:
+    """
+    Collects tile requests for a short window and answers them with as few
+    upstream prompts as the token budget allows.
+
+    call_upstream(prompt) must return the model's text answer.
+    """
+
+    def __init__(self, call_upstream, window=BATCH_WINDOW, token_budget=BATCH_TOKEN_BUDGET,
+                 max_tiles=BATCH_MAX_TILES):
+        self.call_upstream = call_upstream
+        self.window = window
+        self.token_budget = token_budget
+        self.max_tiles = max_tiles
+        self.upstream_calls = 0
+        self._pending = {}  # user_type -> [(tile, future)]
+        self._timers = {}
+        self._tasks = set()  # in-flight upstream calls; the loop only keeps weak references
+
+    async def submit(self, tile: dict, user_type: str) -> dict:
+        """
+        Queue one tile and wait for its recommendation.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        queue = self._pending.setdefault(user_type, [])
+        queue.append((tile, future))
+
+        queued_tokens = PROMPT_OVERHEAD + sum(tile_tokens(t) for t, _ in queue)
+        if queued_tokens >= self.token_budget or len(queue) >= self.max_tiles:
+            self._flush(user_type)
+        elif user_type not in self._timers:
+            self._timers[user_type] = loop.call_later(self.window, self._flush, user_type)
+        return await future
+
+    def _flush(self, user_type):
+        timer = self._timers.pop(user_type, None)
+        if timer is not None:
+            timer.cancel()
+        queue = self._pending.pop(user_type, [])
+        if not queue:
+            return
+
+        # identical tiles (same id and metrics) share one slot in the prompt
+        waiters, unique = {}, []
+        for tile, future in queue:
+            key = json.dumps(tile, sort_keys=True)
+            if key not in waiters:
+                waiters[key] = []
+                unique.append(tile)
+            waiters[key].append(future)
+
+        for chunk in pack_tiles(unique, self.token_budget, self.max_tiles):
+            futures = [waiters[json.dumps(t, sort_keys=True)] for t in chunk]
+            task = asyncio.create_task(self._run(chunk, futures, user_type))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def close(self):
+        """
+        Send what is still queued and wait for every upstream call to finish.
+        """
+        for user_type in list(self._pending):
+            self._flush(user_type)
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def _run(self, chunk, futures, user_type):
+        self.upstream_calls += 1
+        try:
+            text = await self.call_upstream(build_batch_prompt(chunk, user_type))
+            results = split_batch_output(text, [t["tile_id"] for t in chunk])
+        except Exception as e:
+            for group in futures:
+                for future in group:
+                    if not future.done():
+                        future.set_exception(e)
+            return
+        for tile, group in zip(chunk, futures):
+            result = results.get(tile["tile_id"])
+            for future in group:
+                if future.done():
+                    continue
+                if result is None:
+                    future.set_exception(ValueError(f"No recommendation returned for {tile['tile_id']}"))
+                else:
+                    future.set_result(result)
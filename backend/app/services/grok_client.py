@@ -1,21 +1,21 @@
-import os
-import requests
-from dotenv import load_dotenv
-
-load_dotenv()
-
-API_KEY = os.getenv("GROK_API_KEY")
-API_URL = os.getenv("GROK_API_URL")
-
-def call_grok(prompt: str):
-    headers = {
-        "Authorization": f"Bearer {API_KEY}",
-        "Content-Type": "application/json"
-    }
-    body = {
-        "prompt": prompt,
-        "model": "grok-4"   # or whichever version is available
-    }
-    resp = requests.post(API_URL, json=body, headers=headers)
-    resp.raise_for_status()
-    return resp.json()
+import os
+from dotenv import load_dotenv
+from app.services.http_client import get_client
+
+load_dotenv()
+
+API_KEY = os.getenv("GROK_API_KEY")
+API_URL = os.getenv("GROK_API_URL")
+
+async def call_grok(prompt: str):
+    headers = {
+        "Authorization": f"Bearer {API_KEY}",
+        "Content-Type": "application/json"
+    }
+    body = {
+        "prompt": prompt,
+        "model": "grok-4"   # or whichever version is available
+    }
+    resp = await get_client().post(API_URL, json=body, headers=headers)
+    resp.raise_for_status()
+    return resp.json()
@@ -0,0 +1,55 @@
+# app/services/http_client.py
+
+import os
+
+import httpx
+
+# Pool / timeout settings for the upstream LLM API (override via environment)
+MAX_CONNECTIONS = int(os.getenv("GROK_MAX_CONNECTIONS", "100"))
+MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("GROK_MAX_KEEPALIVE_CONNECTIONS", "20"))
+KEEPALIVE_EXPIRY = float(os.getenv("GROK_KEEPALIVE_EXPIRY", "30"))
+TIMEOUT = float(os.getenv("GROK_TIMEOUT", "15"))
+CONNECT_TIMEOUT = float(os.getenv("GROK_CONNECT_TIMEOUT", "5"))
+
+_client = None
+
+
+def _new_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=MAX_CONNECTIONS,
+            max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=KEEPALIVE_EXPIRY,
+        ),
+        timeout=httpx.Timeout(TIMEOUT, connect=CONNECT_TIMEOUT),
+    )
+
+
+async def start():
+    """
+    Create the shared client; called once at app startup.
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _new_client()
+    return _client
+
+
+async def close():
+    """
+    Close the shared client (and its pooled connections) at app shutdown.
+    """
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def get_client() -> httpx.AsyncClient:
+    """
+    Return the shared pooled client, creating it if startup hasn't run (e.g. scripts).
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _new_client()
+    return _client
@@ -0,0 +1,180 @@
+# app/services/instrumentation.py
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+BYTES_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+MAX_TRACE_EVENTS = 200_000
+
+
+# ---------- METRICS ----------
+def _label_str(labels):
+    if not labels:
+        return ""
+    parts = []
+    for k, v in labels:
+        v = str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        parts.append(f'{k}="{v}"')
+    return "{" + ",".join(parts) + "}"
+
+
+class Counter:
+    def __init__(self, name, help_text):
+        self.name, self.help = name, help_text
+        self.values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for key, value in sorted(self.values.items()):
+            lines.append(f"{self.name}{_label_str(key)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help_text, buckets=LATENCY_BUCKETS):
+        self.name, self.help = name, help_text
+        self.buckets = tuple(buckets)
+        self.series = {}  # labels -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            s = self.series.get(key)
+            if s is None:
+                s = self.series[key] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    s[i] += 1
+            s[-2] += value
+            s[-1] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for key, s in sorted(self.series.items()):
+            for bound, n in zip(self.buckets, s):
+                lines.append(f"{self.name}_bucket{_label_str(key + (('le', bound),))} {n}")
+            lines.append(f"{self.name}_bucket{_label_str(key + (('le', '+Inf'),))} {s[-1]}")
+            lines.append(f"{self.name}_sum{_label_str(key)} {s[-2]}")
+            lines.append(f"{self.name}_count{_label_str(key)} {s[-1]}")
+        return lines
+
+
+GETINFO_SECONDS = Histogram("ee_getinfo_seconds", "Latency of Earth Engine getInfo() calls")
+GETINFO_BYTES = Histogram("ee_getinfo_response_bytes", "JSON size of getInfo() results", BYTES_BUCKETS)
+GETINFO_FAILURES = Counter("ee_getinfo_failures_total", "getInfo() calls that raised")
+STAGE_SECONDS = Histogram("profile_stage_seconds", "Wall-clock time of build_profile spans")
+HTTP_SECONDS = Histogram("http_request_seconds", "API request latency")
+UPSTREAM_SECONDS = Histogram("grok_upstream_seconds", "Latency of upstream LLM calls")
+
+REGISTRY = [GETINFO_SECONDS, GETINFO_BYTES, GETINFO_FAILURES, STAGE_SECONDS, HTTP_SECONDS, UPSTREAM_SECONDS]
+
+
+def render_metrics() -> str:
+    """Every registered metric in the Prometheus text exposition format."""
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# ---------- TRACING ----------
+_local = threading.local()
+_trace = {"enabled": os.getenv("PROFILE_TRACE") == "1", "events": [], "t0": time.perf_counter()}
+_trace_lock = threading.Lock()
+
+
+def enable_tracing():
+    """Start recording spans for dump_chrome_trace() (off by default: the API would grow forever)."""
+    with _trace_lock:
+        _trace["enabled"] = True
+        _trace["events"] = []
+        _trace["t0"] = time.perf_counter()
+
+
+def current_stage():
+    stack = getattr(_local, "stack", None)
+    return stack[-1] if stack else "-"
+
+
+def _record(name, cat, start, seconds, args):
+    if not _trace["enabled"]:
+        return
+    with _trace_lock:
+        if len(_trace["events"]) >= MAX_TRACE_EVENTS:
+            return
+        _trace["events"].append({
+            "name": name, "cat": cat, "ph": "X", "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "ts": round((start - _trace["t0"]) * 1e6, 1), "dur": round(seconds * 1e6, 1),
+            "args": args,
+        })
+
+
+@contextmanager
+def span(name, cat="stage", **args):
+    """
+    Time a block as a profile span: observed in profile_stage_seconds{span=name}
+    and, when tracing, written as a Chrome-trace event. getInfo() calls inside
+    the block (on the same thread) are labelled with `name`.
+    """
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    stack.append(name)
+    start = time.perf_counter()
+    error = None
+    try:
+        yield
+    except Exception as e:
+        error = type(e).__name__
+        raise
+    finally:
+        seconds = time.perf_counter() - start
+        stack.pop()
+        STAGE_SECONDS.observe(seconds, span=name)
+        if error:
+            args = {**args, "error": error}
+        _record(name, cat, start, seconds, args)
+
+
+def timed_getinfo(obj, label=None):
+    """
+    obj.getInfo() with its latency, response size and failures recorded
+    under the enclosing span (or `label`). Exceptions propagate.
+    """
+    stage = label or current_stage()
+    start = time.perf_counter()
+    try:
+        result = obj.getInfo()
+    except Exception as e:
+        seconds = time.perf_counter() - start
+        GETINFO_SECONDS.observe(seconds, stage=stage)
+        GETINFO_FAILURES.inc(stage=stage, error=type(e).__name__)
+        _record("getInfo", "ee", start, seconds, {"stage": stage, "error": str(e)[:200]})
+        raise
+    seconds = time.perf_counter() - start
+    size = len(json.dumps(result, separators=(",", ":"), default=str))
+    GETINFO_SECONDS.observe(seconds, stage=stage)
+    GETINFO_BYTES.observe(size, stage=stage)
+    _record("getInfo", "ee", start, seconds, {"stage": stage, "bytes": size})
+    return result
+
+
+def dump_chrome_trace(path):
+    """Write recorded spans as Chrome trace JSON (open in chrome://tracing or Perfetto)."""
+    with _trace_lock:
+        events = list(_trace["events"])
+    with open(path, "w") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+    return len(events)
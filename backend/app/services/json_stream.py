@@ -0,0 +1,82 @@
+# app/services/json_stream.py
+
+import json
+
+
+class JSONFieldStream:
+    """
+    Incremental parser for a streamed JSON object.
+
+    feed() takes the next chunk of model output and returns the top-level
+    (key, value) pairs whose values completed within it, so fields such as
+    overall_assessment can be shown before the rest of the object arrives.
+    Text before the opening brace (e.g. "Here is the JSON:") is skipped.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._key = None
+        self._key_start = None
+        self._value_start = None
+        self.fields = {}
+
+    def feed(self, chunk: str) -> list:
+        self.buffer += chunk
+        completed = []
+        buf = self.buffer
+        while self._pos < len(buf):
+            i, ch = self._pos, buf[self._pos]
+            self._pos += 1
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._value_start is None:
+                        self._key = json.loads(buf[self._key_start:i + 1])
+                    elif self._depth == 1:
+                        self._emit(buf[self._value_start:i + 1], completed)
+                continue
+
+            if self._depth == 0:
+                if ch == "{":
+                    self._depth = 1
+                continue
+
+            if ch == '"':
+                self._in_string = True
+                if self._depth == 1 and self._value_start is None and self._key is None:
+                    self._key_start = i
+            elif ch == ":" and self._depth == 1 and self._key is not None and self._value_start is None:
+                self._value_start = i + 1
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 1 and self._value_start is not None:
+                    self._emit(buf[self._value_start:i + 1], completed)
+                elif self._depth == 0:
+                    # scalar last value, e.g. {"score": 3}
+                    self._emit(buf[self._value_start:i] if self._value_start is not None else "", completed)
+            elif ch == "," and self._depth == 1:
+                self._emit(buf[self._value_start:i] if self._value_start is not None else "", completed)
+        return completed
+
+    def _emit(self, raw, completed):
+        key, raw = self._key, raw.strip()
+        self._key = self._key_start = self._value_start = None
+        if key is None or not raw or key in self.fields:
+            return
+        try:
+            value = json.loads(raw)
+        except ValueError:
+            return
+        self.fields[key] = value
+        completed.append((key, value))
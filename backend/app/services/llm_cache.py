@@ -0,0 +1,207 @@
+# app/services/llm_cache.py
+
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from app.services.profile_cache import canonical_json
+
+CACHE_STORE = os.getenv("GROK_CACHE_STORE", "memory")  # "memory", "sqlite" or "off"
+CACHE_PATH = os.getenv("GROK_CACHE_PATH", "grok_cache.sqlite3")
+CACHE_TTL = float(os.getenv("GROK_CACHE_TTL", "86400"))
+CACHE_MAX_ENTRIES = int(os.getenv("GROK_CACHE_MAX_ENTRIES", "10000"))
+
+
+def cache_key(data: dict, model: str, temperature: float) -> str:
+    """
+    Key an LLM request by its canonicalized payload (key order and whitespace don't matter).
+    """
+    raw = canonical_json({"data": data, "model": model, "temperature": temperature})
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class MemoryStore:
+    """
+    In-process LRU store with per-entry expiry.
+    """
+
+    blocking = False
+
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.time():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = (time.time() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def __len__(self):
+        return len(self._data)
+
+
+class SQLiteStore:
+    """
+    SQLite-backed store so several uvicorn workers share cached responses.
+    """
+
+    blocking = True
+
+    def __init__(self, path=CACHE_PATH, max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._local = threading.local()
+        with self._conn() as db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+                " expires_at REAL NOT NULL, last_used REAL NOT NULL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        now = time.time()
+        with self._conn() as db:
+            row = db.execute(
+                "SELECT value, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] < now:
+                db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            db.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+        return json.loads(row[0])
+
+    def put(self, key, value):
+        now = time.time()
+        with self._conn() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO responses (key, value, expires_at, last_used) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now + self.ttl, now),
+            )
+            db.execute("DELETE FROM responses WHERE expires_at < ?", (now,))
+            db.execute(
+                "DELETE FROM responses WHERE key IN ("
+                " SELECT key FROM responses ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def __len__(self):
+        return self._conn().execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+
+# set on a shared future when its leader was cancelled: the waiters fetch again
+_LEADER_CANCELLED = object()
+
+
+class LLMCache:
+    """
+    Response cache with single-flight: concurrent misses for the same key share one
+    upstream call. Coalescing is per process; a SQLiteStore shares the results.
+    """
+
+    def __init__(self, store=None):
+        self.store = store
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._inflight = {}
+
+    async def _call(self, fn, *args):
+        if self.store.blocking:
+            return await asyncio.to_thread(fn, *args)
+        return fn(*args)
+
+    async def get_or_fetch(self, key, fetch):
+        """
+        Return the cached value for key, or await fetch() once and cache its result.
+        """
+        if self.store is None:
+            self.misses += 1
+            return await fetch()
+
+        value = await self._call(self.store.get, key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        if key in self._inflight:
+            self.coalesced += 1
+            value = await asyncio.shield(self._inflight[key])
+            if value is _LEADER_CANCELLED:
+                # the first waiter back in becomes the new leader, the rest follow it
+                return await self.get_or_fetch(key, fetch)
+            return value
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await fetch()
+            await self._call(self.store.put, key, value)
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # mark retrieved when nobody else was waiting
+            raise
+        except BaseException:
+            # the leader's own client went away (CancelledError); that isn't the waiters' failure
+            future.set_result(_LEADER_CANCELLED)
+            raise
+        else:
+            future.set_result(value)
+            return value
+        finally:
+            del self._inflight[key]
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "store": type(self.store).__name__ if self.store is not None else None,
+            "entries": len(self.store) if self.store is not None else 0,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_ratio": (self.hits + self.coalesced) / lookups if lookups else None,
+        }
+
+
+def make_store(kind=CACHE_STORE):
+    if kind == "sqlite":
+        return SQLiteStore()
+    if kind == "memory":
+        return MemoryStore()
+    return None
+
+
+response_cache = LLMCache(make_store())
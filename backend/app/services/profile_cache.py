@@ -0,0 +1,139 @@
+# app/services/profile_cache.py
+
+import hashlib
+import json
+import os
+import threading
+import time
+
+DEFAULT_CACHE_DIR = os.getenv(
+    "PROFILE_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".profile_cache"),
+)
+DEFAULT_MAX_ENTRIES = 5000
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+DEFAULT_TTL = 7 * 24 * 3600  # seconds; applied to time-varying datasets only
+
+COORD_DECIMALS = 9
+
+
+def _round_coords(coords):
+    if isinstance(coords, (list, tuple)):
+        return [_round_coords(c) for c in coords]
+    if isinstance(coords, float):
+        return round(coords, COORD_DECIMALS)
+    return coords
+
+
+def canonical_json(obj) -> str:
+    return json.dumps(obj, sort_keys=True, separators=(",", ":"), default=str)
+
+
+def geometry_hash(geojson: dict) -> str:
+    """
+    Hash a GeoJSON geometry independently of key order and float noise.
+    """
+    geom = dict(geojson or {})
+    if "coordinates" in geom:
+        geom["coordinates"] = _round_coords(geom["coordinates"])
+    if "geometries" in geom:
+        geom["geometries"] = [json.loads(canonical_json(g)) for g in geom["geometries"]]
+    return hashlib.sha256(canonical_json(geom).encode()).hexdigest()
+
+
+class ProfileCache:
+    """
+    Content-addressed, size-bounded LRU cache of per-metric profile fields on disk.
+
+    One JSON file per entry; recency is the file mtime (refreshed on every hit), and
+    the least recently used files are removed once max_entries or max_bytes is exceeded.
+    """
+
+    def __init__(self, root=DEFAULT_CACHE_DIR, max_entries=DEFAULT_MAX_ENTRIES,
+                 max_bytes=DEFAULT_MAX_BYTES, ttl=DEFAULT_TTL):
+        self.root = root
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    @staticmethod
+    def key(**parts) -> str:
+        return hashlib.sha256(canonical_json(parts).encode()).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.root, f"{key}.json")
+
+    def get(self, key):
+        """Return the cached fields for key, or None on a miss / expired entry."""
+        path = self._path(key)
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+
+        expires_at = entry.get("expires_at")
+        if expires_at is not None and expires_at < time.time():
+            self._remove(path)
+            self.misses += 1
+            return None
+
+        try:
+            os.utime(path)  # mark as recently used
+        except OSError:
+            pass
+        self.hits += 1
+        return entry["fields"]
+
+    def put(self, key, fields, time_varying=False, evict=True):
+        """Store fields under key. Batch writers pass evict=False and call evict() once."""
+        entry = {
+            "created_at": time.time(),
+            "expires_at": time.time() + self.ttl if (time_varying and self.ttl) else None,
+            "fields": fields,
+        }
+        path = self._path(key)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(entry, f)
+        os.replace(tmp, path)
+        if evict:
+            self.evict()
+
+    def evict(self):
+        """Drop least recently used entries until both size bounds hold."""
+        with self._lock:
+            entries = []
+            for e in os.scandir(self.root):
+                if e.name.endswith(".json"):
+                    try:
+                        st = e.stat()
+                    except OSError:
+                        continue
+                    entries.append((st.st_mtime, st.st_size, e.path))
+            total = sum(size for _, size, _ in entries)
+            count = len(entries)
+            entries.sort()
+            for _, size, path in entries:
+                if count <= self.max_entries and total <= self.max_bytes:
+                    break
+                self._remove(path)
+                count -= 1
+                total -= size
+
+    def clear(self):
+        for e in os.scandir(self.root):
+            if e.name.endswith(".json"):
+                self._remove(e.path)
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -0,0 +1,175 @@
+# app/services/profile_jobs.py
+
+import datetime
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# Worker pool / admission settings (override via environment)
+JOB_WORKERS = int(os.getenv("PROFILE_JOB_WORKERS", "2"))
+JOB_QUEUE_DEPTH = int(os.getenv("PROFILE_JOB_QUEUE_DEPTH", "8"))
+JOB_MAX_PER_CLIENT = int(os.getenv("PROFILE_JOB_MAX_PER_CLIENT", "2"))
+JOB_STAGE_WORKERS = int(os.getenv("PROFILE_JOB_STAGE_WORKERS", "4"))
+JOB_HISTORY = int(os.getenv("PROFILE_JOB_HISTORY", "200"))
+
+ACTIVE = ("queued", "running")
+
+
+class AdmissionError(Exception):
+    """Raised when a job is refused because the queue or the client's quota is full."""
+
+    def __init__(self, message, retry_after=5):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def _now():
+    return datetime.datetime.now(datetime.UTC).isoformat()
+
+
+class Job:
+    def __init__(self, geometry, options, client, stages):
+        self.id = uuid.uuid4().hex
+        self.geometry = geometry
+        self.options = options
+        self.client = client
+        self.status = "queued"
+        self.stages = {name: {"status": "pending", "seconds": None} for name in stages}
+        self.submitted_at = _now()
+        self.started_at = None
+        self.finished_at = None
+        self.seconds = None
+        self.result = None
+        self.error = None
+        self.future = None
+
+    def on_stage(self, name, seconds, error):
+        """build_profile stage callback; runs on the profile's worker threads."""
+        self.stages[name] = {
+            "status": "failed" if error is not None else "done",
+            "seconds": round(seconds, 3),
+            **({"error": str(error)} if error is not None else {}),
+        }
+
+    def summary(self):
+        done = sum(1 for s in self.stages.values() if s["status"] != "pending")
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "progress": {"completed": done, "total": len(self.stages), "stages": dict(self.stages)},
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "seconds": self.seconds,
+            "error": self.error,
+        }
+
+
+class JobManager:
+    """
+    Runs build_profile jobs on a bounded thread pool, off the API event loop.
+
+    Admission control: at most `workers` jobs run and `queue_depth` more wait;
+    a client may have at most `max_per_client` queued or running jobs. Further
+    submissions raise AdmissionError instead of piling up. Finished jobs are kept
+    (oldest dropped first) up to `history` entries for polling.
+    """
+
+    def __init__(self, workers=JOB_WORKERS, queue_depth=JOB_QUEUE_DEPTH,
+                 max_per_client=JOB_MAX_PER_CLIENT, history=JOB_HISTORY, runner=None):
+        self.workers = workers
+        self.queue_depth = queue_depth
+        self.max_per_client = max_per_client
+        self.history = history
+        self.runner = runner or _profile_runner
+        self.jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._pool = None
+
+    def _active(self):
+        return [j for j in self.jobs.values() if j.status in ACTIVE]
+
+    def submit(self, geometry, options, client=None, stages=()):
+        with self._lock:
+            active = self._active()
+            if len(active) >= self.workers + self.queue_depth:
+                raise AdmissionError("Job queue is full, try again later", retry_after=30)
+            if client is not None and sum(1 for j in active if j.client == client) >= self.max_per_client:
+                raise AdmissionError(f"At most {self.max_per_client} active jobs per client")
+
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="profile-job")
+            job = Job(geometry, options, client, stages)
+            self.jobs[job.id] = job
+            self._trim()
+            job.future = self._pool.submit(self._run, job)
+            return job
+
+    def _run(self, job):
+        job.status = "running"
+        job.started_at = _now()
+        t0 = time.perf_counter()
+        try:
+            job.result = self.runner(job)
+            # cached / batched stages don't report individually
+            for name, stage in job.stages.items():
+                if stage["status"] == "pending":
+                    job.stages[name] = {"status": "done", "seconds": None}
+            job.status = "done"
+        except Exception as e:
+            job.error = str(e) or type(e).__name__
+            job.status = "failed"
+        job.finished_at = _now()
+        job.seconds = round(time.perf_counter() - t0, 3)
+
+    def _trim(self):
+        finished = [jid for jid, j in self.jobs.items() if j.status not in ACTIVE]
+        for jid in finished[:max(0, len(self.jobs) - self.history)]:
+            del self.jobs[jid]
+
+    def get(self, job_id):
+        return self.jobs.get(job_id)
+
+    def cancel(self, job_id):
+        """Cancel a job that has not started yet; returns True on success."""
+        job = self.jobs.get(job_id)
+        if job is None or job.status != "queued" or not job.future.cancel():
+            return False
+        job.status = "cancelled"
+        job.finished_at = _now()
+        return True
+
+    def stats(self):
+        with self._lock:
+            active = self._active()
+            return {
+                "workers": self.workers,
+                "queue_depth": self.queue_depth,
+                "running": sum(1 for j in active if j.status == "running"),
+                "queued": sum(1 for j in active if j.status == "queued"),
+                "tracked": len(self.jobs),
+            }
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+def _profile_runner(job):
+    # imported here so the API starts without Earth Engine until the first job
+    from app import get_data
+    return get_data.profile_aoi(job.id, job.geometry, job.options, on_stage=job.on_stage)
+
+
+def profile_stages(metrics=None):
+    """Names of the collector stages a job for `metrics` will report on."""
+    from app import get_data
+    needed = get_data.required_nodes(metrics)
+    return [name for name, _, _ in get_data.STAGES if name in needed]
+
+
+job_manager = JobManager()
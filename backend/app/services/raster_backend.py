@@ -0,0 +1,175 @@
+# app/services/raster_backend.py
+"""
+Offline backend for the get_data collectors.
+
+A backend provides:
+    layer(name, aoi, start_date, end_date, band=None) -> image handle
+    band_names(name, aoi, start_date, end_date)      -> [band, ...], or None when
+                                                        unknown locally (server-side
+                                                        backends then pick the band
+                                                        inside the reduction request)
+    reduce(image, geometry, scale, reducer)           -> {band: value} or None
+where reducer is one of 'mean', 'sum', 'count' or 'histogram', mirroring
+reduceRegion() results. Image handles only need `gt(threshold)`.
+
+LocalRasterBackend serves each layer ('ndvi', 'lst', 'aod', ...) from a
+pre-computed composite in a directory: `<name>.npy` with a `<name>.json`
+sidecar holding the geotransform, or `<name>.tif` (needs rasterio).
+Reads are windowed to the AOI bounding box (.npy files are memory-mapped)
+and pixels are kept only when their centre falls inside the AOI polygon.
+"""
+
+import json
+import math
+import os
+
+import numpy as np
+import shapely
+from shapely.geometry import shape
+
+
+def _to_shape(geometry):
+    """Accept a GeoJSON dict, a shapely geometry or an ee.Geometry."""
+    if hasattr(geometry, "toGeoJSON"):
+        geometry = geometry.toGeoJSON()
+    if isinstance(geometry, dict):
+        return shape(geometry)
+    return geometry
+
+
+def write_layer(root, name, array, transform, nodata=None, band=None):
+    """
+    Save a 2-D array as a `.npy` layer for LocalRasterBackend.
+
+    transform is GDAL-style: [origin_x, pixel_width, 0, origin_y, 0, -pixel_height].
+    """
+    os.makedirs(root, exist_ok=True)
+    np.save(os.path.join(root, f"{name}.npy"), np.asarray(array))
+    meta = {"transform": list(transform), "nodata": nodata}
+    if band:
+        meta["band"] = band
+    with open(os.path.join(root, f"{name}.json"), "w") as f:
+        json.dump(meta, f)
+
+
+class LocalLayer:
+    """One raster layer, optionally thresholded (like ee.Image.gt)."""
+
+    def __init__(self, name, path, meta, threshold=None):
+        self.name = name
+        self.path = path
+        self.meta = meta
+        self.threshold = threshold
+
+    @property
+    def band(self):
+        return self.meta.get("band") or self.name
+
+    def gt(self, value):
+        return LocalLayer(self.name, self.path, self.meta, threshold=value)
+
+    def _window(self, bounds):
+        """Return (data, origin_x, pixel_w, origin_y, pixel_h, nodata) for the bbox window."""
+        min_x, min_y, max_x, max_y = bounds
+        if self.path.endswith(".npy"):
+            arr = np.load(self.path, mmap_mode="r")
+            x0, dx, _, y0, _, dy = self.meta["transform"]
+            height, width = arr.shape[-2:]
+            col0 = max(0, math.floor((min_x - x0) / dx))
+            col1 = min(width, math.ceil((max_x - x0) / dx))
+            row0 = max(0, math.floor((max_y - y0) / dy))
+            row1 = min(height, math.ceil((min_y - y0) / dy))
+            if col1 <= col0 or row1 <= row0:
+                return None
+            data = np.asarray(arr[..., row0:row1, col0:col1], dtype=float)
+            if data.ndim == 3:
+                data = data[0]
+            return data, x0 + col0 * dx, dx, y0 + row0 * dy, dy, self.meta.get("nodata")
+
+        try:
+            import rasterio
+            from rasterio.windows import from_bounds
+        except ImportError as e:
+            raise RuntimeError("Reading GeoTIFF layers needs rasterio (`pip install rasterio`)") from e
+        with rasterio.open(self.path) as src:
+            window = from_bounds(min_x, min_y, max_x, max_y, src.transform)
+            window = window.round_offsets("floor").round_lengths("ceil")
+            window = window.intersection(rasterio.windows.Window(0, 0, src.width, src.height))
+            data = src.read(1, window=window).astype(float)
+            t = src.window_transform(window)
+            nodata = self.meta.get("nodata", src.nodata)
+        if data.size == 0:
+            return None
+        return data, t.c, t.a, t.f, t.e, nodata
+
+    def pixels(self, geometry):
+        """Valid pixel values whose centres fall inside the geometry."""
+        geom = _to_shape(geometry)
+        win = self._window(geom.bounds)
+        if win is None:
+            return np.empty(0)
+        data, x0, dx, y0, dy, nodata = win
+        rows, cols = data.shape
+        xs = x0 + (np.arange(cols) + 0.5) * dx
+        ys = y0 + (np.arange(rows) + 0.5) * dy
+        inside = shapely.contains_xy(geom, *np.meshgrid(xs, ys))
+        valid = inside & ~np.isnan(data)
+        if nodata is not None:
+            valid &= data != nodata
+        values = data[valid]
+        if self.threshold is not None:
+            values = (values > self.threshold).astype(float)
+        return values
+
+
+class LocalRasterBackend:
+    """Compute collector statistics from local rasters instead of Earth Engine."""
+
+    server_side = False
+
+    def __init__(self, root, layers=None):
+        self.root = os.path.abspath(root)
+        self.layers = layers or {}
+        self.name = f"local:{self.root}"
+
+    def _path(self, name):
+        if name in self.layers:
+            return self.layers[name]
+        for ext in (".npy", ".tif", ".tiff"):
+            path = os.path.join(self.root, name + ext)
+            if os.path.exists(path):
+                return path
+        raise FileNotFoundError(f"No raster for layer '{name}' in {self.root}")
+
+    def _meta(self, path):
+        sidecar = os.path.splitext(path)[0] + ".json"
+        if os.path.exists(sidecar):
+            with open(sidecar) as f:
+                return json.load(f)
+        return {}
+
+    def layer(self, name, aoi=None, start_date=None, end_date=None, band=None):
+        path = self._path(name)
+        return LocalLayer(name, path, self._meta(path))
+
+    def band_names(self, name, aoi=None, start_date=None, end_date=None):
+        try:
+            return [self.layer(name).band]
+        except FileNotFoundError:
+            return []
+
+    def reduce(self, image, geometry, scale, reducer):
+        """Reduce at the raster's native resolution (`scale` is not resampled)."""
+        values = image.pixels(geometry)
+        band = image.band
+        if reducer == "mean":
+            return {band: float(values.mean()) if values.size else None}
+        if reducer == "sum":
+            return {band: float(values.sum())}
+        if reducer == "count":
+            return {band: int(values.size)}
+        if reducer == "histogram":
+            keys, counts = np.unique(values, return_counts=True)
+            return {band: {(str(int(k)) if float(k).is_integer() else str(k)): int(c)
+                           for k, c in zip(keys, counts)}}
+        raise ValueError(f"Unknown reducer: {reducer}")
@@ -0,0 +1,64 @@
+# app/services/reduction_planner.py
+
+import math
+
+# Pixel budget per reduction for each --precision level (None = native scale)
+PRECISION_BUDGETS = {
+    'low': 1e6,
+    'medium': 1e7,
+    'high': 1e8,
+    'full': None,
+}
+DEFAULT_PRECISION = 'high'
+
+# Scales (m) a coarsened reduction snaps up to, so nearby AOIs share a scale
+NICE_SCALES = (10, 20, 30, 50, 100, 200, 250, 500, 1000, 2000, 5000, 10000, 20000, 50000)
+# Pixels one Earth Engine tile comfortably aggregates before tileScale is raised
+TILE_SCALE_PIXELS = 1e7
+
+
+class ReductionPlan:
+    """
+    Per-AOI reduction settings chosen from its area and a pixel budget.
+
+    A layer's scale is its native scale, or the smallest NICE_SCALES entry that
+    keeps the AOI under the budget. tileScale grows with the remaining pixel
+    count, and bestEffort is set only if even the coarsest scale is over budget.
+    """
+
+    def __init__(self, area_m2, precision=DEFAULT_PRECISION):
+        if precision not in PRECISION_BUDGETS:
+            raise ValueError(f"Unknown precision: {precision} (use {', '.join(PRECISION_BUDGETS)})")
+        self.area_m2 = area_m2
+        self.precision = precision
+        self.pixel_budget = PRECISION_BUDGETS[precision]
+
+    def pixels(self, scale):
+        return self.area_m2 / float(scale) ** 2
+
+    def scale(self, native):
+        if self.pixel_budget is None or self.pixels(native) <= self.pixel_budget:
+            return native
+        needed = math.sqrt(self.area_m2 / self.pixel_budget)
+        return next((s for s in NICE_SCALES if s >= max(needed, native)), NICE_SCALES[-1])
+
+    def params(self, native):
+        """reduceRegion keyword arguments for a layer with this native scale."""
+        scale = self.scale(native)
+        pixels = self.pixels(scale)
+        tile_scale = 1
+        while tile_scale < 16 and pixels / tile_scale > TILE_SCALE_PIXELS:
+            tile_scale *= 2
+        params = {'scale': scale, 'tileScale': tile_scale}
+        if self.pixel_budget is not None and pixels > self.pixel_budget:
+            params['bestEffort'] = True
+        return params
+
+    def summary(self, native_scales):
+        """Profile record of the plan: {'precision', 'area_km2', 'pixel_budget', 'scales': {...}}."""
+        return {
+            'precision': self.precision,
+            'area_km2': round(self.area_m2 / 1e6, 3),
+            'pixel_budget': self.pixel_budget,
+            'scales': {name: self.params(native) for name, native in native_scales.items()},
+        }
@@ -0,0 +1,147 @@
+# app/services/tile_store.py
+
+import json
+import math
+import os
+import threading
+import time
+
+# Tiles served by /api/tiles: a FeatureCollection (demo_tiles.json, get_data --grid
+# output) or its columnar .cols table
+TILE_STORE_PATH = os.getenv(
+    "TILE_STORE_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))),
+                 "public", "demo_tiles.json"),
+)
+MAX_NEAREST = 1000
+
+_store = None
+_store_lock = threading.Lock()
+
+
+class TileStore:
+    """
+    Tile features with an STR-tree over their geometries.
+
+    Queries go through the tree (bounding-box candidates) and are then refined
+    with the exact predicate, so they touch only the tiles near the query
+    instead of scanning the whole grid. Features are returned as loaded, or
+    with a subset of their properties and/or without geometry.
+    """
+
+    def __init__(self, features, path=None, geoms=None):
+        import numpy as np
+        import shapely
+        from shapely.geometry import shape
+
+        self.path = path
+        if geoms is None:
+            self.features = [f for f in features if f.get("geometry")]
+            self.geoms = np.array([shape(f["geometry"]) for f in self.features], dtype=object)
+        else:
+            keep = [i for i, g in enumerate(geoms) if g is not None]
+            self.features = [features[i] for i in keep]
+            self.geoms = np.asarray(geoms, dtype=object)[keep]
+        self.tree = shapely.STRtree(self.geoms)
+        self.loaded_at = time.time()
+        if len(self.geoms):
+            self.bounds = [float(v) for v in shapely.total_bounds(self.geoms)]
+            width, height = self.bounds[2] - self.bounds[0], self.bounds[3] - self.bounds[1]
+            # typical tile size, the first search radius of nearest()
+            self.tile_size = max(math.sqrt(width * height / len(self.geoms)), 1e-9)
+        else:
+            self.bounds, self.tile_size = None, 1e-9
+
+    @classmethod
+    def from_file(cls, path):
+        if os.path.isdir(path):
+            from app.services.columnar import ColumnarTable
+
+            table = ColumnarTable(path)
+            # geometries come straight from WKB; their GeoJSON is built on demand by feature()
+            features = [{"type": "Feature", "properties": props, "geometry": None}
+                        for props in table.records(geometry=False)]
+            return cls(features, path=path, geoms=table.geometries())
+        with open(path) as f:
+            fc = json.load(f)
+        return cls(fc.get("features") or [], path=path)
+
+    def __len__(self):
+        return len(self.features)
+
+    def bbox(self, min_x, min_y, max_x, max_y, limit=None):
+        """Indices of tiles intersecting the box, in load order."""
+        import shapely
+
+        idx = self.tree.query(shapely.box(min_x, min_y, max_x, max_y), predicate="intersects")
+        idx.sort()
+        return idx[:limit] if limit else idx
+
+    def point(self, lon, lat):
+        """Indices of tiles containing (or touching) the point; one tile for a grid."""
+        import shapely
+
+        idx = self.tree.query(shapely.Point(lon, lat), predicate="intersects")
+        idx.sort()
+        return idx
+
+    def nearest(self, lon, lat, k=1):
+        """
+        [(index, distance), ...] of the k tiles nearest to the point, closest first.
+
+        Distances are planar in degrees. The search box grows until it holds k
+        tiles within its half-width: anything outside the box is farther than that.
+        """
+        import numpy as np
+        import shapely
+
+        k = min(max(int(k), 1), len(self))
+        if not k:
+            return []
+        point = shapely.Point(lon, lat)
+        min_x, min_y, max_x, max_y = self.bounds
+        covers_all = max(lon - min_x, max_x - lon, lat - min_y, max_y - lat)
+        r = self.tile_size * math.sqrt(k)
+        while True:
+            idx = self.tree.query(shapely.box(lon - r, lat - r, lon + r, lat + r))
+            dist = shapely.distance(self.geoms[idx], point)
+            if (dist <= r).sum() >= k or r >= covers_all:
+                order = np.lexsort((idx, dist))[:k]
+                return [(int(idx[i]), float(dist[i])) for i in order]
+            r *= 2
+
+    def feature(self, i, fields=None, geometry=True):
+        import shapely
+
+        f = self.features[i]
+        props = f.get("properties") or {}
+        if fields:
+            props = {k: props[k] for k in fields if k in props}
+        if geometry and f["geometry"] is None:
+            f["geometry"] = json.loads(shapely.to_geojson(self.geoms[i]))
+        return {"type": "Feature", "properties": props, "geometry": f["geometry"] if geometry else None}
+
+    def collection(self, indices, fields=None, geometry=True):
+        return {"type": "FeatureCollection",
+                "features": [self.feature(int(i), fields, geometry) for i in indices]}
+
+    def stats(self):
+        return {"path": self.path, "tiles": len(self), "bounds": self.bounds, "loaded_at": self.loaded_at}
+
+
+def get_tile_store():
+    """The shared TileStore, loaded from TILE_STORE_PATH on first use."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = TileStore.from_file(TILE_STORE_PATH)
+        return _store
+
+
+def load_tile_store(path):
+    """Replace the shared TileStore with the tiles in `path`."""
+    global _store
+    store = TileStore.from_file(path)
+    with _store_lock:
+        _store = store
+    return store
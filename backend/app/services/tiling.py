@@ -0,0 +1,61 @@
+# app/services/tiling.py
+
+import json
+import math
+
+import shapely
+from shapely.geometry import box, shape
+from shapely.prepared import prep
+
+METERS_PER_DEGREE = 111_320.0
+
+
+def make_grid(geojson_geom: dict, n: int = None, tile_size_m: float = None, clip: bool = True) -> list:
+    """
+    Split an AOI into an n x n grid (or square tiles of tile_size_m metres) over its bounds.
+
+    Returns [{'tile_id': 'tile_1', 'geometry': <GeoJSON>}, ...] in row-major order
+    (north to south, west to east), keeping only tiles that touch the AOI. With clip,
+    each tile is intersected with the AOI so reductions stay inside it.
+    """
+    aoi = shape(geojson_geom)
+    min_x, min_y, max_x, max_y = aoi.bounds
+
+    if tile_size_m:
+        lat = math.radians((min_y + max_y) / 2.0)
+        dy = tile_size_m / METERS_PER_DEGREE
+        dx = tile_size_m / (METERS_PER_DEGREE * max(math.cos(lat), 1e-6))
+        cols = max(1, math.ceil((max_x - min_x) / dx))
+        rows = max(1, math.ceil((max_y - min_y) / dy))
+    else:
+        cols = rows = max(1, int(n or 1))
+        dx = (max_x - min_x) / cols
+        dy = (max_y - min_y) / rows
+
+    prepared = prep(aoi)
+    tiles = []
+    for r in range(rows):
+        top = max_y - r * dy
+        for c in range(cols):
+            left = min_x + c * dx
+            cell = box(left, top - dy, left + dx, top)
+            if not prepared.intersects(cell):
+                continue
+            if clip and not prepared.contains(cell):
+                cell = cell.intersection(aoi)
+                if cell.is_empty or cell.area == 0:
+                    continue
+            tiles.append({'tile_id': f"tile_{len(tiles) + 1}", 'geometry': json.loads(shapely.to_geojson(cell))})
+    return tiles
+
+
+def to_feature_collection(tiles: list, properties: dict) -> dict:
+    """
+    Build a demo_tiles.json-style FeatureCollection; properties maps tile_id -> dict.
+    """
+    features = []
+    for t in tiles:
+        props = {'tile_id': t['tile_id']}
+        props.update(properties.get(t['tile_id'], {}))
+        features.append({'type': 'Feature', 'properties': props, 'geometry': t['geometry']})
+    return {'type': 'FeatureCollection', 'features': features}
@@ -0,0 +1,150 @@
+# app/services/vector_tiles.py
+
+import math
+import os
+import threading
+from collections import OrderedDict
+
+from app.services.cell_grid import tile_bounds
+from app.services.tile_store import get_tile_store
+
+MVT_LAYER = "tiles"
+MVT_EXTENT = 4096
+MVT_BUFFER = 64            # tile units kept around each tile so edges don't show seams
+MVT_MAX_ZOOM = 24
+MVT_DETAIL_ZOOM = 16       # zooms above this reuse the zoom-16 geometries
+MVT_CACHE_TILES = int(os.getenv("MVT_CACHE_TILES", "2048"))
+
+# Properties encoded from each zoom up (None = all): low zooms only carry what
+# the map colours by, so wide views stay small.
+MVT_ZOOM_PROPERTIES = [
+    (0, ["tile_id", "best_use"]),
+    (12, ["tile_id", "best_use", "greenspace_priority", "industrial_suitability",
+          "residential_suitability", "flood_risk_score"]),
+    (14, None),
+]
+
+EARTH_RADIUS = 6378137.0
+HALF_WORLD = math.pi * EARTH_RADIUS
+MAX_LAT = 85.05112878
+
+_tiles = None
+_tiles_lock = threading.Lock()
+
+
+def to_mercator(coords):
+    """(N, 2) lon/lat array -> Web Mercator metres."""
+    import numpy as np
+
+    lon = coords[:, 0]
+    lat = np.clip(coords[:, 1], -MAX_LAT, MAX_LAT)
+    x = np.radians(lon) * EARTH_RADIUS
+    y = np.log(np.tan(np.pi / 4 + np.radians(lat) / 2)) * EARTH_RADIUS
+    return np.column_stack([x, y])
+
+
+def mercator_bounds(z, x, y):
+    """[minX, minY, maxX, maxY] of tile z/x/y in Web Mercator metres."""
+    size = 2 * HALF_WORLD / 2 ** z
+    return [-HALF_WORLD + x * size, HALF_WORLD - (y + 1) * size,
+            -HALF_WORLD + (x + 1) * size, HALF_WORLD - y * size]
+
+
+def zoom_properties(z):
+    fields = None
+    for min_zoom, names in MVT_ZOOM_PROPERTIES:
+        if z >= min_zoom:
+            fields = names
+    return fields
+
+
+class VectorTiles:
+    """
+    Mapbox Vector Tiles cut from a TileStore.
+
+    The pyramid is built lazily: the first request at a zoom projects the tile
+    geometries to Web Mercator and simplifies them to one tile unit at that zoom
+    (finer detail can't be encoded anyway). Encoded tiles are kept in an LRU.
+    """
+
+    def __init__(self, store, cache_tiles=MVT_CACHE_TILES):
+        self.store = store
+        self.cache_tiles = cache_tiles
+        self.hits = 0
+        self.misses = 0
+        self._levels = {}
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._level_lock = threading.Lock()
+
+    def level(self, z):
+        """Tile geometries in Web Mercator, simplified for zoom z."""
+        import shapely
+
+        z = min(z, MVT_DETAIL_ZOOM)
+        with self._level_lock:
+            if z not in self._levels:
+                if "base" not in self._levels:
+                    self._levels["base"] = shapely.transform(self.store.geoms, to_mercator)
+                tolerance = 2 * HALF_WORLD / 2 ** z / MVT_EXTENT
+                self._levels[z] = shapely.simplify(self._levels["base"], tolerance, preserve_topology=True)
+            return self._levels[z]
+
+    def _encode(self, z, x, y, fields):
+        try:
+            import mapbox_vector_tile
+        except ImportError as e:
+            raise RuntimeError("Vector tiles need mapbox-vector-tile (`pip install mapbox-vector-tile`)") from e
+        import shapely
+
+        bounds = mercator_bounds(z, x, y)
+        buffer = (bounds[2] - bounds[0]) * MVT_BUFFER / MVT_EXTENT
+        min_lon, min_lat, max_lon, max_lat = tile_bounds(x, y, z)
+        pad = (max_lon - min_lon) * MVT_BUFFER / MVT_EXTENT
+        idx = self.store.tree.query(shapely.box(min_lon - pad, min_lat - pad, max_lon + pad, max_lat + pad))
+        idx.sort()
+        clipped = shapely.clip_by_rect(self.level(z)[idx], bounds[0] - buffer, bounds[1] - buffer,
+                                       bounds[2] + buffer, bounds[3] + buffer)
+
+        features = []
+        for i, geom in zip(idx, clipped):
+            if geom.is_empty:
+                continue
+            props = self.store.features[i].get("properties") or {}
+            names = fields if fields is not None else props
+            features.append({"geometry": geom,
+                             "properties": {k: props[k] for k in names if props.get(k) is not None}})
+        return mapbox_vector_tile.encode([{"name": MVT_LAYER, "features": features}],
+                                         default_options={"quantize_bounds": bounds, "extents": MVT_EXTENT})
+
+    def tile(self, z, x, y, fields=None):
+        """Encoded tile z/x/y; `fields` overrides the zoom's property list."""
+        fields = fields or zoom_properties(z)
+        key = (z, x, y, tuple(fields) if fields is not None else None)
+        with self._lock:
+            data = self._cache.get(key)
+            if data is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return data
+            self.misses += 1
+        data = self._encode(z, x, y, fields)
+        with self._lock:
+            self._cache[key] = data
+            while len(self._cache) > self.cache_tiles:
+                self._cache.popitem(last=False)
+        return data
+
+    def stats(self):
+        return {"cached_tiles": len(self._cache), "hits": self.hits, "misses": self.misses,
+                "zoom_levels": sorted(z for z in self._levels if z != "base")}
+
+
+def get_vector_tiles():
+    """VectorTiles over the current shared TileStore (rebuilt when the store is reloaded)."""
+    global _tiles
+    store = get_tile_store()
+    with _tiles_lock:
+        if _tiles is None or _tiles.store is not store:
+            _tiles = VectorTiles(store)
+        return _tiles
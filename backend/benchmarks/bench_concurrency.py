@@ -0,0 +1,46 @@
+"""Sequential vs. thread-pooled build_profile against the fake `ee` module.
+
+Run from backend/:
+
+    python -m benchmarks.bench_concurrency --latency 0.2 --workers 1 4 8
+"""
+import argparse
+import time
+
+from benchmarks import fake_ee
+
+fake_ee.install()
+
+from app import get_data  # noqa: E402  (needs the fake ee installed first)
+
+
+def strip_volatile(profile):
+    return {k: v for k, v in profile.items() if k != 'generated_at'}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds per getInfo()")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8])
+    args = parser.parse_args(argv)
+
+    fake_ee.LATENCY = args.latency
+    aoi = fake_ee.Geometry.Rectangle(get_data.DEFAULT_BBOX)
+    quiet = lambda name, seconds, error: None
+
+    baseline = None
+    print(f"{'workers':>8} {'seconds':>8} {'getInfo':>8} {'speedup':>8} identical")
+    for workers in args.workers:
+        fake_ee.reset_stats()
+        t0 = time.perf_counter()
+        profile = get_data.build_profile(aoi, {}, workers=workers, on_stage=quiet)
+        elapsed = time.perf_counter() - t0
+        calls = fake_ee.stats()["getinfo"]
+        if baseline is None:
+            baseline = (elapsed, strip_volatile(profile))
+        same = strip_volatile(profile) == baseline[1]
+        print(f"{workers:>8} {elapsed:>8.2f} {calls:>8} {baseline[0] / elapsed:>7.1f}x {same}")
+
+
+if __name__ == "__main__":
+    main()
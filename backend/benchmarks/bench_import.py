@@ -0,0 +1,64 @@
+"""Cold-start guard: wall time of importing the CLI module and the API app.
+
+Each target is imported in a fresh interpreter (so nothing is cached in-process)
+several times; the median is reported together with any heavy module that got
+pulled in, and whether Earth Engine was initialized. Run from backend/:
+
+    python -m benchmarks.bench_import
+    python -m benchmarks.bench_import --max-ms 800     # exit 1 if slower (CI guard)
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+TARGETS = {
+    "cli": "app.get_data",
+    "api": "app.main",
+}
+# must not be imported just by importing a target
+HEAVY = ["geopandas", "shapely", "rasterio", "pandas", "googleapiclient"]
+
+PROBE = """
+import json, sys, time
+t0 = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - t0
+from app.services import ee_session
+print(json.dumps({{
+    "ms": elapsed * 1000,
+    "heavy": [m for m in {heavy!r} if m in sys.modules],
+    "ee_initialized": ee_session.is_initialized(),
+}}))
+"""
+
+
+def probe(module):
+    code = PROBE.format(module=module, heavy=HEAVY)
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("targets", nargs="*", default=list(TARGETS), help="any of cli, api (default: both)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--max-ms", type=float, help="fail if a median import takes longer")
+    args = parser.parse_args(argv)
+
+    failed = False
+    for target in args.targets:
+        runs = [probe(TARGETS[target]) for _ in range(args.repeat)]
+        median = statistics.median(r["ms"] for r in runs)
+        heavy = sorted({m for r in runs for m in r["heavy"]})
+        initialized = any(r["ee_initialized"] for r in runs)
+        print(f"{target:<4} import {TARGETS[target]:<13} median={median:7.1f}ms "
+              f"min={min(r['ms'] for r in runs):7.1f}ms heavy={heavy or '-'} ee_initialized={initialized}")
+        if initialized or heavy or (args.max_ms is not None and median > args.max_ms):
+            failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""Repeatable performance scenarios against the fake `ee` module and fake LLM upstream.
+
+Scenarios:
+  aoi   single-AOI build_profile (sequential, threaded and batched collection)
+  grid  gridded profile of ~1k tiles (reduceRegions)
+  grok  concurrent clients hitting /api/grok (in-process, upstream = benchmarks.fake_llm)
+
+Each reports round-trips, p50/p95/p99 latency and throughput. Run from backend/:
+
+    python -m benchmarks.bench_scenarios --latency 0.1 --jitter 0.05
+    python -m benchmarks.bench_scenarios grok --clients 50 --requests 1000 --json results.json
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import math
+import os
+import time
+
+import numpy as np
+
+from benchmarks import fake_ee
+
+fake_ee.install()
+os.environ.setdefault("XAI_API_KEY", "benchmark")
+os.environ.setdefault("GROK_CACHE_STORE", "memory")
+
+from app import get_data  # noqa: E402  (needs the fake ee installed first)
+
+
+def summarize(name, latencies, round_trips, wall, unit="runs"):
+    lat = np.asarray(latencies) * 1000
+    p50, p95, p99 = np.percentile(lat, [50, 95, 99])
+    return {
+        "scenario": name,
+        "n": len(latencies),
+        "round_trips": round_trips,
+        "p50_ms": round(float(p50), 1),
+        "p95_ms": round(float(p95), 1),
+        "p99_ms": round(float(p99), 1),
+        "throughput": round(len(latencies) / wall, 2),
+        "unit": f"{unit}/s",
+    }
+
+
+def print_row(r):
+    print(f"{r['scenario']:<28} n={r['n']:<5} round-trips={r['round_trips']:<7} "
+          f"p50={r['p50_ms']:>8.1f}ms p95={r['p95_ms']:>8.1f}ms p99={r['p99_ms']:>8.1f}ms "
+          f"{r['throughput']:>8.2f} {r['unit']}")
+
+
+def quiet():
+    """Silence the collectors' progress prints while timing."""
+    return contextlib.redirect_stdout(io.StringIO())
+
+
+# ---------- SCENARIOS ----------
+def scenario_aoi(runs):
+    aoi = fake_ee.Geometry.Rectangle(get_data.DEFAULT_BBOX)
+    geom = get_data.default_bbox_geometry()
+    modes = [
+        ("aoi/sequential", dict(workers=1)),
+        ("aoi/threaded", dict(workers=get_data.PROFILE_WORKERS)),
+        ("aoi/batched", dict(batched=True)),
+    ]
+    results = []
+    for name, kwargs in modes:
+        fake_ee.reset_stats()
+        latencies = []
+        t0 = time.perf_counter()
+        for _ in range(runs):
+            start = time.perf_counter()
+            with quiet():
+                get_data.build_profile(aoi, geom, on_stage=lambda *a: None, **kwargs)
+            latencies.append(time.perf_counter() - start)
+        wall = time.perf_counter() - t0
+        results.append(summarize(name, latencies, fake_ee.stats()["getinfo"] // runs, wall))
+    return results
+
+
+def scenario_grid(runs, tiles):
+    aoi = fake_ee.Geometry.Rectangle(get_data.DEFAULT_BBOX)
+    geom = get_data.default_bbox_geometry()
+    n = math.ceil(math.sqrt(tiles))
+    fake_ee.reset_stats()
+    latencies, count = [], 0
+    t0 = time.perf_counter()
+    for _ in range(runs):
+        start = time.perf_counter()
+        with quiet():
+            fc = get_data.build_tile_profiles(aoi, geom, grid=n)
+        latencies.append(time.perf_counter() - start)
+        count = len(fc["features"])
+    wall = time.perf_counter() - t0
+    r = summarize(f"grid/{count} tiles", latencies, fake_ee.stats()["getinfo"] // runs, wall)
+    r["tiles_per_s"] = round(count * runs / wall, 1)
+    return [r]
+
+
+async def _grok_clients(clients, requests, duplicate_ratio, upstream_latency):
+    import httpx
+    from benchmarks import fake_llm
+    from app.main import app
+    from app.services import http_client
+    from app.services.llm_cache import LLMCache, make_store
+    from app.api import routes_grok
+
+    fake_llm.LATENCY = upstream_latency
+    fake_llm.CALLS.update(total=0, stream=0)
+    routes_grok.response_cache = LLMCache(make_store("memory"))
+    http_client._client = httpx.AsyncClient(transport=httpx.ASGITransport(app=fake_llm.app))
+
+    distinct = max(1, int(requests * (1 - duplicate_ratio)))
+    payloads = [{"tile_id": f"tile_{i % distinct}", "ndvi_mean": 0.3, "pct_green": 0.4}
+                for i in range(requests)]
+    sem = asyncio.Semaphore(clients)
+    latencies, errors = [], 0
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://api") as client:
+        async def one(payload):
+            nonlocal errors
+            async with sem:
+                start = time.perf_counter()
+                r = await client.post("/api/grok", json=payload)
+                latencies.append(time.perf_counter() - start)
+                errors += r.status_code != 200
+
+        t0 = time.perf_counter()
+        await asyncio.gather(*(one(p) for p in payloads))
+        wall = time.perf_counter() - t0
+
+    await http_client.close()
+    r = summarize(f"grok/{clients} clients", latencies, fake_llm.CALLS["total"], wall, unit="req")
+    r["errors"] = errors
+    return [r]
+
+
+def scenario_grok(clients, requests, duplicate_ratio, upstream_latency):
+    return asyncio.run(_grok_clients(clients, requests, duplicate_ratio, upstream_latency))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("scenarios", nargs="*", default=["aoi", "grid", "grok"],
+                        help="any of aoi, grid, grok (default: all)")
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per getInfo()")
+    parser.add_argument("--jitter", type=float, default=0.02, help="extra random 0..J seconds per getInfo()")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--runs", type=int, default=20, help="repetitions for aoi/grid")
+    parser.add_argument("--tiles", type=int, default=1000)
+    parser.add_argument("--clients", type=int, default=50, help="concurrent /api/grok clients")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--duplicates", type=float, default=0.0,
+                        help="fraction of /api/grok requests repeating an earlier payload")
+    parser.add_argument("--upstream-latency", type=float, default=0.2, help="fake LLM seconds per call")
+    parser.add_argument("--json", metavar="FILE", help="also write the results as JSON")
+    args = parser.parse_args(argv)
+    unknown = set(args.scenarios) - {"aoi", "grid", "grok"}
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(sorted(unknown))}")
+
+    fake_ee.LATENCY, fake_ee.JITTER = args.latency, args.jitter
+    fake_ee.seed(args.seed)
+
+    results = []
+    if "aoi" in args.scenarios:
+        results += scenario_aoi(args.runs)
+    if "grid" in args.scenarios:
+        results += scenario_grid(max(1, args.runs // 4), args.tiles)
+    if "grok" in args.scenarios:
+        results += scenario_grok(args.clients, args.requests, args.duplicates, args.upstream_latency)
+
+    for r in results:
+        print_row(r)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""Profile storage: indented JSON vs NDJSON vs the columnar .cols format.
+
+Writes a synthetic tile grid (get_data --grid output) and a batch of AOI
+profiles (get_data --batch records, each with its polygon) in every format,
+then compares size on disk and the time to
+  - load everything (json.load / NDJSON lines / all columns + geometries),
+  - read two metric columns (the whole file for JSON; two memory-mapped
+    .npy files for columnar),
+  - build the /api/tiles index (TileStore) from the tile file.
+Run from backend/:
+
+    python -m benchmarks.bench_storage --tiles 200000 --aois 2000 --vertices 500
+"""
+import argparse
+import json
+import math
+import os
+import random
+import tempfile
+import time
+
+import numpy as np
+
+from app.services.columnar import ColumnarTable, write_features, write_profiles
+from app.services.tile_store import TileStore
+from benchmarks.bench_tiles import BBOX, make_tiles
+
+USES = ["greenspace", "residential", "industrial"]
+
+
+def tile_collection(n, rng):
+    features = make_tiles(n)
+    for f in features:
+        f["properties"].update({
+            "population_density_mean_per_km2": rng.uniform(0, 20000), "ndvi_mean": rng.uniform(-0.1, 0.8),
+            "pct_green": rng.random(), "lst_mean_celsius_est": rng.uniform(20, 45),
+            "aod_mean": rng.uniform(0, 1), "elevation_mean_m": rng.uniform(30, 80),
+            "precip_total_mean_mm": rng.uniform(300, 1200), "landcover_dominant_class": rng.choice([10, 30, 50]),
+            "water_occurrence_mean": rng.uniform(0, 100), "flood_risk_score": rng.random(),
+            "greenspace_priority": rng.random(), "industrial_suitability": rng.random(),
+            "residential_suitability": rng.random(), "best_use": rng.choice(USES),
+        })
+    return {"type": "FeatureCollection", "features": features}
+
+
+def aoi_profiles(n, vertices, rng):
+    profiles = []
+    for i in range(n):
+        cx, cy = rng.uniform(BBOX[0], BBOX[2]), rng.uniform(BBOX[1], BBOX[3])
+        ring = [[cx + 0.01 * math.cos(2 * math.pi * k / vertices), cy + 0.01 * math.sin(2 * math.pi * k / vertices)]
+                for k in range(vertices)]
+        profiles.append({
+            "aoi_id": f"ward_{i}", "generated_at": "2026-01-01T00:00:00+00:00",
+            "analysis_window": {"start": "2024-01-01", "end": "2024-12-31"},
+            "geometry": {"type": "Polygon", "coordinates": [ring + ring[:1]]},
+            "population_density_mean_per_km2": rng.uniform(0, 20000), "ndvi_mean": rng.uniform(-0.1, 0.8),
+            "pct_green": rng.random(), "lst_mean_celsius_est": rng.uniform(20, 45), "aod_mean": rng.random(),
+            "aod_band_used": "Optical_Depth_047", "elevation_mean_m": rng.uniform(30, 80),
+            "precip_total_mean_mm": rng.uniform(300, 1200), "precip_band_used": "precipitation",
+            "landcover_dominant_class": rng.choice([10, 30, 50]), "water_occurrence_mean": rng.uniform(0, 100),
+            "flood_risk_score": rng.random(),
+            "suitability": {"greenspace_priority": rng.random(), "industrial_suitability": rng.random(),
+                            "residential_suitability": rng.random(), "best_use": rng.choice(USES)},
+        })
+    return profiles
+
+
+def size(path):
+    if os.path.isdir(path):
+        return sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+    return os.path.getsize(path)
+
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def report(name, path, full, columns, extra=None):
+    r = {"file": name, "mb": round(size(path) / 1e6, 1), "load_all_s": round(full, 3),
+         "two_columns_s": round(columns, 4)}
+    r.update(extra or {})
+    print(f"{name:<26} {r['mb']:>8.1f} MB   load all {full:>8.3f}s   two columns {columns:>8.4f}s"
+          + "".join(f"   {k} {v:.3f}s" for k, v in (extra or {}).items()))
+    return r
+
+
+def read_ndjson(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+def load_json(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tiles", type=int, default=200_000)
+    parser.add_argument("--aois", type=int, default=2000)
+    parser.add_argument("--vertices", type=int, default=500, help="polygon vertices per AOI profile")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", metavar="FILE", help="also write the results as JSON")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    tmp = tempfile.mkdtemp(prefix="bench_storage_")
+    results = []
+
+    print(f"-- {args.tiles} tiles")
+    fc = tile_collection(args.tiles, rng)
+    tiles_json, tiles_cols = os.path.join(tmp, "tiles.json"), os.path.join(tmp, "tiles.cols")
+    with open(tiles_json, "w") as f:
+        json.dump(fc, f, indent=2)
+    write_features(tiles_cols, fc)
+    del fc
+
+    def json_columns():
+        feats = load_json(tiles_json)["features"]
+        return [f["properties"]["ndvi_mean"] for f in feats], [f["properties"]["best_use"] for f in feats]
+
+    def cols_columns():
+        t = ColumnarTable(tiles_cols)
+        return float(np.nanmean(t.column("ndvi_mean"))), np.unique(t.column("best_use"))
+
+    def cols_all():
+        t = ColumnarTable(tiles_cols)
+        return t.read(), t.geometries()
+
+    results.append(report("tiles/json (indent=2)", tiles_json, timed(lambda: load_json(tiles_json)),
+                          timed(json_columns), {"index": timed(lambda: TileStore.from_file(tiles_json))}))
+    results.append(report("tiles/columnar", tiles_cols, timed(cols_all), timed(cols_columns),
+                          {"index": timed(lambda: TileStore.from_file(tiles_cols))}))
+
+    print(f"-- {args.aois} AOI profiles x {args.vertices} vertices")
+    profiles = aoi_profiles(args.aois, args.vertices, rng)
+    prof_json, prof_ndjson = os.path.join(tmp, "profiles.json"), os.path.join(tmp, "profiles.ndjson")
+    prof_cols = os.path.join(tmp, "profiles.cols")
+    with open(prof_json, "w") as f:
+        json.dump(profiles, f, indent=2)
+    with open(prof_ndjson, "w") as f:
+        for p in profiles:
+            f.write(json.dumps(p) + "\n")
+    write_profiles(prof_cols, profiles)
+    del profiles
+
+    def ndjson_columns():
+        rows = read_ndjson(prof_ndjson)
+        return [r["flood_risk_score"] for r in rows], [r["suitability"]["best_use"] for r in rows]
+
+    def prof_cols_columns():
+        t = ColumnarTable(prof_cols)
+        return float(np.nanmean(t.column("flood_risk_score"))), np.unique(t.column("suitability.best_use"))
+
+    def prof_cols_all():
+        t = ColumnarTable(prof_cols)
+        return t.read(), t.geometries()
+
+    json_load = timed(lambda: load_json(prof_json))
+    results.append(report("profiles/json (indent=2)", prof_json, json_load, json_load))
+    results.append(report("profiles/ndjson", prof_ndjson, timed(lambda: read_ndjson(prof_ndjson)),
+                          timed(ndjson_columns)))
+    results.append(report("profiles/columnar", prof_cols, timed(prof_cols_all), timed(prof_cols_columns)))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
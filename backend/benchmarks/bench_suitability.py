@@ -0,0 +1,61 @@
+"""Scalar compute_suitabilities vs. compute_suitabilities_batch.
+
+Run from backend/:
+
+    python -m benchmarks.bench_suitability --sizes 1000 100000 1000000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks import fake_ee
+
+fake_ee.install()
+
+from app import get_data  # noqa: E402  (needs the fake ee installed first)
+
+
+def random_tiles(n, seed=0):
+    rng = np.random.default_rng(seed)
+    cols = {
+        'population_density_mean_per_km2': rng.uniform(0, 20000, n),
+        'ndvi_mean': rng.uniform(-0.3, 0.9, n),
+        'pct_green': rng.uniform(0, 1, n),
+        'lst_mean_celsius_est': rng.uniform(10, 50, n),
+        'aod_mean': rng.uniform(0, 1.5, n),
+        'flood_risk_score': rng.uniform(0, 1, n),
+    }
+    # some missing values, as Earth Engine returns for masked tiles
+    cols['aod_mean'][rng.random(n) < 0.05] = np.nan
+    return cols
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 100_000, 1_000_000])
+    args = parser.parse_args(argv)
+
+    print(f"{'tiles':>10} {'scalar s':>10} {'batch s':>10} {'speedup':>8} identical")
+    for n in args.sizes:
+        cols = random_tiles(n)
+        rows = [{k: (None if np.isnan(v[i]) else float(v[i])) for k, v in cols.items()}
+                for i in range(n)]
+
+        t0 = time.perf_counter()
+        scalar = [get_data.compute_suitabilities(r) for r in rows]
+        t_scalar = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        batch = get_data.compute_suitabilities_batch(cols)
+        t_batch = time.perf_counter() - t0
+
+        same = all(
+            np.array_equal(batch[k], np.array([s[k] for s in scalar]))
+            for k in ('greenspace_priority', 'industrial_suitability', 'residential_suitability', 'best_use')
+        )
+        print(f"{n:>10} {t_scalar:>10.3f} {t_batch:>10.4f} {t_scalar / t_batch:>7.0f}x {same}")
+
+
+if __name__ == "__main__":
+    main()
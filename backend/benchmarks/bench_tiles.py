@@ -0,0 +1,144 @@
+"""Tile store queries (STR-tree) against a linear scan over every tile geometry.
+
+Builds a synthetic square-tile grid (the shape of get_data --grid output) and
+times bbox, point and k-nearest queries both ways, checking they agree.
+The linear scan is the vectorized shapely predicate over all geometries, i.e.
+the fastest scan available, not a Python loop. With --mvt ZOOM, also encodes
+every vector tile covering the grid at that zoom (cold, then from the LRU) and
+compares the bytes with the full GeoJSON. Run from backend/:
+
+    python -m benchmarks.bench_tiles --tiles 200000 --queries 500 --mvt 13
+"""
+import argparse
+import json
+import math
+import random
+import time
+
+import numpy as np
+import shapely
+
+from app.services.cell_grid import lonlat_to_tile
+from app.services.tile_store import TileStore
+
+BBOX = [72.45, 22.95, 72.70, 23.15]  # Ahmedabad, as get_data.DEFAULT_BBOX
+
+
+def make_tiles(n):
+    side = math.ceil(math.sqrt(n))
+    min_x, min_y, max_x, max_y = BBOX
+    dx, dy = (max_x - min_x) / side, (max_y - min_y) / side
+    features = []
+    for i in range(n):
+        r, c = divmod(i, side)
+        x0, y0 = min_x + c * dx, max_y - (r + 1) * dy
+        ring = [[x0, y0], [x0 + dx, y0], [x0 + dx, y0 + dy], [x0, y0 + dy], [x0, y0]]
+        features.append({"type": "Feature", "properties": {"tile_id": f"tile_{i + 1}", "ndvi_mean": 0.3},
+                         "geometry": {"type": "Polygon", "coordinates": [ring]}})
+    return features
+
+
+def timed(fn, args):
+    out, lat = [], []
+    for a in args:
+        start = time.perf_counter()
+        out.append(fn(*a))
+        lat.append(time.perf_counter() - start)
+    return out, np.asarray(lat) * 1e6
+
+
+def row(name, lat):
+    p50, p99 = np.percentile(lat, [50, 99])
+    print(f"{name:<22} p50={p50:>10.1f}us p99={p99:>10.1f}us")
+    return {"query": name, "p50_us": round(float(p50), 1), "p99_us": round(float(p99), 1)}
+
+
+def bench_mvt(store, features, zoom):
+    from app.services.vector_tiles import VectorTiles
+
+    tiles = VectorTiles(store)
+    x0, y0 = lonlat_to_tile(BBOX[0], BBOX[3], zoom)
+    x1, y1 = lonlat_to_tile(BBOX[2], BBOX[1], zoom)
+    coords = [(zoom, x, y) for x in range(x0, x1 + 1) for y in range(y0, y1 + 1)]
+    start = time.perf_counter()
+    tiles.level(zoom)
+    pyramid = time.perf_counter() - start
+    cold, cold_lat = timed(tiles.tile, coords)
+    _, warm_lat = timed(tiles.tile, coords)
+    geojson_bytes = len(json.dumps({"type": "FeatureCollection", "features": features}))
+    mvt_bytes = sum(len(t) for t in cold)
+    print(f"mvt z{zoom}: {len(coords)} tiles, {mvt_bytes / 1e6:.1f} MB vs {geojson_bytes / 1e6:.1f} MB GeoJSON; "
+          f"zoom level built in {pyramid:.2f}s")
+    r_cold, r_warm = row(f"mvt z{zoom}/encode", cold_lat), row(f"mvt z{zoom}/cached", warm_lat)
+    return {"query": f"mvt z{zoom}", "tiles": len(coords), "mvt_bytes": mvt_bytes,
+            "geojson_bytes": geojson_bytes, "encode": r_cold, "cached": r_warm}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tiles", type=int, default=200_000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=10, help="neighbours per nearest query")
+    parser.add_argument("--view", type=float, default=0.05,
+                        help="bbox query side as a fraction of the grid extent")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--mvt", type=int, metavar="ZOOM", help="also time vector tiles at this zoom")
+    parser.add_argument("--json", metavar="FILE", help="also write the results as JSON")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    features = make_tiles(args.tiles)
+    start = time.perf_counter()
+    store = TileStore(features)
+    print(f"{len(store)} tiles, index built in {time.perf_counter() - start:.2f}s")
+    geoms = store.geoms
+
+    min_x, min_y, max_x, max_y = BBOX
+    w, h = (max_x - min_x) * args.view, (max_y - min_y) * args.view
+    boxes = []
+    for _ in range(args.queries):
+        x, y = rng.uniform(min_x, max_x - w), rng.uniform(min_y, max_y - h)
+        boxes.append((x, y, x + w, y + h))
+    points = [(rng.uniform(min_x, max_x), rng.uniform(min_y, max_y)) for _ in range(args.queries)]
+
+    def scan_bbox(*b):
+        return np.flatnonzero(shapely.intersects(geoms, shapely.box(*b)))
+
+    def scan_point(lon, lat):
+        return np.flatnonzero(shapely.intersects(geoms, shapely.Point(lon, lat)))
+
+    def scan_nearest(lon, lat):
+        dist = shapely.distance(geoms, shapely.Point(lon, lat))
+        idx = np.argpartition(dist, args.k)[:args.k]
+        return sorted((float(dist[i]), int(i)) for i in idx)
+
+    def index_nearest(lon, lat):
+        return sorted((d, i) for i, d in store.nearest(lon, lat, args.k))
+
+    results = []
+    for name, index_fn, scan_fn, queries in [
+        ("bbox", store.bbox, scan_bbox, boxes),
+        ("point", store.point, scan_point, points),
+        (f"nearest k={args.k}", index_nearest, scan_nearest, points),
+    ]:
+        got, index_lat = timed(index_fn, queries)
+        want, scan_lat = timed(scan_fn, queries)
+        if name.startswith("nearest"):
+            agree = all([d for d, _ in a] == [d for d, _ in b] for a, b in zip(got, want))
+        else:
+            agree = all(np.array_equal(a, b) for a, b in zip(got, want))
+        r_index, r_scan = row(f"{name}/index", index_lat), row(f"{name}/scan", scan_lat)
+        speedup = r_scan["p50_us"] / max(r_index["p50_us"], 1e-9)
+        print(f"{'':<22} {speedup:.0f}x faster at p50, results {'match' if agree else 'DIFFER'}")
+        results += [dict(r_index, match=agree), r_scan]
+
+    if args.mvt is not None:
+        results.append(bench_mvt(store, features, args.mvt))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"tiles": len(store), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+"""Regression checks for the profile paths, runnable without Earth Engine.
+
+  local      build_profile on the committed fixture rasters (LocalRasterBackend)
+             matches the recorded profile values
+  incremental  monthly partials merged over an extended window match a full
+             recompute of the same window, batched or not (fake `ee`, dated
+             images, partial edge pixels)
+  no-geometry  build_profile with an empty GeoJSON geometry falls back to
+             native scales instead of failing
+  columnar   profiles with empty dicts and missing keys round-trip through a
+             .cols table
+
+Run from backend/ (exits non-zero on a failure):
+
+    python -m benchmarks.check_regressions
+    python -m benchmarks.check_regressions --write-fixture   # regenerate the rasters
+"""
+import argparse
+import datetime
+import math
+import os
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+
+from benchmarks import fake_ee
+
+fake_ee.install()
+
+from app import get_data  # noqa: E402  (needs the fake ee installed first)
+from app.services.columnar import ColumnarTable, flatten, write_profiles  # noqa: E402
+from app.services.profile_cache import ProfileCache  # noqa: E402
+from app.services.raster_backend import LocalRasterBackend, write_layer  # noqa: E402
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "rasters")
+# 0.01 degree pixels around DEFAULT_BBOX, one pixel of margin on each side
+FIXTURE_TRANSFORM = [72.49, 0.01, 0, 23.06, 0, -0.01]
+FIXTURE_SHAPE = (17, 17)
+FIXTURE_NODATA = -9999.0
+TOLERANCE = 1e-9
+
+# Recorded from the fixture (and checked by hand: 224 AOI pixels, rows and columns
+# 1..15 around the nodata pixel); a change here means the local path changed behaviour
+EXPECTED_LOCAL = {
+    'population_density_mean_per_km2': 12.0,
+    'ndvi_mean': 0.4000000105505543,  # float32 raster
+    'pct_green': 179 / 224,
+    'lst_raw_mean': 15080.0,
+    'aod_mean': 180.0,
+    'aod_band_used': 'Optical_Depth_047',
+    'elevation_mean_m': 390.0,
+    'precip_total_mean_mm': 41.0,
+    'landcover_dominant_class': 10,
+    'water_occurrence_mean': 40.0,
+    'flood_risk_score': 0.0882,
+    'suitability.best_use': 'industrial',
+}
+
+INCREMENTAL_METRICS = ['lst', 'aod', 'precipitation']
+INCREMENTAL_FIELDS = ['lst_raw_mean', 'aod_mean', 'aod_band_used', 'precip_total_mean_mm', 'precip_band_used']
+
+
+def write_fixture(root=FIXTURE_DIR):
+    """Small rasters over the default AOI: gradients, a nodata pixel and two landcover classes."""
+    rows, cols = np.mgrid[0:FIXTURE_SHAPE[0], 0:FIXTURE_SHAPE[1]].astype(np.float32)
+    gradient = (rows + cols) / (sum(FIXTURE_SHAPE) - 2)  # 0 .. 1
+    layers = {
+        'population': 2.0 + 20.0 * gradient,
+        'ndvi': 0.1 + 0.6 * gradient,
+        'lst': 15000.0 + 10.0 * cols,
+        'aod': 100.0 + 10.0 * rows,
+        'elevation': 350.0 + 5.0 * cols,
+        'precipitation': 1.0 + 5.0 * rows,
+        'landcover': np.where(cols < 10, 10, 50),
+        'water': 4.0 * rows + cols,
+    }
+    bands = {'aod': 'Optical_Depth_047', 'precipitation': 'precipitation'}
+    for name, array in layers.items():
+        dtype = np.uint8 if name == 'landcover' else np.float32
+        array = np.asarray(array, dtype=dtype)
+        nodata = None
+        if dtype == np.float32:
+            array[8, 8] = FIXTURE_NODATA  # inside the AOI: must be skipped, not averaged
+            nodata = FIXTURE_NODATA
+        write_layer(root, name, array, FIXTURE_TRANSFORM, nodata=nodata, band=bands.get(name))
+    return root
+
+
+def close(a, b):
+    if isinstance(a, float) or isinstance(b, float):
+        return a is not None and b is not None and math.isclose(a, b, rel_tol=TOLERANCE, abs_tol=TOLERANCE)
+    return a == b
+
+
+def quiet(name, seconds, error):
+    if error is not None:
+        print(f"    stage {name} failed: {error}")
+
+
+def check_local():
+    previous = get_data.get_backend()
+    get_data.set_backend(LocalRasterBackend(FIXTURE_DIR))
+    try:
+        geom = get_data.default_bbox_geometry()
+        profile = get_data.build_profile(geom, geom, on_stage=quiet, workers=1)
+    finally:
+        get_data.set_backend(previous)
+    flat = flatten(profile)
+    return [f"{k}: {flat.get(k)!r} != expected {v!r}"
+            for k, v in EXPECTED_LOCAL.items() if not close(flat.get(k), v)]
+
+
+def _dated(band, base, step, months, extra=None):
+    images = []
+    for m in range(months):
+        image = {band: base + step * m, "system:time_start": datetime.date(2023, m + 1, 5).isoformat()}
+        images.append({**image, **(extra or {})})
+    return images
+
+
+def check_incremental():
+    canned, weighted = dict(fake_ee.CANNED), fake_ee.WEIGHTED_PIXELS
+    # varying monthly values and fractional edge pixels, so a mismatched estimator
+    # or an unweighted count shows (the fake's images cover every pixel each month,
+    # so per-pixel coverage differences between months aren't modelled)
+    fake_ee.WEIGHTED_PIXELS = 0.9 * fake_ee.PIXELS
+    fake_ee.CANNED.update({
+        get_data.MODIS_LST: _dated("LST_Day_1km", 15000.0, 37.0, 12),
+        get_data.MAIAC_AOD: _dated("Optical_Depth_047", 100.0, 13.0, 12, {"Optical_Depth_055": 90.0}),
+        get_data.GPM_IMERG: _dated("precipitation", 0.5, 0.25, 12),
+    })
+    cache_dir = tempfile.mkdtemp()
+    try:
+        cache = ProfileCache(root=cache_dir)
+        aoi = fake_ee.Geometry.Rectangle(get_data.DEFAULT_BBOX)
+        geom = get_data.default_bbox_geometry()
+        run = lambda end, **kw: get_data.build_profile(aoi, geom, '2023-01-01', end, metrics=INCREMENTAL_METRICS,
+                                                       on_stage=quiet, workers=1, **kw)
+        run('2023-07-01', cache=cache, incremental=True)
+        merged = run('2023-09-01', cache=cache, incremental=True)
+        full = run('2023-09-01')
+        batched = run('2023-09-01', batched=True)
+    finally:
+        fake_ee.CANNED.clear()
+        fake_ee.CANNED.update(canned)
+        fake_ee.WEIGHTED_PIXELS = weighted
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    problems = [f"{k}: incremental {merged.get(k)!r} != full {full.get(k)!r}"
+                for k in INCREMENTAL_FIELDS if not close(merged.get(k), full.get(k))]
+    problems += [f"{k}: batched {batched.get(k)!r} != full {full.get(k)!r}"
+                 for k in INCREMENTAL_FIELDS if not close(batched.get(k), full.get(k))]
+    reused = {name: info.get('computed') for name, info in (merged.get('incremental') or {}).items()
+              if isinstance(info, dict)}
+    if reused != {name: 2 for name in INCREMENTAL_METRICS}:
+        problems.append(f"extended window should compute only the 2 new months per stage, got {reused}")
+    return problems
+
+
+def check_no_geometry():
+    aoi = fake_ee.Geometry.Rectangle(get_data.DEFAULT_BBOX)
+    try:
+        profile = get_data.build_profile(aoi, {}, on_stage=quiet, workers=1)
+    except Exception as e:
+        return [f"build_profile with an empty geometry raised {e!r}"]
+    return [] if 'reduction' not in profile else ["an empty geometry should not get a reduction plan"]
+
+
+def check_columnar():
+    records = [
+        {'aoi_id': 'a', 'inc': {}, 'n': 1},
+        {'aoi_id': 'b', 'inc': {'x': 1.0}},
+        {'aoi_id': 'c', 'inc': {'x': None}, 'tags': ['x', 1], 'n': 3},
+    ]
+    root = tempfile.mkdtemp()
+    try:
+        path = write_profiles(os.path.join(root, "profiles.cols"), records)
+        rows = ColumnarTable(path).records()
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+    rows = [{k: v for k, v in row.items() if k != 'geometry'} for row in rows]
+    return [] if rows == records else [f"round-trip gave {rows}"]
+
+
+CHECKS = [
+    ('local', check_local),
+    ('incremental', check_incremental),
+    ('no-geometry', check_no_geometry),
+    ('columnar', check_columnar),
+]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--write-fixture", action="store_true",
+                        help=f"regenerate the fixture rasters in {FIXTURE_DIR} and exit")
+    parser.add_argument("checks", nargs="*", help=f"checks to run (default all): {', '.join(n for n, _ in CHECKS)}")
+    args = parser.parse_args(argv)
+    unknown = set(args.checks) - {name for name, _ in CHECKS}
+    if unknown:
+        parser.error(f"unknown checks: {', '.join(sorted(unknown))}")
+
+    if args.write_fixture:
+        print(f"Wrote fixture rasters to {write_fixture()}")
+        return 0
+
+    failed = 0
+    for name, check in CHECKS:
+        if args.checks and name not in args.checks:
+            continue
+        try:
+            problems = check()
+        except Exception as e:
+            problems = [f"raised {e!r}"]
+        print(f"{name:<12} {'FAIL' if problems else 'ok'}")
+        for problem in problems:
+            print(f"    {problem}")
+        failed += bool(problems)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,409 @@
+"""Stand-in for the `ee` (Earth Engine) module used by the benchmarks.
+
+Every EE object is a lazy node; nothing is computed until getInfo(), which
+sleeps for `LATENCY` seconds (the simulated round-trip) and counts the call.
+Images are constant per band, so reductions return canned values:
+
+    mean -> value, sum -> value * WEIGHTED_PIXELS, count -> PIXELS,
+    frequencyHistogram -> {value: PIXELS}
+
+Like Earth Engine, sum weights edge pixels by the share of them inside the
+region while count doesn't; WEIGHTED_PIXELS < PIXELS simulates an AOI with
+partial edge pixels (the default has none).
+
+Collection images may carry a "system:time_start" ISO date; filterDate() then
+keeps only the images inside the window (undated images always pass).
+
+`JITTER` adds a random 0..JITTER seconds per call (seeded, see seed()) to mimic
+the spread of real round-trips; stats() reports the call count and total latency.
+
+Install it before importing get_data:
+
+    from benchmarks import fake_ee
+    fake_ee.install()
+
+install() also points the band registry, the profile cache and the Grok
+response cache at a temporary directory, so fake band lists and values never
+reach the files real Earth Engine runs trust.
+"""
+import atexit
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+LATENCY = 0.0      # seconds slept per getInfo() round-trip
+JITTER = 0.0       # extra random seconds (0..JITTER) per getInfo()
+PIXELS = 1000      # pixels in every AOI / region
+WEIGHTED_PIXELS = PIXELS  # the same pixels weighted by their share inside the region
+
+# Canned collection contents: dataset id -> list of {band: value} images
+CANNED = {
+    "WorldPop/GP/100m/pop": [{"population": 5.0}, {"population": 7.0}],
+    "COPERNICUS/S2_SR_HARMONIZED": [{"B8": 3000.0, "B4": 1000.0}, {"B8": 2000.0, "B4": 1200.0}],
+    "MODIS/061/MOD11A2": [{"LST_Day_1km": 15000.0}, {"LST_Day_1km": 15200.0}],
+    "MODIS/061/MCD19A2_GRANULES": [{"Optical_Depth_047": 150.0, "Optical_Depth_055": 120.0}],
+    "USGS/SRTMGL1_003": [{"elevation": 380.0}],
+    "NASA/GPM_L3/IMERG_V07": [{"precipitation": 0.5, "MWprecipitation": 0.4}] * 4,
+    "ESA/WorldCover/v100": [{"Map": 10.0}],
+    "JRC/GSW1_4/GlobalSurfaceWater": [{"occurrence": 40.0, "change_abs": 1.0}],
+}
+
+_lock = threading.Lock()
+_stats = {"getinfo": 0, "latency_s": 0.0}
+_rng = random.Random(0)
+
+
+_sandbox = None
+
+
+def _isolate_state():
+    """Send every on-disk cache the app reads at import to a throwaway directory."""
+    global _sandbox
+    if _sandbox is not None:
+        return
+    if any(m in sys.modules for m in ("app.services.band_registry", "app.services.profile_cache")):
+        raise RuntimeError("fake_ee.install() must run before the app modules are imported")
+    _sandbox = tempfile.mkdtemp(prefix="fake_ee-")
+    atexit.register(shutil.rmtree, _sandbox, ignore_errors=True)
+    os.environ["BAND_REGISTRY_PATH"] = os.path.join(_sandbox, "band_registry.json")
+    os.environ["PROFILE_CACHE_DIR"] = os.path.join(_sandbox, "profile_cache")
+    os.environ["GROK_CACHE_PATH"] = os.path.join(_sandbox, "grok_cache.sqlite3")
+
+
+def install(latency=None, jitter=None):
+    """Register this module as `ee` in sys.modules (and isolate the app's caches)."""
+    global LATENCY, JITTER
+    if latency is not None:
+        LATENCY = latency
+    if jitter is not None:
+        JITTER = jitter
+    _isolate_state()
+    sys.modules["ee"] = sys.modules[__name__]
+    return sys.modules[__name__]
+
+
+def seed(n):
+    """Reseed the jitter generator so runs are repeatable."""
+    with _lock:
+        _rng.seed(n)
+
+
+def reset_stats():
+    with _lock:
+        _stats.update(getinfo=0, latency_s=0.0)
+
+
+def stats():
+    with _lock:
+        return dict(_stats)
+
+
+def Initialize(*args, **kwargs):
+    return None
+
+
+def _ev(x):
+    """Evaluate a (possibly nested) node to plain Python."""
+    if isinstance(x, ComputedObject):
+        return x._eval()
+    if isinstance(x, dict):
+        return {k: _ev(v) for k, v in x.items()}
+    if isinstance(x, (list, tuple)):
+        return [_ev(v) for v in x]
+    return x
+
+
+class ComputedObject:
+    def __init__(self, fn):
+        self._fn = fn
+
+    def _eval(self):
+        return self._fn()
+
+    def getInfo(self):
+        with _lock:
+            delay = LATENCY + (_rng.uniform(0, JITTER) if JITTER else 0.0)
+            _stats["getinfo"] += 1
+            _stats["latency_s"] += delay
+        if delay:
+            time.sleep(delay)
+        return self._eval()
+
+    # comparison helpers used on server-side numbers
+    def gt(self, other):
+        return ComputedObject(lambda: _ev(self) > _ev(other))
+
+    def get(self, key):
+        return ComputedObject(lambda: _ev(self)[_ev(key)])
+
+    def size(self):
+        return ComputedObject(lambda: len(_ev(self)))
+
+
+class Reducer:
+    def __init__(self, kind):
+        self.kind = kind
+
+    @staticmethod
+    def mean():
+        return Reducer("mean")
+
+    @staticmethod
+    def sum():
+        return Reducer("sum")
+
+    @staticmethod
+    def count():
+        return Reducer("count")
+
+    @staticmethod
+    def frequencyHistogram():
+        return Reducer("histogram")
+
+    def forEachBand(self, image):
+        return self
+
+    def apply(self, bands, pixels=None):
+        n = PIXELS if pixels is None else pixels
+        if self.kind == "mean":
+            return dict(bands)
+        if self.kind == "sum":
+            return {b: v * n * WEIGHTED_PIXELS / PIXELS for b, v in bands.items()}
+        if self.kind == "count":
+            return {b: n for b in bands}
+        return {b: {str(int(v)): n} for b, v in bands.items()}
+
+
+class Filter:
+    def __init__(self, fn):
+        self.fn = fn
+
+    @staticmethod
+    def lt(prop, value):
+        return Filter(lambda item: True)
+
+    @staticmethod
+    def inList(prop, values):
+        return Filter(lambda item: item in _ev(values))
+
+    @staticmethod
+    def date(start, end):
+        return Filter(lambda item: True)
+
+
+class Geometry(ComputedObject):
+    def __init__(self, geojson):
+        self.geojson = geojson
+        super().__init__(lambda: self.geojson)
+
+    @staticmethod
+    def Rectangle(coords):
+        x0, y0, x1, y1 = coords
+        ring = [[x0, y0], [x1, y0], [x1, y1], [x0, y1], [x0, y0]]
+        return Geometry({"type": "Polygon", "coordinates": [ring]})
+
+    def bounds(self):
+        return self
+
+
+class Dictionary(ComputedObject):
+    def __init__(self, d=None):
+        super().__init__(lambda: _ev(d or {}))
+
+
+class List(ComputedObject):
+    def __init__(self, items):
+        super().__init__(lambda: list(_ev(items)))
+
+    def filter(self, flt):
+        return List(ComputedObject(lambda: [i for i in _ev(self) if flt.fn(i)]))
+
+    def map(self, fn):
+        return List(ComputedObject(lambda: [_ev(fn(ComputedObject(lambda v=v: v))) for v in _ev(self)]))
+
+
+class String(ComputedObject):
+    def __init__(self, s):
+        super().__init__(lambda: _ev(s))
+
+
+class Number(ComputedObject):
+    def __init__(self, n):
+        super().__init__(lambda: _ev(n))
+
+
+class Algorithms:
+    @staticmethod
+    def If(cond, a, b):
+        return ComputedObject(lambda: _ev(a) if _ev(cond) else _ev(b))
+
+
+class Image(ComputedObject):
+    """Constant image; evaluates to {band: value}."""
+
+    def __init__(self, source=None):
+        if isinstance(source, str):
+            bands = CANNED.get(source, [{"b1": 1.0}])[0]
+            fn = lambda: dict(bands)
+        elif isinstance(source, ComputedObject):
+            fn = source._eval
+        elif isinstance(source, dict):
+            fn = lambda: dict(source)
+        else:
+            fn = lambda: {"constant": source if source is not None else 0}
+        super().__init__(fn)
+
+    def _op(self, f):
+        return Image(ComputedObject(lambda: f(self._eval())))
+
+    def select(self, bands, names=None):
+        def sel(d):
+            wanted = _ev(bands if isinstance(bands, (list, tuple)) else [bands])
+            out = {b: d[b] for b in wanted}
+            if names:
+                out = dict(zip(_ev(names), out.values()))
+            return out
+        return self._op(sel)
+
+    def rename(self, *names):
+        names = names[0] if len(names) == 1 and isinstance(names[0], (list, tuple)) else names
+        return self._op(lambda d: dict(zip(names, d.values())))
+
+    def normalizedDifference(self, bands):
+        a, b = bands
+        return self._op(lambda d: {"nd": (d[a] - d[b]) / (d[a] + d[b])})
+
+    def gt(self, v):
+        return self._op(lambda d: {k: float(x > _ev(v)) for k, x in d.items()})
+
+    def gte(self, v):
+        return self._op(lambda d: {k: float(x >= _ev(v)) for k, x in d.items()})
+
+    def Not(self):
+        return self._op(lambda d: {k: float(not x) for k, x in d.items()})
+
+    def sqrt(self):
+        return self._op(lambda d: {k: x ** 0.5 for k, x in d.items()})
+
+    def fastDistanceTransform(self, *args):
+        return self._op(lambda d: {"distance": 0.0})
+
+    def addBands(self, other):
+        return Image(ComputedObject(lambda: {**self._eval(), **other._eval()}))
+
+    def multiply(self, v):
+        return self._op(lambda d: {k: x * _ev(v) for k, x in d.items()})
+
+    def mask(self):
+        return self._op(lambda d: {k: 1.0 for k in d})
+
+    def bandNames(self):
+        return List(ComputedObject(lambda: [b for b in self._eval() if ":" not in b]))
+
+    def reduceRegion(self, reducer=None, geometry=None, scale=None, maxPixels=None, **kwargs):
+        return Dictionary(ComputedObject(lambda: reducer.apply(self._eval())))
+
+    def reduceRegions(self, collection=None, reducer=None, scale=None, **kwargs):
+        def run():
+            stats = reducer.apply(self._eval())
+            return [dict(f, properties={**f["properties"], **stats}) for f in collection._features()]
+        return FeatureCollection(ComputedObject(run))
+
+
+class Feature(ComputedObject):
+    def __init__(self, geometry, properties=None):
+        super().__init__(lambda: {"type": "Feature", "geometry": _ev(geometry),
+                                  "properties": dict(_ev(properties or {}))})
+
+
+class FeatureCollection(ComputedObject):
+    """Evaluates to a GeoJSON-like FeatureCollection dict."""
+
+    def __init__(self, source):
+        if isinstance(source, ComputedObject):
+            fn = lambda: {"type": "FeatureCollection", "features": source._eval()}
+        else:
+            fn = lambda: {"type": "FeatureCollection", "features": [_ev(f) for f in source]}
+        super().__init__(fn)
+
+    def _features(self):
+        return self._eval()["features"]
+
+    def size(self):
+        return ComputedObject(lambda: len(self._features()))
+
+    def select(self, properties, newProperties=None, retainGeometry=True):
+        def run():
+            out = []
+            for f in self._features():
+                props = {k: v for k, v in f["properties"].items() if k in properties}
+                out.append({"type": "Feature", "properties": props,
+                            "geometry": f["geometry"] if retainGeometry else None})
+            return out
+        return FeatureCollection(ComputedObject(run))
+
+
+class ImageCollection(ComputedObject):
+    """Evaluates to a list of {band: value} dicts."""
+
+    def __init__(self, source):
+        if isinstance(source, str):
+            images = CANNED.get(source, [])
+            fn = lambda: [dict(i) for i in images]
+        elif callable(source):
+            fn = source
+        else:
+            fn = lambda: [_ev(i) for i in source]
+        super().__init__(fn)
+
+    def _same(self):
+        return ImageCollection(self._eval)
+
+    def filterDate(self, start, end=None):
+        def run():
+            lo, hi = _ev(start), _ev(end)
+            return [i for i in self._eval() if "system:time_start" not in i
+                    or (lo <= i["system:time_start"] and (hi is None or i["system:time_start"] < hi))]
+        return ImageCollection(run)
+
+    def filterBounds(self, geom):
+        return self._same()
+
+    def filter(self, flt):
+        return self._same()
+
+    def select(self, bands, names=None):
+        return self.map(lambda img: img.select(bands, names))
+
+    def map(self, fn):
+        return ImageCollection(lambda: [fn(Image(dict(d)))._eval() for d in self._eval()])
+
+    def first(self):
+        return Image(ComputedObject(lambda: (self._eval() or [None])[0]))
+
+    def size(self):
+        return ComputedObject(lambda: len(self._eval()))
+
+    def _composite(self, f):
+        def run():
+            imgs = self._eval()
+            if not imgs:
+                return {}
+            return {b: f([i[b] for i in imgs]) for b in imgs[0] if ":" not in b}
+        return Image(ComputedObject(run))
+
+    def mean(self):
+        return self._composite(lambda xs: sum(xs) / len(xs))
+
+    def median(self):
+        return self._composite(lambda xs: sorted(xs)[len(xs) // 2])
+
+    def sum(self):
+        return self._composite(sum)
+
+    def count(self):
+        return self._composite(len)
@@ -0,0 +1,95 @@
+"""Stand-in for the upstream chat-completions API (OpenAI / xAI wire format).
+
+Answers every prompt with a canned recommendation, either as one JSON body or
+as an SSE token stream (`"stream": true`), after a configurable latency.
+
+Run from backend/:
+
+    python -m benchmarks.fake_llm --port 8001 --latency 0.5 --token-delay 0.01
+    XAI_API_URL=http://127.0.0.1:8001/v1/chat/completions XAI_API_KEY=x uvicorn app.main:app
+"""
+import argparse
+import asyncio
+import json
+import re
+import time
+
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+LATENCY = 0.0       # seconds before the first byte
+TOKEN_DELAY = 0.0   # seconds between streamed tokens
+CALLS = {"total": 0, "stream": 0}
+
+app = FastAPI()
+
+
+def canned_answer(prompt: str) -> str:
+    """A recommendation object; multi-tile prompts get one entry per tile_id."""
+    one = {
+        "overall_assessment": "Moderate suitability; prioritize green infrastructure.",
+        "recommended_use": "residential",
+        "rationale": ["pct_green below target", "moderate flood_risk_score"],
+        "next_steps": [{"action": "Expand tree canopy", "department": "Parks"}],
+    }
+    if "keyed by tile_id" in prompt:
+        tile_ids = re.findall(r'"(tile_[^"]+)":\{', prompt)
+        return json.dumps({t: one for t in tile_ids})
+    return json.dumps(one)
+
+
+def tokens(text: str):
+    """Split text into small pieces the way a tokenizer roughly would."""
+    return re.findall(r"\s*\S{1,4}", text)
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    prompt = body["messages"][-1]["content"]
+    answer = canned_answer(prompt)
+    CALLS["total"] += 1
+    await asyncio.sleep(LATENCY)
+
+    if not body.get("stream"):
+        return {
+            "id": f"fake-{CALLS['total']}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": answer},
+                         "finish_reason": "stop"}],
+        }
+
+    CALLS["stream"] += 1
+
+    async def events():
+        for piece in tokens(answer):
+            chunk = {"choices": [{"index": 0, "delta": {"content": piece}}]}
+            yield f"data: {json.dumps(chunk)}\n\n"
+            await asyncio.sleep(TOKEN_DELAY)
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+@app.get("/calls")
+def calls():
+    return CALLS
+
+
+def main(argv=None):
+    global LATENCY, TOKEN_DELAY
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds before the first byte")
+    parser.add_argument("--token-delay", type=float, default=0.0, help="seconds between streamed tokens")
+    args = parser.parse_args(argv)
+    LATENCY, TOKEN_DELAY = args.latency, args.token_delay
+
+    import uvicorn
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()